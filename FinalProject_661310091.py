@@ -1,5 +1,2 @@
-import importlib
-import CurveForRigging.cfrUi as cfrui
-importlib.reload(cfrui)
-
-cfrui.run()
\ No newline at end of file
+import CurveForRigging
+CurveForRigging.launch()
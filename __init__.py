@@ -0,0 +1,21 @@
+# ------------------------------------------------------------
+# CurveForRigging package
+# ------------------------------------------------------------
+# Shelf button:
+#     import CurveForRigging
+#     CurveForRigging.launch()
+#
+# The tool's modules import each other flat (import cfrUtil), so the
+# package folder goes on sys.path once here. Nothing else is imported
+# until launch() is called.
+import os
+import sys
+
+module_path = os.path.dirname(os.path.abspath(__file__))
+if module_path not in sys.path:
+    sys.path.append(module_path)
+
+
+def launch(reload=None):
+    import cfrLauncher
+    return cfrLauncher.launch(reload)
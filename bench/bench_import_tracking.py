@@ -0,0 +1,63 @@
+# ------------------------------------------------------------
+# Import tracking: scene diff vs returnNewNodes
+# ------------------------------------------------------------
+# Run with mayapy:
+#   mayapy bench/bench_import_tracking.py [file_name] [repeat]
+#
+# Compares the old "ls(tr=True) before/after" tracking against the
+# returnNewNodes tracking used by cfrUtil.import_curve, on empty and
+# increasingly heavy scenes.
+import os
+import sys
+import time
+
+import maya.standalone
+maya.standalone.initialize()
+
+import maya.cmds as cmds
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import cfrUtil
+
+SCENE_SIZES = (0, 1000, 10000, 50000)
+
+
+def import_scene_diff(file_name):
+    file_path = os.path.join(cfrUtil.curve_folder, file_name)
+    before = set(cmds.ls(tr=True))
+    cmds.file(file_path, i=True, type="mayaAscii", ignoreVersion=True, ra=True,
+              mergeNamespacesOnClash=True, namespace=os.path.splitext(file_name)[0])
+    after = set(cmds.ls(tr=True))
+    return list(after - before)
+
+
+def fill_scene(size):
+    cmds.file(new=True, force=True)
+    for i in range(size):
+        cmds.createNode("transform", n=f"bench_{i}", skipSelect=True)
+
+
+def timed(func, file_name, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(file_name)
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return samples[len(samples) // 2] * 1000.0
+
+
+def main(file_name="head.ma", repeat=10):
+    print(f"{'transforms':>10} | {'scene diff (ms)':>16} | {'returnNewNodes (ms)':>20}")
+    for size in SCENE_SIZES:
+        fill_scene(size)
+        old = timed(import_scene_diff, file_name, repeat)
+        fill_scene(size)
+        new = timed(cfrUtil.import_curve, file_name, repeat)
+        print(f"{size:>10} | {old:>16.2f} | {new:>20.2f}")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(args[0] if args else "head.ma", int(args[1]) if len(args) > 1 else 10)
+    maya.standalone.uninitialize()
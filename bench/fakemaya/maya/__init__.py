@@ -0,0 +1,4 @@
+# ------------------------------------------------------------
+# In-memory stand-in for the parts of Maya used by CurveForRigging
+# ------------------------------------------------------------
+# Put bench/fakemaya first on sys.path to run cfrUtil without Maya.
@@ -0,0 +1,324 @@
+# ------------------------------------------------------------
+# In-memory DAG shared by the fake maya.cmds and maya.api.OpenMaya
+# ------------------------------------------------------------
+import math
+import re
+
+# node types that live in the DAG, and what they derive from
+DAG_TYPES = {
+    "transform": "transform",
+    "joint": "transform",
+    "pointConstraint": "transform",
+    "parentConstraint": "transform",
+    "nurbsCurve": "shape",
+    "locator": "shape",
+    "camera": "shape",
+    "mesh": "shape",
+}
+
+TRANSFORM_DEFAULTS = {
+    "t": (0.0, 0.0, 0.0),
+    "r": (0.0, 0.0, 0.0),
+    "s": (1.0, 1.0, 1.0),
+    "rp": (0.0, 0.0, 0.0),
+    "sp": (0.0, 0.0, 0.0),
+    "jo": (0.0, 0.0, 0.0),
+    "ra": (0.0, 0.0, 0.0),
+    "v": True,
+    "overrideEnabled": False,
+    "overrideColor": 0,
+    "hiddenInOutliner": False,
+    "offsetParentMatrix": (1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0),
+}
+
+SHAPE_DEFAULTS = {
+    "v": True,
+    "overrideEnabled": False,
+    "overrideColor": 0,
+    "intermediateObject": False,
+}
+
+
+class Node(object):
+    __slots__ = ("name", "type", "parent", "children", "attrs", "history", "dynamic", "alive", "do_not_write")
+
+    def __init__(self, name, node_type, parent=None):
+        self.name = name
+        self.type = node_type
+        self.parent = parent
+        self.children = []
+        if is_a(node_type, "transform"):
+            self.attrs = dict(TRANSFORM_DEFAULTS)
+        else:
+            self.attrs = dict(SHAPE_DEFAULTS) if is_a(node_type, "shape") else {}
+        self.history = []
+        self.dynamic = {}
+        self.alive = True
+        self.do_not_write = False
+
+    @property
+    def dag(self):
+        return self.type in DAG_TYPES
+
+
+def is_a(node_type, base):
+    if node_type == base:
+        return True
+    return DAG_TYPES.get(node_type) == base
+
+
+class Scene(object):
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.by_name = {}
+        self.nodes = []  # creation order, dead entries are skipped
+        self.counters = {}
+        self.namespaces = set()
+        self.selection = []
+        self.connections = []  # (source node, attr, destination node, attr)
+        self.alive_count = 0
+
+    # ------------------------------------------------------------
+    # names
+    # ------------------------------------------------------------
+    def unique_name(self, name):
+        if name not in self.by_name:
+            return name
+        base = re.sub(r"\d+$", "", name)
+        n = self.counters.get(base, 0)
+        while True:
+            n += 1
+            candidate = f"{base}{n}"
+            if candidate not in self.by_name:
+                self.counters[base] = n
+                return candidate
+
+    def default_name(self, node_type):
+        return self.unique_name(f"{node_type}1")
+
+    def long_name(self, node):
+        if not node.dag:
+            return node.name
+        parts = []
+        while node is not None:
+            parts.append(node.name)
+            node = node.parent
+        return "|" + "|".join(reversed(parts))
+
+    def partial_name(self, node):
+        if len(self.by_name.get(node.name, ())) <= 1 or not node.dag:
+            return node.name
+        parts = [node.name]
+        parent = node.parent
+        while parent is not None:
+            parts.insert(0, parent.name)
+            candidate = "|".join(parts)
+            if len(self.find(candidate)) == 1:
+                return candidate
+            parent = parent.parent
+        return "|" + "|".join(parts)
+
+    def find(self, name):
+        name = name.split(".", 1)[0]
+        leaf = name.rsplit("|", 1)[-1]
+        nodes = self.by_name.get(leaf, ())
+        if "|" not in name:
+            return list(nodes)
+        return [n for n in nodes if self.long_name(n).endswith(name if name.startswith("|") else "|" + name)]
+
+    def get(self, name):
+        nodes = self.find(name)
+        if not nodes:
+            raise ValueError(f"No object matches name: {name}")
+        if len(nodes) > 1:
+            raise ValueError(f"More than one object matches name: {name}")
+        return nodes[0]
+
+    # ------------------------------------------------------------
+    # nodes
+    # ------------------------------------------------------------
+    def create(self, node_type, name=None, parent=None):
+        name = self.unique_name(name) if name else self.default_name(node_type)
+        node = Node(name, node_type)
+        self.by_name.setdefault(name, []).append(node)
+        self.nodes.append(node)
+        self.alive_count += 1
+        if ":" in name:
+            self.namespaces.add(name.rsplit(":", 1)[0])
+        if parent is not None:
+            self.reparent(node, parent)
+        return node
+
+    def rename(self, node, new_name):
+        if new_name == node.name:
+            return node
+        new_name = self.unique_name(new_name)
+        self.by_name[node.name].remove(node)
+        if not self.by_name[node.name]:
+            del self.by_name[node.name]
+        node.name = new_name
+        self.by_name.setdefault(new_name, []).append(node)
+        return node
+
+    def reparent(self, node, parent):
+        if node.parent is not None:
+            node.parent.children.remove(node)
+        node.parent = parent
+        if parent is not None:
+            parent.children.append(node)
+
+    def delete(self, node):
+        if not node.alive:
+            return
+        for child in list(node.children):
+            self.delete(child)
+        for hist in node.history:
+            self.delete(hist)
+        if node.parent is not None:
+            node.parent.children.remove(node)
+            node.parent = None
+        self.by_name[node.name].remove(node)
+        if not self.by_name[node.name]:
+            del self.by_name[node.name]
+        node.alive = False
+        self.alive_count -= 1
+        if node in self.selection:
+            self.selection.remove(node)
+        if self.alive_count * 2 < len(self.nodes):
+            self.nodes = [n for n in self.nodes if n.alive]
+
+    def all_nodes(self):
+        return [n for n in self.nodes if n.alive]
+
+    def descendants(self, node):
+        result = []
+        stack = list(reversed(node.children))
+        while stack:
+            child = stack.pop()
+            result.append(child)
+            stack.extend(reversed(child.children))
+        return result
+
+    # ------------------------------------------------------------
+    # matrices (row vectors, Maya layout)
+    # ------------------------------------------------------------
+    def local_matrix(self, node):
+        if not is_a(node.type, "transform"):
+            return identity()
+        a = node.attrs
+        m = translate_matrix([-v for v in a["sp"]])
+        m = mult(m, scale_matrix(a["s"]))
+        m = mult(m, translate_matrix(a["sp"]))
+        m = mult(m, translate_matrix([-v for v in a["rp"]]))
+        m = mult(m, rotate_matrix(a["ra"]))
+        m = mult(m, rotate_matrix(a["r"]))
+        if node.type == "joint":
+            m = mult(m, rotate_matrix(a["jo"]))
+        m = mult(m, translate_matrix(a["rp"]))
+        m = mult(m, translate_matrix(a["t"]))
+        return mult(m, list(a["offsetParentMatrix"]))
+
+    def world_matrix(self, node):
+        m = identity()
+        while node is not None:
+            m = mult(m, self.local_matrix(node))
+            node = node.parent
+        return m
+
+    def parent_matrix(self, node):
+        return self.world_matrix(node.parent) if node.parent is not None else identity()
+
+    def world_pivot(self, node):
+        a = node.attrs
+        point = [a["rp"][i] + a["t"][i] for i in range(3)]
+        point = transform_point(point, list(a["offsetParentMatrix"]))
+        return transform_point(point, self.parent_matrix(node))
+
+
+# ------------------------------------------------------------
+# MATRIX HELPERS
+# ------------------------------------------------------------
+def identity():
+    return [1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0]
+
+
+def mult(a, b):
+    return [sum(a[r * 4 + k] * b[k * 4 + c] for k in range(4)) for r in range(4) for c in range(4)]
+
+
+def translate_matrix(t):
+    m = identity()
+    m[12], m[13], m[14] = t
+    return m
+
+
+def scale_matrix(s):
+    m = identity()
+    m[0], m[5], m[10] = s
+    return m
+
+
+def rotate_matrix(r):
+    # xyz rotate order in degrees
+    x, y, z = [math.radians(v) for v in r]
+    rx = [1, 0, 0, 0, 0, math.cos(x), math.sin(x), 0, 0, -math.sin(x), math.cos(x), 0, 0, 0, 0, 1]
+    ry = [math.cos(y), 0, -math.sin(y), 0, 0, 1, 0, 0, math.sin(y), 0, math.cos(y), 0, 0, 0, 0, 1]
+    rz = [math.cos(z), math.sin(z), 0, 0, -math.sin(z), math.cos(z), 0, 0, 0, 0, 1, 0, 0, 0, 0, 1]
+    return mult(mult(rx, ry), rz)
+
+
+def euler_from_matrix(m):
+    # xyz rotate order, scale removed first, radians
+    rows = []
+    for r in range(3):
+        row = m[r * 4:r * 4 + 3]
+        length = math.sqrt(sum(v * v for v in row)) or 1.0
+        rows.append([v / length for v in row])
+    sy = -rows[0][2]
+    y = math.asin(max(-1.0, min(1.0, sy)))
+    if abs(sy) < 0.999999:
+        x = math.atan2(rows[1][2], rows[2][2])
+        z = math.atan2(rows[0][1], rows[0][0])
+    else:
+        x = math.atan2(-rows[2][1], rows[1][1])
+        z = 0.0
+    return x, y, z
+
+
+def inverse(m):
+    a = [list(m[r * 4:r * 4 + 4]) + [1.0 if r == c else 0.0 for c in range(4)] for r in range(4)]
+    for col in range(4):
+        pivot = max(range(col, 4), key=lambda r: abs(a[r][col]))
+        if abs(a[pivot][col]) < 1e-15:
+            raise ValueError("singular matrix")
+        a[col], a[pivot] = a[pivot], a[col]
+        p = a[col][col]
+        a[col] = [v / p for v in a[col]]
+        for r in range(4):
+            if r != col and a[r][col]:
+                f = a[r][col]
+                a[r] = [v - f * w for v, w in zip(a[r], a[col])]
+    return [a[r][4 + c] for r in range(4) for c in range(4)]
+
+
+def transform_point(p, m):
+    x, y, z = p
+    return (
+        x * m[0] + y * m[4] + z * m[8] + m[12],
+        x * m[1] + y * m[5] + z * m[9] + m[13],
+        x * m[2] + y * m[6] + z * m[10] + m[14],
+    )
+
+
+def transform_vector(v, m):
+    x, y, z = v
+    return (
+        x * m[0] + y * m[4] + z * m[8],
+        x * m[1] + y * m[5] + z * m[9],
+        x * m[2] + y * m[6] + z * m[10],
+    )
+
+
+SCENE = Scene()
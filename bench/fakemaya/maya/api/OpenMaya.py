@@ -0,0 +1,360 @@
+# ------------------------------------------------------------
+# Fake maya.api.OpenMaya on top of the in-memory DAG
+# ------------------------------------------------------------
+import math
+
+from maya import _scene
+from maya._scene import SCENE
+
+
+class MSpace(object):
+    kInvalid = 0
+    kTransform = 1
+    kPreTransform = 2
+    kPostTransform = 3
+    kWorld = 4
+    kObject = kPreTransform
+
+
+class MFn(object):
+    kDagNode = 107
+    kTransform = 110
+    kNurbsCurve = 267
+    kLocator = 281
+
+    _TYPES = {"transform": kTransform, "joint": kTransform, "nurbsCurve": kNurbsCurve, "locator": kLocator}
+
+
+class MObject(object):
+    def __init__(self, node=None):
+        self.node = node
+
+    def isNull(self):
+        return self.node is None
+
+    def hasFn(self, fn_type):
+        if fn_type == MFn.kDagNode:
+            return self.node is not None and self.node.dag
+        return self.node is not None and MFn._TYPES.get(self.node.type) == fn_type
+
+
+MObject.kNullObj = MObject()
+
+
+class MMatrix(object):
+    def __init__(self, values=None):
+        self.values = list(values) if values is not None else _scene.identity()
+
+    def __mul__(self, other):
+        return MMatrix(_scene.mult(self.values, other.values))
+
+    def inverse(self):
+        return MMatrix(_scene.inverse(self.values))
+
+    def __getitem__(self, index):
+        return self.values[index]
+
+    def __len__(self):
+        return 16
+
+
+class MVector(object):
+    def __init__(self, x=0.0, y=0.0, z=0.0):
+        if hasattr(x, "x"):
+            x, y, z = x.x, x.y, x.z
+        self.x, self.y, self.z = float(x), float(y), float(z)
+
+    def __add__(self, other):
+        return MVector(self.x + other.x, self.y + other.y, self.z + other.z)
+
+    def __sub__(self, other):
+        return MVector(self.x - other.x, self.y - other.y, self.z - other.z)
+
+    def __mul__(self, other):
+        if isinstance(other, MMatrix):
+            return MVector(*_scene.transform_vector((self.x, self.y, self.z), other.values))
+        return MVector(self.x * other, self.y * other, self.z * other)
+
+    def __iter__(self):
+        return iter((self.x, self.y, self.z))
+
+
+class MPoint(object):
+    def __init__(self, x=0.0, y=0.0, z=0.0, w=1.0):
+        if hasattr(x, "x"):
+            x, y, z = x.x, x.y, x.z
+        self.x, self.y, self.z, self.w = float(x), float(y), float(z), float(w)
+
+    def __sub__(self, other):
+        if isinstance(other, MPoint):
+            return MVector(self.x - other.x, self.y - other.y, self.z - other.z)
+        return MPoint(self.x - other.x, self.y - other.y, self.z - other.z)
+
+    def __add__(self, other):
+        return MPoint(self.x + other.x, self.y + other.y, self.z + other.z)
+
+    def __mul__(self, other):
+        if isinstance(other, MMatrix):
+            return MPoint(*_scene.transform_point((self.x, self.y, self.z), other.values))
+        return MPoint(self.x * other, self.y * other, self.z * other)
+
+    def __iter__(self):
+        return iter((self.x, self.y, self.z))
+
+
+class MPointArray(list):
+    pass
+
+
+class MDoubleArray(list):
+    pass
+
+
+class MEulerRotation(object):
+    kXYZ = 0
+
+    def __init__(self, x=0.0, y=0.0, z=0.0, order=0):
+        self.x, self.y, self.z, self.order = x, y, z, order
+
+    def reorderIt(self, order):
+        self.order = order
+        return self
+
+    def asQuaternion(self):
+        return MQuaternion(_scene.rotate_matrix([math.degrees(a) for a in (self.x, self.y, self.z)]))
+
+
+class MQuaternion(object):
+    # kept as its rotation matrix, the stand-in only needs products and xyz angles
+    def __init__(self, matrix=None):
+        self.matrix = matrix or _scene.identity()
+
+    def __mul__(self, other):
+        return MQuaternion(_scene.mult(self.matrix, other.matrix))
+
+    def asMatrix(self):
+        return MMatrix(self.matrix)
+
+    def asEulerRotation(self):
+        return MEulerRotation(*_scene.euler_from_matrix(self.matrix))
+
+
+class MTransformationMatrix(object):
+    kXYZ = 1
+
+    def __init__(self, matrix=None):
+        self.matrix = matrix.values if isinstance(matrix, MMatrix) else _scene.identity()
+
+    def translation(self, space=MSpace.kTransform):
+        return MVector(self.matrix[12], self.matrix[13], self.matrix[14])
+
+    def reorderRotation(self, order):
+        # the stand-in only evaluates xyz
+        return self
+
+    def rotation(self, asQuaternion=False):
+        return MEulerRotation(*_scene.euler_from_matrix(self.matrix))
+
+
+class MDagPath(object):
+    def __init__(self, node=None):
+        self.node_ = node.node_ if isinstance(node, MDagPath) else node
+
+    def hasFn(self, fn_type):
+        return MFn._TYPES.get(self.node_.type) == fn_type
+
+    def apiType(self):
+        return MFn._TYPES.get(self.node_.type, 0)
+
+    def _shapes(self):
+        return [c for c in self.node_.children if _scene.DAG_TYPES.get(c.type) == "shape"]
+
+    def numberOfShapesDirectlyBelow(self):
+        return len(self._shapes())
+
+    def extendToShape(self, index=0):
+        self.node_ = self._shapes()[index]
+        return self
+
+    def node(self):
+        return MObject(self.node_)
+
+    def inclusiveMatrix(self):
+        return MMatrix(SCENE.world_matrix(self.node_))
+
+    def exclusiveMatrix(self):
+        return MMatrix(SCENE.parent_matrix(self.node_))
+
+    def exclusiveMatrixInverse(self):
+        return MMatrix(_scene.inverse(SCENE.parent_matrix(self.node_)))
+
+    def inclusiveMatrixInverse(self):
+        return MMatrix(_scene.inverse(SCENE.world_matrix(self.node_)))
+
+    def partialPathName(self):
+        return SCENE.partial_name(self.node_)
+
+    def fullPathName(self):
+        return SCENE.long_name(self.node_)
+
+
+class MSelectionList(object):
+    def __init__(self):
+        self.items = []
+
+    def add(self, item):
+        node = SCENE.get(item) if isinstance(item, str) else item.node_
+        if node not in self.items:
+            self.items.append(node)
+        return self
+
+    def length(self):
+        return len(self.items)
+
+    def getDagPath(self, index):
+        return MDagPath(self.items[index])
+
+    def getDependNode(self, index):
+        return MObject(self.items[index])
+
+
+def _node_of(obj):
+    if isinstance(obj, MDagPath):
+        return obj.node_
+    return obj.node
+
+
+class MFnDependencyNode(object):
+    def __init__(self, obj=None):
+        self.node_ = _node_of(obj) if obj is not None else None
+
+    def name(self):
+        return self.node_.name
+
+    def setName(self, name):
+        SCENE.rename(self.node_, name)
+        return self.node_.name
+
+    def setDoNotWrite(self, value):
+        self.node_.do_not_write = bool(value)
+
+
+class MFnDagNode(MFnDependencyNode):
+    @property
+    def isIntermediateObject(self):
+        return bool(self.node_.attrs.get("intermediateObject", False))
+
+    def partialPathName(self):
+        return SCENE.partial_name(self.node_)
+
+    def fullPathName(self):
+        return SCENE.long_name(self.node_)
+
+
+class MFnTransform(MFnDagNode):
+    def rotatePivot(self, space):
+        if space == MSpace.kWorld:
+            return MPoint(*SCENE.world_pivot(self.node_))
+        return MPoint(*self.node_.attrs["rp"])
+
+    def translation(self, space):
+        return MVector(*self.node_.attrs["t"])
+
+    def rotationOrder(self):
+        return MTransformationMatrix.kXYZ
+
+    def rotation(self, space=MSpace.kTransform, asQuaternion=False):
+        if asQuaternion:
+            return MQuaternion(_scene.rotate_matrix(self.node_.attrs["r"]))
+        return MEulerRotation(*[math.radians(a) for a in self.node_.attrs["r"]])
+
+    def rotateOrientation(self, space):
+        return MQuaternion(_scene.rotate_matrix(self.node_.attrs["ra"]))
+
+    def scale(self):
+        return list(self.node_.attrs["s"])
+
+    def scalePivot(self, space):
+        return MPoint(*self.node_.attrs["sp"])
+
+    def setRotatePivot(self, point, space, balance=True):
+        self.node_.attrs["rp"] = (point.x, point.y, point.z)
+
+    def setScalePivot(self, point, space, balance=True):
+        self.node_.attrs["sp"] = (point.x, point.y, point.z)
+
+    def setTranslation(self, vector, space):
+        self.node_.attrs["t"] = (vector.x, vector.y, vector.z)
+
+    def setRotation(self, rotation, space):
+        self.node_.attrs["r"] = tuple(math.degrees(a) for a in (rotation.x, rotation.y, rotation.z))
+
+    def setScale(self, scale):
+        self.node_.attrs["s"] = tuple(float(v) for v in scale)
+
+
+class MFnNurbsCurve(MFnDagNode):
+    kOpen = 1
+    kClosed = 2
+    kPeriodic = 3
+
+    @property
+    def degree(self):
+        return self.node_.attrs["degree"]
+
+    @property
+    def form(self):
+        return self.node_.attrs["form"] + 1
+
+    @property
+    def numCVs(self):
+        return len(self.node_.attrs["cvs"])
+
+    @property
+    def numSpans(self):
+        return len(self.node_.attrs["cvs"]) - self.node_.attrs["degree"]
+
+    def knots(self):
+        return MDoubleArray(self.node_.attrs["knots"])
+
+    def cvPositions(self, space=MSpace.kObject):
+        return MPointArray(MPoint(*cv) for cv in self.node_.attrs["cvs"])
+
+    def create(self, cvs, knots, degree, form, is2D, rational, parent=MObject.kNullObj):
+        parent_node = parent.node
+        if parent_node is None:
+            parent_node = SCENE.create("transform", "curve1")
+        shape = SCENE.create("nurbsCurve", parent_node.name + "Shape", parent_node)
+        shape.attrs.update({
+            "degree": degree,
+            "form": form - 1,
+            "knots": list(knots),
+            "cvs": [(p.x, p.y, p.z) for p in cvs],
+        })
+        self.node_ = shape
+        return MObject(shape)
+
+
+class MDGModifier(object):
+    def __init__(self):
+        self.renames = []
+
+    def createNode(self, node_type):
+        return MObject(SCENE.create(node_type))
+
+    def renameNode(self, obj, name):
+        SCENE.rename(obj.node, name)
+
+    def doIt(self):
+        pass
+
+    def undoIt(self):
+        pass
+
+
+class MDagModifier(MDGModifier):
+    def createNode(self, node_type, parent=MObject.kNullObj):
+        return MObject(SCENE.create(node_type, None, parent.node))
+
+    def reparentNode(self, obj, parent=MObject.kNullObj):
+        SCENE.reparent(obj.node, parent.node)
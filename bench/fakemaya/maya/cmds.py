@@ -0,0 +1,573 @@
+# ------------------------------------------------------------
+# Fake maya.cmds on top of the in-memory DAG
+# ------------------------------------------------------------
+# Only the flags CurveForRigging uses are implemented. Unknown flags are
+# ignored, missing objects raise like Maya does.
+import fnmatch
+import os
+import sys
+
+from maya import _scene
+from maya._scene import SCENE, is_a
+
+_here = os.path.dirname(os.path.abspath(__file__))
+_package_root = os.path.abspath(os.path.join(_here, "..", "..", ".."))
+if _package_root not in sys.path:
+    sys.path.append(_package_root)
+
+import cfrShapes
+
+WARNINGS = []
+UNDO = {"chunks": 0, "open": 0}
+_script_jobs = {}
+_ATTR_ALIASES = {
+    "translate": "t", "rotate": "r", "scale": "s",
+    "rotatePivot": "rp", "scalePivot": "sp", "visibility": "v", "jointOrient": "jo",
+    "rotateAxis": "ra",
+    "opm": "offsetParentMatrix",
+}
+_AXIS = {"x": 0, "y": 1, "z": 2, "X": 0, "Y": 1, "Z": 2}
+
+
+def _flag(kwargs, *names, default=None):
+    for name in names:
+        if name in kwargs:
+            return kwargs[name]
+    return default
+
+
+def _flatten(args):
+    result = []
+    for arg in args:
+        if arg is None:
+            continue
+        if isinstance(arg, (list, tuple)):
+            result.extend(_flatten(arg))
+        else:
+            result.append(arg)
+    return result
+
+
+def _nodes(args, missing_ok=False):
+    result = []
+    for name in _flatten(args):
+        if any(c in name for c in "*?["):
+            # "*.attr" lists the nodes that have attr (ls -o)
+            pattern, _, attr = name.partition(".")
+            result.extend(n for n in SCENE.all_nodes() if fnmatch.fnmatchcase(n.name, pattern)
+                          and (not attr or attr in n.dynamic or attr in n.attrs))
+            continue
+        found = SCENE.find(name)
+        if not found and not missing_ok:
+            raise ValueError(f"No object matches name: {name}")
+        result.extend(found)
+    return result
+
+
+def _out(nodes, long=False):
+    return [SCENE.long_name(n) if long else SCENE.partial_name(n) for n in nodes]
+
+
+def _split_attr(plug):
+    node_name, _, attr = plug.partition(".")
+    node = SCENE.get(node_name)
+    attr = _ATTR_ALIASES.get(attr, attr)
+    return node, attr
+
+
+# ------------------------------------------------------------
+# queries
+# ------------------------------------------------------------
+def ls(*args, **kwargs):
+    if args and args[0] is None:
+        return []
+    if args:
+        nodes = _nodes(args, missing_ok=True)
+    elif _flag(kwargs, "selection", "sl"):
+        nodes = list(SCENE.selection)
+    else:
+        nodes = SCENE.all_nodes()
+
+    if _flag(kwargs, "dag"):
+        nodes = [n for n in nodes if n.dag]
+    if _flag(kwargs, "transforms", "tr"):
+        nodes = [n for n in nodes if is_a(n.type, "transform")]
+    node_type = _flag(kwargs, "type", "typ")
+    if node_type:
+        types = node_type if isinstance(node_type, (list, tuple)) else [node_type]
+        nodes = [n for n in nodes if any(is_a(n.type, t) for t in types)]
+
+    seen = set()
+    unique = []
+    for n in nodes:
+        if id(n) not in seen:
+            seen.add(id(n))
+            unique.append(n)
+    return _out(unique, _flag(kwargs, "long", "l", default=False))
+
+
+def objExists(name):
+    return bool(SCENE.find(name))
+
+
+def objectType(name, isType=None):
+    node_type = SCENE.get(name).type
+    if isType is not None:
+        return node_type == isType
+    return node_type
+
+
+def listRelatives(*args, **kwargs):
+    nodes = _nodes(args)
+    full = _flag(kwargs, "fullPath", "f", "path", default=False)
+    result = []
+    for node in nodes:
+        if _flag(kwargs, "parent", "p"):
+            if node.parent is not None:
+                result.append(node.parent)
+        elif _flag(kwargs, "allDescendents", "ad"):
+            result.extend(reversed(SCENE.descendants(node)))
+        elif _flag(kwargs, "shapes", "s"):
+            result.extend(c for c in node.children if is_a(c.type, "shape"))
+        else:
+            result.extend(node.children)
+
+    node_type = _flag(kwargs, "type", "typ")
+    if node_type:
+        types = node_type if isinstance(node_type, (list, tuple)) else [node_type]
+        result = [n for n in result if any(is_a(n.type, t) for t in types)]
+    return _out(result, full) or None
+
+
+def _plug_matches(node, attr, conn_node, conn_attr):
+    # "node.controls" matches the elements "controls[0]", "controls[1]" ...
+    if conn_node is not node:
+        return False
+    if not attr or "[" in attr:
+        return not attr or conn_attr == attr
+    return conn_attr.split("[", 1)[0] == attr
+
+
+def listConnections(*args, **kwargs):
+    source = _flag(kwargs, "source", "s", default=True)
+    destination = _flag(kwargs, "destination", "d", default=True)
+    plugs = _flag(kwargs, "plugs", "p", default=False)
+    connections = _flag(kwargs, "connections", "c", default=False)
+    node_type = _flag(kwargs, "type", "t")
+    result = []
+    for plug in _flatten(args):
+        node, _, attr = plug.partition(".")
+        node = SCENE.get(node)
+        attr = _ATTR_ALIASES.get(attr, attr)
+        for src_node, src_attr, dst_node, dst_attr in SCENE.connections:
+            if not (src_node.alive and dst_node.alive):
+                continue
+            if destination and _plug_matches(node, attr, src_node, src_attr):
+                own_attr, other, other_attr = src_attr, dst_node, dst_attr
+            elif source and _plug_matches(node, attr, dst_node, dst_attr):
+                own_attr, other, other_attr = dst_attr, src_node, src_attr
+            else:
+                continue
+            if node_type and not is_a(other.type, node_type):
+                continue
+            if connections:
+                # -c lists this node's plug before every connected one
+                result.append(f"{SCENE.partial_name(node)}.{own_attr}")
+            name = SCENE.partial_name(other)
+            result.append(f"{name}.{other_attr}" if plugs else name)
+    return result or None
+
+
+# ------------------------------------------------------------
+# attributes
+# ------------------------------------------------------------
+def setAttr(plug, *values, **kwargs):
+    node, attr = _split_attr(plug)
+    if len(attr) == 2 and attr[0] in "trs" and attr[1] in _AXIS:
+        current = list(node.attrs[attr[0]])
+        current[_AXIS[attr[1]]] = float(values[0])
+        node.attrs[attr[0]] = tuple(current)
+    elif _flag(kwargs, "type") == "string":
+        node.attrs[attr] = values[0]
+    elif len(values) == 1 and isinstance(values[0], (list, tuple)):
+        node.attrs[attr] = tuple(float(v) for v in values[0])
+    elif len(values) > 1:
+        node.attrs[attr] = tuple(float(v) for v in values)
+    else:
+        node.attrs[attr] = values[0]
+
+
+def getAttr(plug, **kwargs):
+    node, attr = _split_attr(plug)
+    if len(attr) == 2 and attr[0] in "trs" and attr[1] in _AXIS:
+        return node.attrs[attr[0]][_AXIS[attr[1]]]
+    if attr == "worldMatrix":
+        return SCENE.world_matrix(node)
+    if attr == "matrix":
+        return SCENE.local_matrix(node)
+    value = node.attrs[attr]
+    if isinstance(value, tuple) and len(value) == 3:
+        return [value]
+    return value
+
+
+def attributeQuery(attr, node=None, exists=False, **kwargs):
+    target = SCENE.get(node)
+    attr = _ATTR_ALIASES.get(attr, attr)
+    return attr in target.attrs or attr in target.dynamic
+
+
+def addAttr(node, longName=None, ln=None, attributeType=None, at=None, dataType=None, dt=None, **kwargs):
+    target = SCENE.get(node)
+    name = longName or ln
+    target.dynamic[name] = attributeType or at or dataType or dt
+    target.attrs.setdefault(name, "" if (dataType or dt) == "string" else None)
+
+
+def connectAttr(src, dst, force=False, f=False, nextAvailable=False, na=False):
+    src_node, src_attr = _split_attr(src)
+    dst_node, dst_attr = _split_attr(dst)
+    if nextAvailable or na:
+        used = [c for c in SCENE.connections if c[2] is dst_node and c[3].split("[", 1)[0] == dst_attr]
+        dst_attr = f"{dst_attr}[{len(used)}]"
+    elif any(c[2] is dst_node and c[3] == dst_attr for c in SCENE.connections):
+        if not (force or f):
+            raise RuntimeError(f"{dst} already has an incoming connection")
+        SCENE.connections[:] = [c for c in SCENE.connections if not (c[2] is dst_node and c[3] == dst_attr)]
+    SCENE.connections.append((src_node, src_attr, dst_node, dst_attr))
+
+
+def disconnectAttr(src, dst):
+    src_node, src_attr = _split_attr(src)
+    dst_node, dst_attr = _split_attr(dst)
+    SCENE.connections[:] = [c for c in SCENE.connections if c != (src_node, src_attr, dst_node, dst_attr)]
+
+
+# ------------------------------------------------------------
+# creation / editing
+# ------------------------------------------------------------
+def createNode(node_type, name=None, n=None, parent=None, p=None, skipSelect=False, ss=False):
+    parent_node = SCENE.get(parent or p) if (parent or p) else None
+    node = SCENE.create(node_type, name or n, parent_node)
+    return SCENE.partial_name(node)
+
+
+def curve(d=3, degree=None, p=None, point=None, k=None, knot=None, per=False, periodic=False, n=None, name=None, **kwargs):
+    points = p or point or []
+    degree = degree or d
+    transform = SCENE.create("transform", name or n or None)
+    if not (name or n):
+        SCENE.rename(transform, "curve1")
+    shape = SCENE.create("nurbsCurve", transform.name + "Shape", transform)
+    shape.attrs.update({
+        "degree": degree,
+        "form": 2 if (per or periodic) else 0,
+        "knots": list(k or knot or []),
+        "cvs": [tuple(float(v) for v in cv) for cv in points],
+    })
+    return SCENE.partial_name(transform)
+
+
+def rename(node, new_name, **kwargs):
+    target = SCENE.get(node)
+    SCENE.rename(target, new_name)
+    return SCENE.partial_name(target)
+
+
+def parent(*args, **kwargs):
+    args = _flatten(args)
+    to_world = _flag(kwargs, "world", "w", default=False)
+    if to_world:
+        children, new_parent = _nodes(args), None
+    else:
+        children, new_parent = _nodes(args[:-1]), SCENE.get(args[-1])
+
+    shape = _flag(kwargs, "shape", "s", default=False)
+    relative = _flag(kwargs, "relative", "r", default=False)
+    for child in children:
+        if not shape and not relative:
+            # keep the world position (translation only)
+            before = SCENE.world_pivot(child)
+            SCENE.reparent(child, new_parent)
+            after = SCENE.world_pivot(child)
+            child.attrs["t"] = tuple(t + b - a for t, b, a in zip(child.attrs["t"], before, after))
+        else:
+            SCENE.reparent(child, new_parent)
+    return _out(children)
+
+
+def duplicate(*args, **kwargs):
+    result = []
+
+    def copy(node, new_parent):
+        new = SCENE.create(node.type, node.name, new_parent)
+        new.attrs = {k: (list(v) if isinstance(v, list) else v) for k, v in node.attrs.items()}
+        new.dynamic = dict(node.dynamic)
+        for child in node.children:
+            copy(child, new)
+        return new
+
+    for node in _nodes(args):
+        result.append(copy(node, node.parent))
+    return _out(result)
+
+
+def delete(*args, **kwargs):
+    nodes = _nodes(args)
+    if _flag(kwargs, "constructionHistory", "ch"):
+        for node in nodes:
+            for target in [node] + SCENE.descendants(node):
+                for hist in target.history:
+                    SCENE.delete(hist)
+                target.history = []
+        return
+    for node in nodes:
+        SCENE.delete(node)
+
+
+def makeIdentity(*args, **kwargs):
+    if not _flag(kwargs, "apply", "a"):
+        return
+    freeze_t = _flag(kwargs, "translate", "t", default=True)
+    freeze_r = _flag(kwargs, "rotate", "r", default=True)
+    freeze_s = _flag(kwargs, "scale", "s", default=True)
+
+    for root in _nodes(args):
+        targets = [n for n in [root] + SCENE.descendants(root) if is_a(n.type, "transform")]
+        shapes = [n for n in [root] + SCENE.descendants(root) if "cvs" in n.attrs]
+        before = {id(s): SCENE.world_matrix(s.parent) for s in shapes}
+
+        for node in targets:
+            a = node.attrs
+            if freeze_t:
+                a["rp"] = tuple(p + t for p, t in zip(a["rp"], a["t"]))
+                a["sp"] = tuple(p + t for p, t in zip(a["sp"], a["t"]))
+                a["t"] = (0.0, 0.0, 0.0)
+            if freeze_r:
+                a["r"] = (0.0, 0.0, 0.0)
+            if freeze_s:
+                a["s"] = (1.0, 1.0, 1.0)
+
+        for shape in shapes:
+            delta = _scene.mult(before[id(shape)], _scene.inverse(SCENE.world_matrix(shape.parent)))
+            shape.attrs["cvs"] = [_scene.transform_point(cv, delta) for cv in shape.attrs["cvs"]]
+
+
+def pointConstraint(*args, **kwargs):
+    names = _flatten(args)
+    target, constrained = SCENE.get(names[0]), SCENE.get(names[-1])
+    goal = SCENE.world_pivot(target)
+    pivot = SCENE.world_pivot(constrained)
+    inverse_parent = _scene.inverse(SCENE.parent_matrix(constrained))
+    delta = _scene.transform_vector([g - p for g, p in zip(goal, pivot)], inverse_parent)
+    constrained.attrs["t"] = tuple(t + d for t, d in zip(constrained.attrs["t"], delta))
+    node = SCENE.create("pointConstraint", constrained.name + "_pointConstraint1", constrained)
+    return [SCENE.partial_name(node)]
+
+
+def xform(*args, **kwargs):
+    node = _nodes(args)[0]
+    if _flag(kwargs, "query", "q"):
+        if _flag(kwargs, "rotatePivot", "rp") and _flag(kwargs, "worldSpace", "ws"):
+            return list(SCENE.world_pivot(node))
+        if _flag(kwargs, "matrix", "m") and _flag(kwargs, "worldSpace", "ws"):
+            return SCENE.world_matrix(node)
+        if _flag(kwargs, "matrix", "m"):
+            return SCENE.local_matrix(node)
+        if _flag(kwargs, "translation", "t"):
+            return list(node.attrs["t"])
+        return None
+    for flag, attr in (("translation", "t"), ("t", "t"), ("rotation", "r"), ("ro", "r"),
+                       ("scale", "s"), ("s", "s"), ("rotatePivot", "rp"), ("rp", "rp")):
+        if flag in kwargs:
+            node.attrs[attr] = tuple(float(v) for v in kwargs[flag])
+
+
+def select(*args, **kwargs):
+    if _flag(kwargs, "clear", "cl"):
+        SCENE.selection = []
+        return
+    nodes = _nodes(args)
+    if _flag(kwargs, "add"):
+        SCENE.selection.extend(n for n in nodes if n not in SCENE.selection)
+    else:
+        SCENE.selection = nodes
+
+
+def joint(*args, **kwargs):
+    parent_node = SCENE.selection[0] if SCENE.selection and SCENE.selection[0].type == "joint" else None
+    node = SCENE.create("joint", _flag(kwargs, "name", "n"), parent_node)
+    position = _flag(kwargs, "position", "p")
+    if position:
+        world = _scene.transform_point(position, _scene.inverse(SCENE.parent_matrix(node)))
+        node.attrs["t"] = world
+    SCENE.selection = [node]
+    return SCENE.partial_name(node)
+
+
+# ------------------------------------------------------------
+# namespaces
+# ------------------------------------------------------------
+def namespace(*args, **kwargs):
+    if _flag(kwargs, "exists", "ex"):
+        name = kwargs.get("exists") or kwargs.get("ex")
+        return name.strip(":") in SCENE.namespaces
+    remove = _flag(kwargs, "removeNamespace", "rm")
+    if remove:
+        name = remove.strip(":")
+        if _flag(kwargs, "mergeNamespaceWithRoot", "mnr"):
+            for node in SCENE.all_nodes():
+                if node.name.startswith(name + ":"):
+                    SCENE.rename(node, node.name[len(name) + 1:])
+        elif _flag(kwargs, "deleteNamespaceContent", "dnc"):
+            for node in SCENE.all_nodes():
+                if node.name.startswith(name + ":") and node.alive:
+                    SCENE.delete(node)
+        elif any(n.name.startswith(name + ":") for n in SCENE.all_nodes()):
+            raise RuntimeError(f"Namespace '{name}' is not empty")
+        SCENE.namespaces.discard(name)
+        return
+    add = _flag(kwargs, "add")
+    if add:
+        SCENE.namespaces.add(add.strip(":"))
+        return add
+
+
+def referenceQuery(node, isNodeReferenced=False, inr=False, **kwargs):
+    # the fake scene never loads references
+    SCENE.get(node)
+    return False
+
+
+def namespaceInfo(*args, **kwargs):
+    if _flag(kwargs, "listOnlyNamespaces", "lon"):
+        return sorted(SCENE.namespaces) or None
+    return None
+
+
+# ------------------------------------------------------------
+# file
+# ------------------------------------------------------------
+_SKIP_IMPORT = {"lightLinker", "shapeEditorManager", "poseInterpolatorManager",
+                "displayLayerManager", "renderLayerManager", "camera"}
+_DEFAULT_NODES = {"defaultLayer", "defaultRenderLayer", "layerManager", "renderLayerManager",
+                  "lightLinker1", "shapeEditorManager", "poseInterpolatorManager"}
+
+
+def _import_ma(path, namespace_name):
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        text = f.read()
+
+    prefix = f"{namespace_name}:" if namespace_name else ""
+    if namespace_name:
+        SCENE.namespaces.add(namespace_name)
+
+    created = {}
+    inputs = {}
+    for tokens in cfrShapes._statements(text):
+        if tokens[0] == "connectAttr" and len(tokens) >= 3:
+            src = cfrShapes._unquote(tokens[1]).split(".", 1)[0]
+            dst = cfrShapes._unquote(tokens[2]).split(".", 1)[0]
+            inputs[dst] = src
+            continue
+        if tokens[0] != "createNode":
+            continue
+        info = cfrShapes._parse_create_node(tokens)
+        if info["shared"] or info["type"] in _SKIP_IMPORT or info["name"] in _DEFAULT_NODES:
+            continue
+        parent_node = created.get(info["parent"])
+        created[info["name"]] = SCENE.create(info["type"], prefix + info["name"], parent_node)
+
+    # curve geometry comes from the pure-Python parser (history evaluated)
+    shape = cfrShapes.parse_ma_text(text, os.path.basename(path))
+    for xform in shape["transforms"]:
+        node = created.get(xform["name"])
+        if node is None:
+            continue
+        node.attrs.update({k: tuple(xform[k]) for k in ("t", "r", "s", "rp", "sp")})
+        for data in xform["curves"]:
+            curve_node = created.get(data["name"])
+            if curve_node is not None:
+                curve_node.attrs.update({k: data[k] for k in ("degree", "form", "knots", "cvs")})
+
+    # history nodes hang off the shapes they feed
+    for name, node in created.items():
+        if node.type != "nurbsCurve":
+            continue
+        source = inputs.get(name)
+        while source in created:
+            node.history.append(created[source])
+            source = inputs.get(source)
+
+    return list(created.values())
+
+
+def file(*args, **kwargs):
+    path = args[0] if args else None
+    if kwargs.get("new"):
+        SCENE.reset()
+        _fire("NewSceneOpened")
+        return None
+    if _flag(kwargs, "query", "q"):
+        return SCENE.__dict__.get("file_name", "")
+    if _flag(kwargs, "rename"):
+        SCENE.file_name = kwargs["rename"]
+        return SCENE.file_name
+    if _flag(kwargs, "save"):
+        return SCENE.__dict__.get("file_name", "")
+    if _flag(kwargs, "open", "o"):
+        SCENE.reset()
+        SCENE.file_name = path
+        if path and os.path.exists(path) and path.endswith(".ma"):
+            _import_ma(path, None)
+        _fire("SceneOpened")
+        return path
+    if _flag(kwargs, "i", "import"):
+        if not os.path.exists(path):
+            raise RuntimeError(f"File not found: {path}")
+        nodes = _import_ma(path, _flag(kwargs, "namespace", "ns"))
+        if _flag(kwargs, "returnNewNodes", "rnn"):
+            return [SCENE.long_name(n) for n in nodes]
+        return path
+    return None
+
+
+# ------------------------------------------------------------
+# misc
+# ------------------------------------------------------------
+def warning(message):
+    WARNINGS.append(message)
+
+
+def undoInfo(*args, **kwargs):
+    if _flag(kwargs, "openChunk", "ock"):
+        UNDO["open"] += 1
+        UNDO["chunks"] += 1
+    elif _flag(kwargs, "closeChunk", "cck"):
+        UNDO["open"] -= 1
+    return True
+
+
+def refresh(*args, **kwargs):
+    pass
+
+
+def scriptJob(*args, **kwargs):
+    if "exists" in kwargs:
+        return kwargs["exists"] in _script_jobs
+    if "kill" in kwargs:
+        _script_jobs.pop(kwargs["kill"], None)
+        return None
+    event = kwargs.get("event") or kwargs.get("e")
+    if event:
+        job = max(_script_jobs, default=0) + 1
+        _script_jobs[job] = tuple(event)
+        return job
+    return None
+
+
+def _fire(event_name):
+    for event, callback in list(_script_jobs.values()):
+        if event == event_name:
+            callback()
+
@@ -0,0 +1,255 @@
+# ------------------------------------------------------------
+# Hot-path benchmark on the in-memory maya stand-in
+# ------------------------------------------------------------
+# python bench/run_bench.py [--quick] [--repeat N] [--tolerance 0.25]
+#                           [--save-baseline] [--phases]
+#
+# Runs import_curve/finalize_curve and every creation backend against
+# bench/fakemaya, without Maya, and measures per-control latency and
+# allocations as the scene grows (1k, 10k, 100k nodes) and as the batch
+# grows (auto_rig on a synthetic skeleton).
+#
+# Every run is written to bench/results/ and compared against the
+# committed bench/baseline.json; the script exits with 1 when a case got
+# worse than the tolerance allows. Allocations are measured in a fixed
+# scene state and gate every run on the same Python version. Latency
+# depends on the machine and only gates runs on the machine (and Python)
+# that recorded the baseline, elsewhere it is just reported.
+#
+# A change that is expected to cost more is re-baselined on purpose:
+# run with --save-baseline and commit bench/baseline.json with the
+# change, saying why in the commit. Without a baseline nothing is
+# adopted silently, the run fails until one is saved. --phases adds a
+# cfrProfile breakdown of a separate, profiled run (profiling is off
+# while the numbers above are taken).
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+bench_path = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(bench_path, "fakemaya"))
+sys.path.insert(1, os.path.dirname(bench_path))
+
+import maya.cmds as cmds
+import cfrProfile
+import cfrUtil
+
+results_folder = os.path.join(bench_path, "results")
+baseline_path = os.path.join(bench_path, "baseline.json")
+
+SCENE_SIZES = (1000, 10000, 100000)
+BATCH_SIZES = (10, 50, 200)
+SKELETON_NAMES = ("root", "pelvis", "clavicle", "elbow", "wrist", "finger", "hip", "knee", "foot", "head")
+
+# latency is noisy, allocations are not: only flag clear regressions
+MIN_REGRESSION_MS = 0.05
+
+
+# ------------------------------------------------------------
+# SCENES
+# ------------------------------------------------------------
+def fill_scene(size):
+    cmds.file(new=True, force=True)
+    cfrUtil.clear_cache(delete_templates=False)
+    for i in range(size):
+        cmds.createNode("transform", n=f"bench_{i}", skipSelect=True)
+    cmds.select(clear=True)
+    return cmds.joint(n="bench_wrist_jnt", p=(5.0, 10.0, 0.0))
+
+
+def build_skeleton(count, limb_length=5):
+    # short limbs under one root, like a character, so depth stays realistic
+    cmds.select(clear=True)
+    root = cmds.joint(n="bench_root_jnt")
+    for i in range(count - 1):
+        if i % limb_length == 0:
+            cmds.select(root)
+        name = SKELETON_NAMES[i % len(SKELETON_NAMES)]
+        cmds.joint(n=f"b{i}_{name}_jnt", p=(float(i // limb_length), float(i % limb_length), 0.0))
+    return root
+
+
+# ------------------------------------------------------------
+# CASES
+# ------------------------------------------------------------
+def legacy_case(joint):
+    imported = cfrUtil.import_curve("wrist.ma")
+    cfrUtil.finalize_curve(imported, "Wrist_CTRL", 17, joint)
+
+
+def backend_case(backend):
+    def case(joint):
+        cfrUtil.set_backend(backend)
+        cfrUtil.create_ctrl("arm", "Wrist", joint)
+    return case
+
+
+SINGLE_CASES = [("legacy_import_finalize", legacy_case)]
+SINGLE_CASES += [(f"create_ctrl[{backend}]", backend_case(backend)) for backend in cfrUtil.BACKENDS]
+
+
+def measure(func, repeat):
+    # one warm-up call so caches are in the state a user sees after the first click
+    func()
+
+    # allocations right after the warm-up: the scene is the same size on
+    # every run, whatever --repeat is, so the numbers are reproducible
+    gc.collect()
+    tracemalloc.start()
+    func()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+
+    return {
+        "ms": samples[len(samples) // 2] * 1000.0,
+        "min_ms": samples[0] * 1000.0,
+        "alloc_kb": current / 1024.0,
+        "peak_kb": peak / 1024.0,
+    }
+
+
+def run(scene_sizes, batch_sizes, repeat):
+    results = {}
+
+    for size in scene_sizes:
+        for case_name, case in SINGLE_CASES:
+            joint = fill_scene(size)
+            results[f"{case_name}@{size}"] = measure(lambda: case(joint), repeat)
+
+    for backend in cfrUtil.BACKENDS:
+        for count in batch_sizes:
+            cfrUtil.set_backend(backend)
+            fill_scene(0)
+            root = build_skeleton(count)
+            stats = measure(lambda: cfrUtil.auto_rig(root), max(1, repeat // 4))
+            # per control, so batch sizes can be compared to the single cases
+            results[f"auto_rig[{backend}]x{count}"] = {k: v / count for k, v in stats.items()}
+
+    cfrUtil.set_backend("curve")
+    return results
+
+
+# ------------------------------------------------------------
+# REPORT
+# ------------------------------------------------------------
+def gated_metrics(baseline):
+    # allocations only move with the code and the Python version, latency with the machine too
+    python = platform.python_version()
+    metrics = []
+    if baseline.get("python", "").split(".")[:2] == python.split(".")[:2]:
+        metrics.append("alloc_kb")
+        if baseline.get("machine") == platform.node() and baseline.get("python") == python:
+            metrics.append("ms")
+    return metrics
+
+
+def compare(results, baseline, tolerance, metrics=("ms", "alloc_kb")):
+    regressions = []
+    for key, stats in results.items():
+        old = baseline.get("results", {}).get(key)
+        if not old:
+            continue
+        for metric in metrics:
+            limit = old[metric] * (1.0 + tolerance)
+            if metric == "ms":
+                limit = max(limit, old[metric] + MIN_REGRESSION_MS)
+            if stats[metric] > limit:
+                regressions.append((key, metric, old[metric], stats[metric]))
+    return regressions
+
+
+def print_table(results, baseline):
+    old_results = baseline.get("results", {}) if baseline else {}
+    print(f"{'case':<40} | {'ms/ctrl':>9} | {'KiB/ctrl':>9} | {'peak KiB':>9} | {'vs base':>8}")
+    for key, stats in results.items():
+        old = old_results.get(key)
+        delta = f"{(stats['ms'] / old['ms'] - 1.0) * 100.0:+7.1f}%" if old and old["ms"] else ""
+        print(f"{key:<40} | {stats['ms']:>9.3f} | {stats['alloc_kb']:>9.1f} | {stats['peak_kb']:>9.1f} | {delta:>8}")
+
+
+def write_json(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the CurveForRigging hot path without Maya.")
+    parser.add_argument("--quick", action="store_true", help="skip the 100k scene and the largest batch")
+    parser.add_argument("--repeat", type=int, default=20, help="timed calls per case")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown before failing")
+    parser.add_argument("--save-baseline", action="store_true", help="replace bench/baseline.json with this run")
+    parser.add_argument("--phases", action="store_true", help="print a per-phase cfrProfile breakdown")
+    args = parser.parse_args(argv)
+
+    scene_sizes = SCENE_SIZES[:-1] if args.quick else SCENE_SIZES
+    batch_sizes = BATCH_SIZES[:-1] if args.quick else BATCH_SIZES
+
+    # the create functions log every step, keep the report readable
+    cfrProfile.quiet = True
+    results = run(scene_sizes, batch_sizes, args.repeat)
+
+    run_info = {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.node(),
+        "repeat": args.repeat,
+        "results": results,
+    }
+
+    if not os.path.isdir(results_folder):
+        os.makedirs(results_folder)
+    result_path = os.path.join(results_folder, time.strftime("%Y%m%d-%H%M%S") + ".json")
+    write_json(result_path, run_info)
+
+    baseline = None
+    if os.path.exists(baseline_path) and not args.save_baseline:
+        with open(baseline_path, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    print_table(results, baseline)
+    print(f"[CurveForRigging] 💾 Results saved to {result_path}")
+
+    if args.phases:
+        cfrProfile.reset()
+        cfrProfile.enable()
+        run(scene_sizes[:1], batch_sizes[:1], args.repeat)
+        cfrProfile.disable()
+        cfrProfile.report()
+
+    if args.save_baseline:
+        write_json(baseline_path, run_info)
+        print(f"[CurveForRigging] 📌 Baseline saved to {baseline_path}, commit it with the change that needs it")
+        return 0
+    if baseline is None:
+        print(f"[CurveForRigging] ❌ No baseline at {baseline_path}, save one with --save-baseline")
+        return 1
+
+    metrics = gated_metrics(baseline)
+    if "ms" not in metrics:
+        print(f"[CurveForRigging] ℹ️ Baseline is from {baseline.get('machine')} / Python {baseline.get('python')}, "
+              f"latency is only reported")
+    if not metrics:
+        print("[CurveForRigging] ⚠️ Different Python version, allocations are not compared either")
+    regressions = compare(results, baseline, args.tolerance, metrics)
+    for key, metric, old, new in regressions:
+        print(f"[CurveForRigging] ❌ {key} {metric}: {old:.3f} -> {new:.3f}")
+    if regressions:
+        return 1
+    print("[CurveForRigging] ✅ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
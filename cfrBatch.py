@@ -0,0 +1,152 @@
+# ------------------------------------------------------------
+# Headless batch build
+# ------------------------------------------------------------
+# mayapy cfrBatch.py --spec controls.json [--jobs 4] [--out-dir DIR]
+#                    [--suffix _ctrls | --in-place] [--verbose]
+#                    [--profile timings.jsonl] scene1.ma scene2.mb ...
+#
+# Opens every character file, applies the rig-control spec with the
+# cfrUtil create functions and saves the result. With --jobs > 1 the
+# files are spread over a pool of maya.standalone interpreters that each
+# initialize Maya once and then handle many files.
+#
+# Per-control messages are muted unless --verbose is given. --profile
+# appends cfrProfile timing records from every worker to a JSON-lines file.
+#
+# Spec (JSON):
+# {
+#     "backend": "curve",
+#     "snap_mode": "translate",
+#     "zero_mode": "offset_matrix",
+#     "clean_imports": true,
+#     "cleanup": true,
+#     "prune": true,
+#     "auto_rig": "root_jnt",
+#     "controls": [
+#         {"category": "arm", "shape": "Wrist", "joint": "L_wrist_jnt", "parent": "L_elbow_CTRL"},
+#         {"category": "leg", "shape": "Foot", "joint": "L_foot_jnt", "mirror": true},
+#         {"shape": "root", "name": "Main_CTRL", "color": 17, "snap_mode": "orient"}
+#     ]
+# }
+#
+# The spec is applied with cfrUtil.build_spec, so a file that already has
+# the controls only gets what changed: new entries are created, entries
+# with another shape, joint or mode are rebuilt, color and parent are set
+# in place, and controls dropped from the spec are deleted ("prune").
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+module_path = os.path.dirname(os.path.abspath(__file__))
+if module_path not in sys.path:
+    sys.path.append(module_path)
+
+FILE_TYPES = {".ma": "mayaAscii", ".mb": "mayaBinary"}
+
+
+def load_spec(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def apply_spec(spec):
+    import cfrUtil
+
+    if spec.get("backend"):
+        cfrUtil.set_backend(spec["backend"])
+    if spec.get("zero_mode"):
+        cfrUtil.zero_mode = spec["zero_mode"]
+    if "clean_imports" in spec:
+        cfrUtil.clean_imports = bool(spec["clean_imports"])
+
+    plan = cfrUtil.build_spec(spec)
+    changed = plan["built"] + [ctrl for ctrl, _, _ in plan["update"]]
+
+    if spec.get("cleanup"):
+        cfrUtil.cleanup_scene(flatten=True)
+    return changed
+
+
+def output_path(scene, out_dir=None, suffix="_ctrls", in_place=False):
+    if in_place:
+        return scene
+    root, ext = os.path.splitext(os.path.basename(scene))
+    return os.path.join(out_dir or os.path.dirname(scene), root + suffix + ext)
+
+
+# ------------------------------------------------------------
+# WORKER
+# ------------------------------------------------------------
+def init_worker(verbose=False, profile_log=None):
+    import maya.standalone
+    maya.standalone.initialize(name="python")
+
+    import cfrProfile
+    cfrProfile.quiet = not verbose
+    if profile_log:
+        cfrProfile.enable(profile_log)
+
+
+def process_file(task):
+    scene, spec, out_path = task
+    import maya.cmds as cmds
+
+    start = time.perf_counter()
+    try:
+        cmds.file(scene, open=True, force=True, prompt=False)
+        changed = apply_spec(spec)
+        cmds.file(rename=out_path)
+        cmds.file(save=True, force=True, type=FILE_TYPES.get(os.path.splitext(out_path)[1].lower(), "mayaAscii"))
+    except Exception as e:
+        return scene, False, str(e), time.perf_counter() - start
+    return scene, True, f"{len(changed)} controls built or updated -> {out_path}", time.perf_counter() - start
+
+
+def run(scenes, spec, jobs=1, out_dir=None, suffix="_ctrls", in_place=False, verbose=False, profile_log=None):
+    tasks = [(scene, spec, output_path(scene, out_dir, suffix, in_place)) for scene in scenes]
+
+    if jobs <= 1 or len(tasks) <= 1:
+        import maya.standalone
+        init_worker(verbose, profile_log)
+        try:
+            return [process_file(task) for task in tasks]
+        finally:
+            maya.standalone.uninitialize()
+
+    with multiprocessing.Pool(processes=min(jobs, len(tasks)), initializer=init_worker,
+                              initargs=(verbose, profile_log)) as pool:
+        return list(pool.imap_unordered(process_file, tasks))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build CurveForRigging controls on many character files.")
+    parser.add_argument("scenes", nargs="+", help="character files (.ma/.mb)")
+    parser.add_argument("--spec", required=True, help="JSON rig-control spec")
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="parallel mayapy workers")
+    parser.add_argument("--out-dir", help="folder for the saved files (default: next to the input)")
+    parser.add_argument("--suffix", default="_ctrls", help="added to the saved file name")
+    parser.add_argument("--in-place", action="store_true", help="overwrite the input files")
+    parser.add_argument("--verbose", action="store_true", help="print every CurveForRigging message")
+    parser.add_argument("--profile", metavar="LOG", help="append timing records (JSON lines) to LOG")
+    args = parser.parse_args(argv)
+
+    if args.out_dir and not os.path.isdir(args.out_dir):
+        os.makedirs(args.out_dir)
+
+    start = time.perf_counter()
+    results = run(args.scenes, load_spec(args.spec), args.jobs, args.out_dir, args.suffix, args.in_place,
+                  args.verbose, args.profile)
+
+    failed = 0
+    for scene, ok, message, seconds in results:
+        failed += not ok
+        print(f"[CurveForRigging] {'✅' if ok else '❌'} {scene} ({seconds:.2f}s): {message}")
+    print(f"[CurveForRigging] {len(results) - failed}/{len(results)} files in {time.perf_counter() - start:.2f}s")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
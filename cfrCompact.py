@@ -0,0 +1,272 @@
+# ------------------------------------------------------------
+# Curve library compactor
+# ------------------------------------------------------------
+# python cfrCompact.py [--dry-run] [--out-dir DIR] [file.ma ...]
+#
+# Rewrites library .ma files as minimal, deterministic Maya ASCII: only
+# the control transforms, curve and locator shapes with their own
+# setAttr lines. Cameras, script nodes (uiConfiguration /
+# sceneConfiguration MEL), layer/link managers, plugin "requires",
+# uids and machine specific fileInfo are dropped. Curve construction
+# history (makeNurbCircle, transformGeometry, .cp tweaks) is baked into
+# a plain ".cc" so the file no longer needs those nodes.
+#
+# Every file is re-parsed after compaction and only written when the
+# curves, transforms and kept attributes are identical to the original.
+# Without file arguments every .ma in curves/ is compacted in place.
+import argparse
+import os
+import sys
+
+module_path = os.path.dirname(os.path.abspath(__file__))
+if module_path not in sys.path:
+    sys.path.append(module_path)
+
+import cfrShapes
+
+curve_folder = cfrShapes.curve_folder
+
+# node types that make up a control, everything else is scene boilerplate
+KEEP_TYPES = ("transform", "nurbsCurve", "locator")
+
+# attributes rebuilt from the evaluated curve
+_CURVE_ATTRS = ("cc", "cached", "tw", "tweak")
+
+_KEEP_FILE_INFO = ("application", "product", "version")
+
+
+# ------------------------------------------------------------
+# WRITING
+# ------------------------------------------------------------
+def _num(value):
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+def _curve_lines(curve):
+    lines = [
+        '\tsetAttr ".cc" -type "nurbsCurve" ',
+        f"\t\t{curve['degree']} {curve['spans']} {curve['form']} no 3",
+        f"\t\t{len(curve['knots'])} " + " ".join(_num(k) for k in curve["knots"]),
+        f"\t\t{len(curve['cvs'])}",
+    ]
+    lines += ["\t\t" + " ".join(_num(v) for v in cv) for cv in curve["cvs"]]
+    lines.append("\t\t;")
+    return lines
+
+
+def _is_curve_attr(attr):
+    attr = attr.lstrip(".")
+    return attr.split("[", 1)[0] in _CURVE_ATTRS or attr.startswith(("cp[", "controlPoints["))
+
+
+def _kept_nodes(text):
+    # [(createNode info, [setAttr token lists])] for the control nodes, file
+    # order. info["path"] is the node's full DAG path.
+    nodes = []
+    current = None
+    header = []
+    paths, by_leaf = {}, {}
+    for tokens in cfrShapes._statements(text):
+        command = tokens[0]
+        if command == "createNode":
+            info = cfrShapes._parse_create_node(tokens)
+            if info["type"] in KEEP_TYPES and not info["shared"] and info["name"]:
+                parent = info["parent"]
+                info["path"] = cfrShapes._dag_key(info, paths, by_leaf)
+                paths[info["path"]] = info
+                info["parent"] = parent     # written back as it was
+                current = (info, [])
+                nodes.append(current)
+            else:
+                current = None
+        elif command == "setAttr" and current is not None:
+            current[1].append(tokens)
+        elif command in ("requires", "currentUnit", "fileInfo"):
+            header.append(tokens)
+            current = None
+        elif command not in ("rename", "addAttr", "lockNode"):
+            current = None
+    return header, nodes
+
+
+def compact_text(text, file_name):
+    curves = cfrShapes.evaluate_curves(text)
+    header, nodes = _kept_nodes(text)
+
+    version = "2026"
+    lines = []
+    for tokens in header:
+        command = tokens[0]
+        if command == "requires" and cfrShapes._unquote(tokens[1]) == "maya":
+            version = cfrShapes._unquote(tokens[2])
+            lines.append(" ".join(tokens) + ";")
+        elif command == "currentUnit":
+            lines.append(" ".join(tokens) + ";")
+        elif command == "fileInfo" and cfrShapes._unquote(tokens[1]) in _KEEP_FILE_INFO:
+            lines.append(" ".join(tokens) + ";")
+
+    lines = [f"//Maya ASCII {version} scene", f"//Name: {file_name}"] + lines
+
+    for info, set_attrs in nodes:
+        flags = f' -n "{info["name"]}"'
+        if info["parent"]:
+            flags += f' -p "{info["parent"]}"'
+        lines.append(f"createNode {info['type']}{flags};")
+
+        baked = info["type"] == "nurbsCurve"
+        if baked and info["path"] not in curves:
+            raise ValueError(f"{file_name}: could not evaluate curve {info['name']}")
+
+        for tokens in set_attrs:
+            attr, _, _ = cfrShapes._parse_set_attr(tokens)
+            if baked and attr and _is_curve_attr(attr):
+                continue
+            lines.append("\t" + " ".join(tokens) + ";")
+        if baked:
+            lines += _curve_lines(curves[info["path"]])
+
+    lines.append(f"// End of {file_name}")
+    return "\n".join(lines) + "\n"
+
+
+_TRANSFORM_DEFAULTS = (("t", 0.0), ("r", 0.0), ("s", 1.0), ("rp", 0.0), ("sp", 0.0))
+
+
+def shape_to_text(shape, file_name, version="2026"):
+    # a cfrShapes record written straight to the compact layout (exporter)
+    lines = [
+        f"//Maya ASCII {version} scene",
+        f"//Name: {file_name}",
+        f'requires maya "{version}";',
+        "currentUnit -l centimeter -a degree -t film;",
+        'fileInfo "application" "maya";',
+    ]
+    for xform in shape["transforms"]:
+        flags = f' -n "{xform["name"]}"'
+        if xform["parent"]:
+            flags += f' -p "{xform["parent"]}"'
+        lines.append(f"createNode transform{flags};")
+        for attr, default in _TRANSFORM_DEFAULTS:
+            values = xform[attr]
+            if any(v != default for v in values):
+                lines.append(f'\tsetAttr ".{attr}" -type "double3" ' + " ".join(_num(v) for v in values) + ";")
+
+        for curve in xform["curves"]:
+            lines.append(f'createNode nurbsCurve -n "{curve["name"]}" -p "{xform["name"]}";')
+            lines.append('\tsetAttr -k off ".v";')
+            lines += _curve_lines(curve)
+
+    lines.append(f"// End of {file_name}")
+    return "\n".join(lines) + "\n"
+
+
+def write_shapes(items):
+    # [(shape, path)]: every file is written and read back in memory
+    # first, a shape that fails leaves nothing half exported on disk
+    texts = []
+    for shape, path in items:
+        text = shape_to_text(shape, os.path.basename(path))
+        parsed = cfrShapes.parse_ma_text(text, os.path.basename(path))
+        if parsed["transforms"] != shape["transforms"]:
+            raise ValueError(f"{os.path.basename(path)}: written curves do not read back identically")
+        texts.append((path, text))
+    for path, text in texts:
+        with open(path, "w", encoding="utf-8", newline="\n") as f:
+            f.write(text)
+    return [path for path, _ in texts]
+
+
+def write_shape(shape, path):
+    return write_shapes([(shape, path)])[0]
+
+
+# ------------------------------------------------------------
+# VERIFY
+# ------------------------------------------------------------
+def _signature(text):
+    _, nodes = _kept_nodes(text)
+    result = []
+    for info, set_attrs in nodes:
+        attrs = []
+        for tokens in set_attrs:
+            attr, attr_type, values = cfrShapes._parse_set_attr(tokens)
+            if info["type"] == "nurbsCurve" and attr and _is_curve_attr(attr):
+                continue
+            attrs.append((attr, attr_type, tuple(values)))
+        result.append((info["type"], info["name"], info["parent"], tuple(attrs)))
+    return result
+
+
+def verify(original_text, compacted_text, file_name=None):
+    # returns a list of differences, empty when the files are equivalent
+    problems = []
+    old = cfrShapes.parse_ma_text(original_text, file_name)
+    new = cfrShapes.parse_ma_text(compacted_text, file_name)
+    if old != new:
+        old_names = [t["name"] for t in old["transforms"]]
+        new_names = [t["name"] for t in new["transforms"]]
+        if old_names != new_names:
+            problems.append(f"transforms differ: {old_names} != {new_names}")
+        else:
+            for a, b in zip(old["transforms"], new["transforms"]):
+                if a != b:
+                    problems.append(f"curve data differs under {a['name']}")
+
+    old_nodes = _signature(original_text)
+    new_nodes = _signature(compacted_text)
+    if old_nodes != new_nodes:
+        problems.append("control nodes or their attributes differ")
+    return problems
+
+
+def compact_file(path, out_path=None, dry_run=False):
+    # returns (old size, new size); raises ValueError when verification fails
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        text = f.read()
+
+    file_name = os.path.basename(path)
+    compacted = compact_text(text, file_name)
+    problems = verify(text, compacted, file_name)
+    if problems:
+        raise ValueError(f"{file_name}: " + "; ".join(problems))
+
+    if not dry_run:
+        with open(out_path or path, "w", encoding="utf-8", newline="\n") as f:
+            f.write(compacted)
+    return len(text.encode("utf-8")), len(compacted.encode("utf-8"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Strip scene boilerplate from CurveForRigging .ma files.")
+    parser.add_argument("files", nargs="*", help="files to compact (default: every .ma in curves/)")
+    parser.add_argument("--out-dir", help="write the compacted files here instead of in place")
+    parser.add_argument("--dry-run", action="store_true", help="only verify and report the sizes")
+    args = parser.parse_args(argv)
+
+    files = args.files or [os.path.join(curve_folder, n) for n in sorted(os.listdir(curve_folder))
+                           if n.endswith(".ma")]
+    if args.out_dir and not os.path.isdir(args.out_dir):
+        os.makedirs(args.out_dir)
+
+    failed = 0
+    total_old = total_new = 0
+    for path in files:
+        out_path = os.path.join(args.out_dir, os.path.basename(path)) if args.out_dir else None
+        try:
+            old_size, new_size = compact_file(path, out_path, args.dry_run)
+        except (OSError, ValueError) as e:
+            failed += 1
+            print(f"[CurveForRigging] ❌ {e}")
+            continue
+        total_old += old_size
+        total_new += new_size
+        print(f"[CurveForRigging] ✅ {os.path.basename(path)}: {old_size} -> {new_size} bytes")
+
+    print(f"[CurveForRigging] {len(files) - failed}/{len(files)} files, {total_old} -> {total_new} bytes")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
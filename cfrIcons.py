@@ -0,0 +1,245 @@
+# ------------------------------------------------------------
+# Session icon atlas for the UI
+# ------------------------------------------------------------
+# icon("wrist.png") returns a QIcon that is decoded and scaled to 64 px
+# once per session and shared by every window. Names are matched without
+# case and a doubled extension ("root.png.PNG") is accepted, so the
+# manifest names load on Linux too. Folder listings and icons are
+# re-read when they change on disk (export adds icons while Maya runs).
+#
+# shape_icon(shape, callback) draws the icon of a registry shape from its
+# curves instead: QPainterPath strokes in the control color, seen along
+# thumb_plane. The drawing runs on a worker thread and is kept in
+# THUMB_CACHE under the content hash of the curves, so an edited shape
+# gets a new icon and an unchanged one is never drawn twice.
+try:
+    from PySide6 import QtCore, QtGui
+except ImportError:
+    from PySide2 import QtCore, QtGui
+import os
+
+import cfrProfile
+import cfrShapes
+import cfrThumbnail
+
+ICON_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "icons"))
+ICON_SIZE = 64
+THUMB_CACHE = os.environ.get("CFR_THUMB_CACHE") or os.path.join(ICON_PATH, ".cache")
+THUMB_VERSION = 1       # bump when the drawing changes, older cache files are ignored
+LINE_WIDTH = 2.0
+
+procedural = True       # False shows the hand-made PNGs of the manifest
+thumb_plane = None      # "xy", "xz", "zy" or None for the flattest view
+
+_IMAGE_EXTS = (".png", ".jpg", ".jpeg", ".bmp", ".svg")
+
+_folders = {}       # folder -> (mtime, {lower case name: file name})
+_icons = {}         # (path, size) -> (mtime, QIcon)
+_missing = set()    # names already warned about
+_thumbs = {}        # (file, mtime, color, size, plane) -> QIcon, None when nothing could be drawn
+_pending = {}       # same key -> (fallback icon name, [callbacks])
+_pool = None
+_dispatcher = None
+
+
+# ------------------------------------------------------------
+# LOOKUP
+# ------------------------------------------------------------
+def _folder_index(folder):
+    try:
+        mtime = os.stat(folder).st_mtime
+    except OSError:
+        return {}
+    cached = _folders.get(folder)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    index = {}
+    for name in sorted(os.listdir(folder)):
+        key = name.lower()
+        index.setdefault(key, name)
+        # "root.png.PNG" also answers to "root.png"
+        stem, ext = os.path.splitext(key)
+        if ext in _IMAGE_EXTS and os.path.splitext(stem)[1] in _IMAGE_EXTS:
+            index.setdefault(stem, name)
+    _folders[folder] = (mtime, index)
+    return index
+
+
+def resolve(name, folder=ICON_PATH):
+    # absolute names (extra manifests) keep their own folder
+    if not name:
+        return None
+    folder, base = os.path.split(os.path.join(folder, name))
+    actual = _folder_index(folder).get(base.lower())
+    return os.path.join(folder, actual) if actual else None
+
+
+# ------------------------------------------------------------
+# ATLAS
+# ------------------------------------------------------------
+def icon(name, size=ICON_SIZE, folder=ICON_PATH):
+    path = resolve(name, folder)
+    if path is None:
+        if name and name not in _missing:
+            _missing.add(name)
+            cfrProfile.log(f"⚠️ Missing icon: {name}")
+        return QtGui.QIcon()
+
+    mtime = os.path.getmtime(path)
+    cached = _icons.get((path, size))
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    pixmap = QtGui.QPixmap(path)
+    if not pixmap.isNull() and max(pixmap.width(), pixmap.height()) != size:
+        pixmap = pixmap.scaled(size, size, QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation)
+    result = QtGui.QIcon(pixmap)
+    _icons[(path, size)] = (mtime, result)
+    return result
+
+
+def preload(names, size=ICON_SIZE, folder=ICON_PATH):
+    return [icon(name, size, folder) for name in names]
+
+
+def clear():
+    _folders.clear()
+    _icons.clear()
+    _missing.clear()
+    _thumbs.clear()
+
+
+# ------------------------------------------------------------
+# PROCEDURAL THUMBNAILS
+# ------------------------------------------------------------
+def _cache_path(shape, color, size, plane):
+    digest = cfrShapes.shape_hash(shape)[:20]
+    return os.path.join(THUMB_CACHE, f"{digest}_{color}_{size}_{plane or 'auto'}_v{THUMB_VERSION}.png")
+
+
+def draw_thumbnail(shape, color=17, size=ICON_SIZE, plane=None):
+    # QImage (not QPixmap), so it can be drawn outside the main thread
+    lines = cfrThumbnail.screen_lines(shape, size, plane=plane)
+    if not lines:
+        return None
+
+    image = QtGui.QImage(size, size, QtGui.QImage.Format_ARGB32_Premultiplied)
+    image.fill(QtCore.Qt.transparent)
+    pen = QtGui.QPen(QtGui.QColor(*cfrThumbnail.index_color(color)), LINE_WIDTH)
+    pen.setCapStyle(QtCore.Qt.RoundCap)
+    pen.setJoinStyle(QtCore.Qt.RoundJoin)
+
+    # one subpath per curve, stroked in a single call
+    path = QtGui.QPainterPath()
+    for line in lines:
+        path.addPolygon(QtGui.QPolygonF([QtCore.QPointF(x, y) for x, y in line]))
+
+    painter = QtGui.QPainter(image)
+    painter.setRenderHint(QtGui.QPainter.Antialiasing)
+    painter.setPen(pen)
+    painter.drawPath(path)
+    painter.end()
+    return image
+
+
+def _thumbnail_image(file_name, color, size, plane):
+    shape = cfrShapes.get_shape(file_name)
+    if shape is None:
+        return None
+
+    path = _cache_path(shape, color, size, plane)
+    if os.path.exists(path):
+        image = QtGui.QImage(path)
+        if not image.isNull():
+            return image
+
+    image = draw_thumbnail(shape, color, size, plane)
+    if image is not None:
+        try:
+            os.makedirs(THUMB_CACHE, exist_ok=True)
+            tmp_path = path + ".tmp"
+            if image.save(tmp_path, "PNG"):
+                os.replace(tmp_path, path)
+        except OSError:
+            pass    # read-only install, the icon still lives for this session
+    return image
+
+
+class _ThumbnailTask(QtCore.QRunnable):
+    def __init__(self, key):
+        super().__init__()
+        self.key = key
+        self.dispatcher = _dispatcher     # survives a reload of this module
+
+    def run(self):
+        file_name, _, color, size, plane = self.key
+        try:
+            result = _thumbnail_image(file_name, color, size, plane)
+        except Exception as e:
+            # reported on the main thread, a broken file must not end the worker
+            result = f"{file_name}: {e}"
+        # a null image rather than None, None does not survive the queued signal
+        self.dispatcher.done.emit(self.key, QtGui.QImage() if result is None else result)
+
+
+class _Dispatcher(QtCore.QObject):
+    # lives on the main thread, so done is delivered there
+    done = QtCore.Signal(object, object)
+
+    def __init__(self):
+        super().__init__()
+        self.done.connect(self.deliver)
+
+    @QtCore.Slot(object, object)
+    def deliver(self, key, result):
+        fallback, callbacks = _pending.pop(key, ("", []))
+        if isinstance(result, str):
+            cfrProfile.log(f"⚠️ Could not draw thumbnail {result}")
+            result = QtGui.QImage()
+
+        thumb = QtGui.QIcon(QtGui.QPixmap.fromImage(result)) if not result.isNull() else None
+        _thumbs[key] = thumb
+        if thumb is None:
+            thumb = icon(fallback, key[3])
+        for callback in callbacks:
+            try:
+                callback(thumb)
+            except RuntimeError:
+                pass    # the button was deleted before its icon arrived
+
+
+def _start(key):
+    global _pool, _dispatcher
+    if _dispatcher is None:
+        _dispatcher = _Dispatcher()
+        _pool = QtCore.QThreadPool()
+        _pool.setMaxThreadCount(max(1, min(4, QtCore.QThread.idealThreadCount() - 1)))
+    _pool.start(_ThumbnailTask(key))
+
+
+def shape_icon(shape, callback=None, size=ICON_SIZE, plane=None):
+    # shape is a registry entry. Returns the icon when it is ready, otherwise
+    # an empty QIcon now and callback(icon) once the worker has drawn it.
+    if not procedural:
+        return icon(shape["icon"], size)
+
+    plane = plane or thumb_plane
+    key = (shape["file"], cfrShapes._source_mtime(shape["file"]), shape["color"], size, plane)
+    if key in _thumbs:
+        thumb = _thumbs[key]
+        return thumb if thumb is not None else icon(shape["icon"], size)
+
+    if key not in _pending:
+        _pending[key] = (shape["icon"], [])
+        _start(key)
+    if callback is not None:
+        _pending[key][1].append(callback)
+    return QtGui.QIcon()
+
+
+def preload_shapes(shapes, size=ICON_SIZE, plane=None):
+    # queue every thumbnail in the background, category windows then open drawn
+    if procedural:
+        for shape in shapes:
+            shape_icon(shape, size=size, plane=plane)
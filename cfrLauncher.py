@@ -0,0 +1,77 @@
+# ------------------------------------------------------------
+# Shelf launcher
+# ------------------------------------------------------------
+# import CurveForRigging
+# CurveForRigging.launch()                # shelf button
+# CurveForRigging.launch(reload=True)     # developer: pick up edited .py files
+#
+# Modules, the shape library, the icon atlas and the dialog itself stay
+# loaded between clicks, so a second click only shows the window again
+# and keeps every cache the tool has built. Nothing but this module is
+# imported until the first launch. CFR_DEV_RELOAD=1 reloads the modules
+# on every launch (the old caches and scene callbacks are dropped first).
+#
+# Every launch is timed from the call to the first event loop pass after
+# show(). A launch slower than startup_budget_ms (CFR_STARTUP_BUDGET_MS)
+# is reported, and with cfrProfile enabled each one is recorded as
+# "launch" next to the create timings.
+import importlib
+import os
+import sys
+import time
+
+import cfrProfile
+
+dev_reload = os.environ.get("CFR_DEV_RELOAD", "") == "1"
+startup_budget_ms = float(os.environ.get("CFR_STARTUP_BUDGET_MS", 300))
+last_startup_ms = None
+
+# a module is reloaded after the modules it imports
+RELOAD_ORDER = ("cfrProfile", "cfrShapes", "cfrRegistry", "cfrThumbnail", "cfrCompact",
+                "cfrUtil", "cfrBatch", "cfrIcons", "cfrUi")
+
+
+# ------------------------------------------------------------
+# RELOAD
+# ------------------------------------------------------------
+def reload_modules():
+    # close what holds on to the old code before it is replaced
+    if "cfrUi" in sys.modules:
+        sys.modules["cfrUi"].close()
+    if "cfrUtil" in sys.modules:
+        cfrUtil = sys.modules["cfrUtil"]
+        cfrUtil.remove_scene_callbacks()
+        cfrUtil.clear_cache()
+
+    # cfrProfile settings (enabled, quiet, log_path) survive the reload
+    settings = (cfrProfile.enabled, cfrProfile.quiet, cfrProfile.log_path)
+    reloaded = []
+    for name in RELOAD_ORDER:
+        if name in sys.modules:
+            importlib.reload(sys.modules[name])
+            reloaded.append(name)
+    cfrProfile.enabled, cfrProfile.quiet, cfrProfile.log_path = settings
+    cfrProfile.log(f"🔄 Reloaded {', '.join(reloaded) or 'nothing'}")
+    return reloaded
+
+
+# ------------------------------------------------------------
+# LAUNCH
+# ------------------------------------------------------------
+def _shown(start):
+    global last_startup_ms
+    last_startup_ms = (time.perf_counter() - start) * 1000.0
+    cfrProfile.record("launch", last_startup_ms)
+    if last_startup_ms > startup_budget_ms:
+        cfrProfile.log(f"⏱️ Startup took {last_startup_ms:.0f} ms, the budget is {startup_budget_ms:.0f} ms")
+
+
+def launch(reload=None):
+    start = time.perf_counter()
+    if dev_reload if reload is None else reload:
+        reload_modules()
+
+    import cfrUi
+    ui = cfrUi.run()
+    cfrUi.QtCore.QTimer.singleShot(0, lambda: _shown(start))
+    return ui
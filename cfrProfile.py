@@ -0,0 +1,170 @@
+# ------------------------------------------------------------
+# Opt-in profiling and logging for control creation
+# ------------------------------------------------------------
+# import cfrProfile
+# cfrProfile.enable(log_path="C:/tmp/cfr.jsonl")   # log_path is optional
+# ... create controls ...
+# cfrProfile.report()                              # or cfrProfile.stats()
+#
+# Every @profiled call records its wall time, the time spent in each
+# phase() inside it, the outermost call also the scene node count
+# before/after (outside its timing, counting a big scene is slow).
+# Disabled, the wrappers only cost a flag check.
+#
+# All CurveForRigging messages go through log(); quiet (or silenced())
+# mutes them so batch builds don't fill the Script Editor.
+import contextlib
+import functools
+import json
+import math
+import time
+
+enabled = False
+quiet = False
+log_path = None
+node_counter = None     # callable returning the scene node count, set by cfrUtil
+
+_samples = {}           # "name" / "name.phase" -> [ms, ...]
+_stack = []             # records of the calls currently running
+
+
+# ------------------------------------------------------------
+# MESSAGES
+# ------------------------------------------------------------
+def log(message):
+    if not quiet:
+        print(f"[CurveForRigging] {message}")
+
+
+@contextlib.contextmanager
+def silenced():
+    global quiet
+    previous, quiet = quiet, True
+    try:
+        yield
+    finally:
+        quiet = previous
+
+
+# ------------------------------------------------------------
+# SWITCHES
+# ------------------------------------------------------------
+def enable(log_path=None):
+    global enabled
+    globals()["log_path"] = log_path
+    enabled = True
+
+
+def disable():
+    global enabled
+    enabled = False
+
+
+def reset():
+    _samples.clear()
+
+
+# ------------------------------------------------------------
+# RECORDING
+# ------------------------------------------------------------
+def _count_nodes():
+    if node_counter is None:
+        return None
+    try:
+        return node_counter()
+    except Exception:
+        return None
+
+
+def _finish(record):
+    _samples.setdefault(record["name"], []).append(record["ms"])
+    for phase_name, ms in record["phases"].items():
+        _samples.setdefault(f"{record['name']}.{phase_name}", []).append(ms)
+
+    if log_path:
+        record["time"] = time.time()
+        with open(log_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+
+
+def profiled(name):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return func(*args, **kwargs)
+
+            # nested calls leave the counting to the outermost one
+            outermost = not _stack
+            record = {"name": name, "phases": {}}
+            if outermost:
+                record["nodes_before"] = _count_nodes()
+            _stack.append(record)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record["ms"] = (time.perf_counter() - start) * 1000.0
+                _stack.remove(record)
+                if outermost:
+                    record["nodes_after"] = _count_nodes()
+                _finish(record)
+        return wrapper
+    return decorator
+
+
+def record(name, ms):
+    # a time measured outside a profiled call, e.g. the launcher's startup
+    if enabled:
+        _finish({"name": name, "phases": {}, "ms": ms})
+
+
+@contextlib.contextmanager
+def phase(name):
+    # time goes to the innermost profiled call, repeated phases add up
+    if not enabled or not _stack:
+        yield
+        return
+
+    record = _stack[-1]
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        ms = (time.perf_counter() - start) * 1000.0
+        record["phases"][name] = record["phases"].get(name, 0.0) + ms
+
+
+# ------------------------------------------------------------
+# STATS
+# ------------------------------------------------------------
+def _percentile(values, pct):
+    # nearest rank on sorted values
+    index = max(0, min(len(values) - 1, math.ceil(pct / 100.0 * len(values)) - 1))
+    return values[index]
+
+
+def stats():
+    result = {}
+    for key, samples in _samples.items():
+        values = sorted(samples)
+        result[key] = {
+            "count": len(values),
+            "total_ms": sum(values),
+            "p50_ms": _percentile(values, 50),
+            "p95_ms": _percentile(values, 95),
+            "max_ms": values[-1],
+        }
+    return result
+
+
+def report():
+    rows = stats()
+    lines = [f"{'call / phase':<36} | {'count':>6} | {'p50 ms':>9} | {'p95 ms':>9} | {'total ms':>10}"]
+    for key in sorted(rows):
+        row = rows[key]
+        label = key if "." not in key else "  " + key.split(".", 1)[1]
+        lines.append(f"{label:<36} | {row['count']:>6} | {row['p50_ms']:>9.3f} | "
+                     f"{row['p95_ms']:>9.3f} | {row['total_ms']:>10.2f}")
+    print("\n".join(lines))
+    return rows
@@ -0,0 +1,241 @@
+# ------------------------------------------------------------
+# Shape registry built from manifest files
+# ------------------------------------------------------------
+# curves/manifest.json lists the categories and every shape:
+#
+# {
+#     "categories": [{"id": "arm", "label": "Arm", "icon": "arm.png", "mirror": true}],
+#     "shapes": [{"id": "wrist", "category": "arm", "label": "Wrist", "file": "wrist.ma",
+#                 "ctrl_name": "Wrist_CTRL", "color": 18, "icon": "wrist.png", "tags": ["limb"]}]
+# }
+#
+# Extra manifests (a studio library, a show folder ...) are added with
+# add_manifest() or listed in CFR_MANIFESTS (os.pathsep separated). Their
+# files and icons are relative to the manifest, and a shape id that is
+# already registered is replaced. Manifests are re-read when they change
+# on disk, so adding a shape needs no Python edit and no restart.
+import json
+import os
+
+module_path = os.path.dirname(os.path.abspath(__file__))
+curve_folder = os.path.join(module_path, "curves")
+manifest_path = os.path.join(curve_folder, "manifest.json")
+
+_manifests = [manifest_path] + [p for p in os.environ.get("CFR_MANIFESTS", "").split(os.pathsep) if p]
+_mtimes = None          # [mtime per manifest] of the loaded state
+generation = 0          # bumped by every load, lets callers drop what they built from the old state
+
+CATEGORIES = {}         # category id -> {"id", "label", "icon", "mirror"}
+SHAPES = {}             # shape id -> {"id", "category", "label", "file", "ctrl_name", "color", "icon", "tags"}
+_by_category = {}       # category id -> [shape id, ...] in manifest order
+_by_label = {}          # (category id, lower label) -> shape id
+_by_tag = {}            # tag -> [shape id, ...]
+
+
+# ------------------------------------------------------------
+# LOADING
+# ------------------------------------------------------------
+def _manifest_mtimes():
+    mtimes = []
+    for path in _manifests:
+        try:
+            mtimes.append(os.stat(path).st_mtime)
+        except OSError:
+            mtimes.append(None)
+    return mtimes
+
+
+def _read_manifest(path):
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    folder = os.path.dirname(os.path.abspath(path))
+    builtin = os.path.abspath(path) == os.path.abspath(manifest_path)
+
+    categories = []
+    for entry in data.get("categories", []):
+        category = {
+            "id": entry["id"],
+            "label": entry.get("label", entry["id"].title()),
+            "icon": entry.get("icon", ""),
+            "mirror": bool(entry.get("mirror", False)),
+        }
+        if category["icon"] and not builtin:
+            category["icon"] = os.path.join(folder, category["icon"])
+        categories.append(category)
+
+    shapes = []
+    for entry in data.get("shapes", []):
+        label = entry.get("label", entry["id"])
+        shape = {
+            "id": entry["id"],
+            "category": entry["category"],
+            "label": label,
+            "file": entry["file"],
+            "ctrl_name": entry.get("ctrl_name", label.replace(" ", "") + "_CTRL"),
+            "color": int(entry.get("color", 17)),
+            "icon": entry.get("icon", ""),
+            "tags": list(entry.get("tags", [])),
+        }
+        # built-in names stay relative to curves/, others become absolute
+        if not builtin:
+            shape["file"] = os.path.join(folder, shape["file"])
+            if shape["icon"]:
+                shape["icon"] = os.path.join(folder, shape["icon"])
+        shapes.append(shape)
+    return categories, shapes
+
+
+def load():
+    global _mtimes, generation
+    categories = {}
+    shapes = {}
+    mtimes = _manifest_mtimes()
+
+    for path, mtime in zip(_manifests, mtimes):
+        if mtime is None:
+            if path == manifest_path:
+                raise IOError(f"[CurveForRigging] Missing shape manifest: {path}")
+            continue
+        new_categories, new_shapes = _read_manifest(path)
+        for category in new_categories:
+            categories[category["id"]] = category
+        for shape in new_shapes:
+            shapes.pop(shape["id"], None)
+            shapes[shape["id"]] = shape
+
+    by_category, by_label, by_tag = {}, {}, {}
+    for shape in shapes.values():
+        if shape["category"] not in categories:
+            categories[shape["category"]] = {"id": shape["category"], "label": shape["category"].title(),
+                                             "icon": "", "mirror": False}
+        by_category.setdefault(shape["category"], []).append(shape["id"])
+        by_label[(shape["category"], shape["label"].lower())] = shape["id"]
+        for tag in shape["tags"]:
+            by_tag.setdefault(tag, []).append(shape["id"])
+
+    # swap everything at once so a bad manifest never leaves half an index
+    CATEGORIES.clear()
+    CATEGORIES.update(categories)
+    SHAPES.clear()
+    SHAPES.update(shapes)
+    _by_category.clear()
+    _by_category.update(by_category)
+    _by_label.clear()
+    _by_label.update(by_label)
+    _by_tag.clear()
+    _by_tag.update(by_tag)
+    _mtimes = mtimes
+    generation += 1
+    return SHAPES
+
+
+def refresh():
+    # hot reload, one stat per manifest
+    if _mtimes is None or _manifest_mtimes() != _mtimes:
+        load()
+        return True
+    return False
+
+
+def add_manifest(path):
+    path = os.path.abspath(path)
+    if path not in _manifests:
+        _manifests.append(path)
+    load()
+
+
+def manifests():
+    return list(_manifests)
+
+
+# ------------------------------------------------------------
+# WRITING
+# ------------------------------------------------------------
+def _write_manifest(path, data):
+    # one entry per line, like the hand written built-in manifest
+    lines = ["{", f'    "version": {data.get("version", 1)},']
+    for key in ("categories", "shapes"):
+        entries = data.get(key, [])
+        lines.append(f'    "{key}": [')
+        lines += [f"        {json.dumps(e)}" + ("," if i < len(entries) - 1 else "") for i, e in enumerate(entries)]
+        lines.append("    ]," if key == "categories" else "    ]")
+    lines.append("}")
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8", newline="\n") as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(tmp_path, path)
+
+
+def save_shapes(entries, categories=(), path=None):
+    # add or replace manifest entries (file/icon relative to the manifest)
+    path = os.path.abspath(path or manifest_path)
+    data = {"version": 1, "categories": [], "shapes": []}
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+    for key, new_entries in (("categories", categories), ("shapes", entries)):
+        existing = data.setdefault(key, [])
+        index = {e["id"]: i for i, e in enumerate(existing)}
+        for entry in new_entries:
+            if entry["id"] in index:
+                existing[index[entry["id"]]] = entry
+            else:
+                index[entry["id"]] = len(existing)
+                existing.append(entry)
+
+    _write_manifest(path, data)
+    if path not in [os.path.abspath(p) for p in _manifests]:
+        _manifests.append(path)
+    load()
+    return path
+
+
+# ------------------------------------------------------------
+# LOOKUP
+# ------------------------------------------------------------
+def get(shape_id):
+    refresh()
+    return SHAPES.get(shape_id)
+
+
+def find(category, name):
+    # name is a shape id or the label shown in the UI ("Leg Upper")
+    refresh()
+    shape = SHAPES.get(name)
+    if shape is not None and shape["category"] == category:
+        return shape
+    shape_id = _by_label.get((category, name.lower()))
+    return SHAPES[shape_id] if shape_id else None
+
+
+def categories():
+    refresh()
+    return list(CATEGORIES.values())
+
+
+def category(category_id):
+    refresh()
+    return CATEGORIES.get(category_id)
+
+
+def shapes_in(category_id):
+    refresh()
+    return [SHAPES[i] for i in _by_category.get(category_id, ())]
+
+
+def shapes_tagged(tag):
+    refresh()
+    return [SHAPES[i] for i in _by_tag.get(tag, ())]
+
+
+def all_shapes():
+    refresh()
+    return list(SHAPES.values())
+
+
+def curve_map(category_id):
+    # {label: (file, default control name, color)}, the old *_CURVE_MAP layout
+    return {s["label"]: (s["file"], s["ctrl_name"], s["color"]) for s in shapes_in(category_id)}
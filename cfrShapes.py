@@ -0,0 +1,744 @@
+import hashlib
+import math
+import mmap
+import os
+import re
+import struct
+import sys
+import threading
+
+module_path = os.path.dirname(__file__)
+curve_folder = os.path.join(module_path, "curves")
+
+
+# ------------------------------------------------------------
+# .ma TOKENIZER
+# ------------------------------------------------------------
+# Strings are kept as one token so the ';' inside the MEL blobs of the
+# script nodes never ends a statement early.
+_TOKEN_RE = re.compile(r'"(?:[^"\\]|\\.)*"|;|[^\s;"]+')
+_COMMENT_RE = re.compile(r"^//.*$", re.MULTILINE)
+
+# Only these node types carry data we need, everything else
+# (cameras, layers, light linkers, script nodes ...) is skipped.
+_KEEP_TYPES = ("transform", "nurbsCurve", "makeNurbCircle", "transformGeometry")
+
+_FORMS = {"0": 0, "1": 1, "2": 2}
+
+
+def _statements(text):
+    # "//" header/footer lines would otherwise run into the first statement
+    text = _COMMENT_RE.sub("", text)
+    statement = []
+    for match in _TOKEN_RE.finditer(text):
+        token = match.group(0)
+        if token == ";":
+            if statement:
+                yield statement
+            statement = []
+        else:
+            statement.append(token)
+    if statement:
+        yield statement
+
+
+def _unquote(token):
+    if token.startswith('"') and token.endswith('"'):
+        return token[1:-1]
+    return token
+
+
+def _parse_create_node(tokens):
+    node = {"type": tokens[1], "name": None, "parent": None, "shared": False, "attrs": {}}
+    i = 2
+    while i < len(tokens):
+        flag = tokens[i]
+        if flag == "-n" and i + 1 < len(tokens):
+            node["name"] = _unquote(tokens[i + 1])
+            i += 2
+        elif flag == "-p" and i + 1 < len(tokens):
+            node["parent"] = _unquote(tokens[i + 1])
+            i += 2
+        elif flag == "-s":
+            node["shared"] = True
+            i += 1
+        else:
+            i += 1
+    return node
+
+
+def _parse_set_attr(tokens):
+    attr = None
+    attr_type = None
+    values = []
+    i = 1
+    while i < len(tokens):
+        token = tokens[i]
+        if token == "-type":
+            attr_type = _unquote(tokens[i + 1])
+            i += 2
+        elif attr is None and token.startswith('"'):
+            attr = _unquote(token)
+            i += 1
+        elif attr is None and token.startswith("-"):
+            # -k off / -s 11 / -l on ... (flag with one argument)
+            i += 2
+        else:
+            values.append(token)
+            i += 1
+    return attr, attr_type, values
+
+
+def _floats(values, count=None):
+    result = [float(v) for v in values]
+    if count is not None and len(result) != count:
+        raise ValueError(f"expected {count} values, got {len(result)}")
+    return result
+
+
+def _parse_nurbs_curve(values):
+    degree = int(values[0])
+    spans = int(values[1])
+    form = _FORMS[values[2]]
+    rational = values[3] == "yes"
+    dimension = int(values[4])
+    knot_count = int(values[5])
+    knots = _floats(values[6:6 + knot_count])
+    i = 6 + knot_count
+    cv_count = int(values[i])
+    i += 1
+
+    stride = dimension + (1 if rational else 0)
+    cvs = []
+    for n in range(cv_count):
+        chunk = _floats(values[i + n * stride:i + n * stride + dimension])
+        if dimension == 2:
+            chunk.append(0.0)
+        cvs.append(tuple(chunk))
+
+    return {"degree": degree, "spans": spans, "form": form, "knots": knots, "cvs": cvs}
+
+
+# ------------------------------------------------------------
+# HISTORY EVALUATION
+# ------------------------------------------------------------
+# Several library files keep the curve as construction history
+# (makeNurbCircle -> transformGeometry -> shape, plus ".cp" tweaks)
+# instead of a baked ".cc", so that chain is evaluated here.
+def _rotate_from_z(point, normal):
+    nx, ny, nz = normal
+    length = math.sqrt(nx * nx + ny * ny + nz * nz) or 1.0
+    nx, ny, nz = nx / length, ny / length, nz / length
+    x, y, z = point
+
+    # shortest rotation taking +Z onto the normal (axis = Z x N)
+    ax, ay = -ny, nx
+    sin_a = math.sqrt(ax * ax + ay * ay)
+    cos_a = nz
+    if sin_a < 1e-12:
+        return (x, -y, -z) if cos_a < 0 else (x, y, z)
+    ax, ay = ax / sin_a, ay / sin_a
+
+    # Rodrigues' formula with az = 0
+    dot = ax * x + ay * y
+    cross = (-ay * z, ax * z, ax * y - ay * x)
+    return (
+        x * cos_a + cross[0] * sin_a + ax * dot * (1 - cos_a),
+        y * cos_a + cross[1] * sin_a + ay * dot * (1 - cos_a),
+        z * cos_a + cross[2] * sin_a,
+    )
+
+
+def _make_nurb_circle(attrs):
+    radius = attrs.get("r", 1.0)
+    sections = int(attrs.get("s", 8))
+    degree = int(attrs.get("d", 3))
+    normal = attrs.get("nr", (0.0, 0.0, 1.0))
+    center = attrs.get("c", (0.0, 0.0, 0.0))
+
+    if degree != 3:
+        raise ValueError(f"makeNurbCircle degree {degree} is not supported")
+
+    # periodic cubic: the CV ring is pushed out so the curve passes
+    # through the radius at every knot
+    step = 2.0 * math.pi / sections
+    ring = 6.0 * radius / (4.0 + 2.0 * math.cos(step))
+    cvs = []
+    for k in range(sections):
+        angle = (k + 1) * step
+        x, y, z = _rotate_from_z((ring * math.cos(angle), ring * math.sin(angle), 0.0), normal)
+        cvs.append((x + center[0], y + center[1], z + center[2]))
+    cvs.extend(cvs[:degree])
+
+    knots = [float(k) for k in range(-(degree - 1), sections + degree)]
+    return {"degree": degree, "spans": sections, "form": 2, "knots": knots, "cvs": cvs}
+
+
+def _transform_geometry(curve, matrix):
+    m = matrix
+    cvs = []
+    for x, y, z in curve["cvs"]:
+        cvs.append((
+            x * m[0] + y * m[4] + z * m[8] + m[12],
+            x * m[1] + y * m[5] + z * m[9] + m[13],
+            x * m[2] + y * m[6] + z * m[10] + m[14],
+        ))
+    return dict(curve, cvs=cvs)
+
+
+def _apply_tweaks(curve, tweaks):
+    cvs = list(curve["cvs"])
+    unique = len(cvs) - curve["degree"] if curve["form"] == 2 else len(cvs)
+    for index, offset in tweaks.items():
+        if index < unique:
+            x, y, z = cvs[index]
+            cvs[index] = (x + offset[0], y + offset[1], z + offset[2])
+    if curve["form"] == 2:
+        cvs[unique:] = cvs[:curve["degree"]]
+    return dict(curve, cvs=cvs)
+
+
+def _evaluate(name, nodes, inputs):
+    node = nodes.get(name)
+    if node is None:
+        return None
+
+    if node["type"] == "makeNurbCircle":
+        return _make_nurb_circle(node["attrs"])
+
+    if node["type"] == "transformGeometry":
+        source = _evaluate(inputs.get(name), nodes, inputs)
+        if source is None or "txf" not in node["attrs"]:
+            return source
+        return _transform_geometry(source, node["attrs"]["txf"])
+
+    if node["type"] == "nurbsCurve":
+        curve = node["attrs"].get("cc") or _evaluate(inputs.get(name), nodes, inputs)
+        if curve is None:
+            return None
+        tweaks = node["attrs"].get("cp")
+        return _apply_tweaks(curve, tweaks) if tweaks else curve
+
+    return None
+
+
+# ------------------------------------------------------------
+# PARSER
+# ------------------------------------------------------------
+def _store_attr(node, attr, values):
+    node_type = node["type"]
+    attrs = node["attrs"]
+    key = attr.lstrip(".")
+
+    if node_type == "transform" and key in ("t", "r", "s", "rp", "sp"):
+        attrs[key] = tuple(_floats(values, 3))
+
+    elif node_type == "nurbsCurve" and key == "cc":
+        attrs["cc"] = _parse_nurbs_curve(values)
+
+    elif node_type == "nurbsCurve" and key.startswith("cp["):
+        first, _, last = key[3:-1].partition(":")
+        first = int(first)
+        last = int(last or first)
+        numbers = _floats(values, (last - first + 1) * 3)
+        tweaks = attrs.setdefault("cp", {})
+        for n, index in enumerate(range(first, last + 1)):
+            tweaks[index] = tuple(numbers[n * 3:n * 3 + 3])
+
+    elif node_type == "makeNurbCircle" and key in ("nr", "c"):
+        attrs[key] = tuple(_floats(values, 3))
+
+    elif node_type == "makeNurbCircle" and key in ("r", "s", "d"):
+        attrs[key] = float(values[0])
+
+    elif node_type == "transformGeometry" and key == "txf":
+        attrs["txf"] = _floats(values, 16)
+
+
+def _resolve_dag(ref, paths, by_leaf):
+    # "-p" / connectAttr names: a full path, a partial path or a short name,
+    # the last node created under that name wins like in a Maya import
+    if ref is None:
+        return None
+    if ref.startswith("|"):
+        return ref if ref in paths else None
+    for path in reversed(by_leaf.get(ref.rsplit("|", 1)[-1], ())):
+        if path.endswith("|" + ref):
+            return path
+    return None
+
+
+def _dag_key(node, paths, by_leaf):
+    # full path of a new DAG node, its "-p" is resolved to a full path too
+    node["parent"] = _resolve_dag(node["parent"], paths, by_leaf)
+    key = (node["parent"] or "") + "|" + node["name"]
+    by_leaf.setdefault(node["name"], []).append(key)
+    return key
+
+
+def _read_nodes(text):
+    # DAG nodes are keyed by their full path ("|grpA|ctrl"), so clashing
+    # short names under different parents stay apart, DG nodes by name
+    nodes = {}
+    order = []
+    by_leaf = {}
+    inputs = {}
+    current = None
+
+    def key_of(ref):
+        return ref if ref in nodes and not nodes[ref]["dag"] else _resolve_dag(ref, nodes, by_leaf)
+
+    for tokens in _statements(text):
+        command = tokens[0]
+
+        if command == "createNode":
+            node = _parse_create_node(tokens)
+            if node["type"] in _KEEP_TYPES and not node["shared"] and node["name"]:
+                node["dag"] = node["type"] in ("transform", "nurbsCurve")
+                key = _dag_key(node, nodes, by_leaf) if node["dag"] else node["name"]
+                if key not in nodes:
+                    order.append(key)
+                nodes[key] = node
+                current = node
+            else:
+                current = None
+
+        elif command == "setAttr" and current is not None:
+            attr, _attr_type, values = _parse_set_attr(tokens)
+            if attr and values:
+                _store_attr(current, attr, values)
+
+        elif command == "connectAttr" and len(tokens) >= 3:
+            src = _unquote(tokens[1]).split(".", 1)
+            dst = _unquote(tokens[2]).split(".", 1)
+            if len(src) == 2 and len(dst) == 2 and dst[1] in ("cr", "create", "ig", "inputGeometry"):
+                dst_key, src_key = key_of(dst[0]), key_of(src[0])
+                if dst_key and src_key:
+                    inputs[dst_key] = src_key
+
+        elif command not in ("rename", "addAttr", "lockNode"):
+            current = None
+
+    return nodes, order, inputs
+
+
+def evaluate_curves(text):
+    # {full path: curve} for every nurbsCurve of the file that can be evaluated
+    nodes, order, inputs = _read_nodes(text)
+    curves = {}
+    for key in order:
+        if nodes[key]["type"] == "nurbsCurve":
+            curve = _evaluate(key, nodes, inputs)
+            if curve is not None:
+                curves[key] = dict(curve, name=nodes[key]["name"])
+    return curves
+
+
+def parse_ma_text(text, file_name=None):
+    nodes, order, inputs = _read_nodes(text)
+
+    # transforms that hold a curve, plus every group above them
+    transforms = {}
+    for key in order:
+        node = nodes[key]
+        if node["type"] != "nurbsCurve" or node["parent"] not in nodes:
+            continue
+        curve = _evaluate(key, nodes, inputs)
+        if curve is None:
+            continue
+        parent = node["parent"]
+        transforms.setdefault(parent, []).append(dict(curve, name=node["name"]))
+        while nodes[parent]["parent"] in nodes:
+            parent = nodes[parent]["parent"]
+            transforms.setdefault(parent, [])
+
+    # records use short names, a repeated one gets a number
+    kept = [key for key in order if key in transforms]
+    leaves = {nodes[key]["name"] for key in kept}
+    names, used = {}, set()
+    for key in kept:
+        base = name = nodes[key]["name"]
+        n = 1
+        while name in used or (name != base and name in leaves):
+            n += 1
+            name = f"{base}{n}"
+        names[key] = name
+        used.add(name)
+
+    result = []
+    for key in order:
+        if key not in transforms:
+            continue
+        attrs = nodes[key]["attrs"]
+        result.append({
+            "name": names[key],
+            "parent": names.get(nodes[key]["parent"]),
+            "t": attrs.get("t", (0.0, 0.0, 0.0)),
+            "r": attrs.get("r", (0.0, 0.0, 0.0)),
+            "s": attrs.get("s", (1.0, 1.0, 1.0)),
+            "rp": attrs.get("rp", (0.0, 0.0, 0.0)),
+            "sp": attrs.get("sp", (0.0, 0.0, 0.0)),
+            "curves": transforms[key],
+        })
+
+    return {"file": file_name, "transforms": result}
+
+
+def parse_ma(file_path):
+    with open(file_path, "r", encoding="utf-8", errors="replace") as f:
+        return parse_ma_text(f.read(), os.path.basename(file_path))
+
+
+# ------------------------------------------------------------
+# BINARY BUNDLE
+# ------------------------------------------------------------
+# One file holding every library shape, little endian:
+#   header : b"CFRB", u16 version, u32 entry count
+#   index  : per entry  u16 name length, name, u64 offset, u32 size,
+#            f64 source .ma mtime
+#   record : u32 transform count, per transform
+#              str name, str parent, 15 x f64 (t r s rp sp), u32 curve count
+#              per curve  str name, u8 degree, u8 form, u32 spans,
+#                         u32 knot count, u32 cv count, f64 knots, f64 cvs
+#   str    : u16 length + utf-8 bytes
+BUNDLE_MAGIC = b"CFRB"
+BUNDLE_VERSION = 1
+bundle_path = os.path.join(curve_folder, "shapes.cfrb")
+
+_bundle = None  # (file, mmap, {name: (offset, size, mtime)})
+_lock = threading.RLock()   # thumbnail workers read shapes while the UI may clear()
+
+
+def _pack_str(text):
+    data = (text or "").encode("utf-8")
+    return struct.pack("<H", len(data)) + data
+
+
+def _pack_shape(shape):
+    chunks = [struct.pack("<I", len(shape["transforms"]))]
+    for xform in shape["transforms"]:
+        chunks.append(_pack_str(xform["name"]))
+        chunks.append(_pack_str(xform["parent"]))
+        chunks.append(struct.pack("<15d", *xform["t"], *xform["r"], *xform["s"], *xform["rp"], *xform["sp"]))
+        chunks.append(struct.pack("<I", len(xform["curves"])))
+        for curve in xform["curves"]:
+            knots = curve["knots"]
+            cvs = [c for cv in curve["cvs"] for c in cv]
+            chunks.append(_pack_str(curve["name"]))
+            chunks.append(struct.pack("<BBIII", curve["degree"], curve["form"], curve["spans"],
+                                      len(knots), len(curve["cvs"])))
+            chunks.append(struct.pack(f"<{len(knots)}d", *knots))
+            chunks.append(struct.pack(f"<{len(cvs)}d", *cvs))
+    return b"".join(chunks)
+
+
+def shape_hash(shape):
+    # content key of the curve data, the same wherever the shape was read from
+    return hashlib.sha1(_pack_shape(shape)).hexdigest()
+
+
+def _read_str(buf, offset):
+    (length,) = struct.unpack_from("<H", buf, offset)
+    offset += 2
+    return bytes(buf[offset:offset + length]).decode("utf-8"), offset + length
+
+
+def _unpack_shape(buf, offset, file_name):
+    (xform_count,) = struct.unpack_from("<I", buf, offset)
+    offset += 4
+    transforms = []
+    for _ in range(xform_count):
+        name, offset = _read_str(buf, offset)
+        parent, offset = _read_str(buf, offset)
+        values = struct.unpack_from("<15d", buf, offset)
+        offset += 15 * 8
+        (curve_count,) = struct.unpack_from("<I", buf, offset)
+        offset += 4
+
+        curves = []
+        for _ in range(curve_count):
+            curve_name, offset = _read_str(buf, offset)
+            degree, form, spans, knot_count, cv_count = struct.unpack_from("<BBIII", buf, offset)
+            offset += 14
+            knots = list(struct.unpack_from(f"<{knot_count}d", buf, offset))
+            offset += knot_count * 8
+            flat = struct.unpack_from(f"<{cv_count * 3}d", buf, offset)
+            offset += cv_count * 3 * 8
+            cvs = [flat[i:i + 3] for i in range(0, len(flat), 3)]
+            curves.append({"name": curve_name, "degree": degree, "spans": spans,
+                           "form": form, "knots": knots, "cvs": cvs})
+
+        transforms.append({
+            "name": name,
+            "parent": parent or None,
+            "t": values[0:3], "r": values[3:6], "s": values[6:9],
+            "rp": values[9:12], "sp": values[12:15],
+            "curves": curves,
+        })
+    return {"file": file_name, "transforms": transforms}
+
+
+def build_bundle(file_names, path=None):
+    path = path or bundle_path
+    close_bundle()
+
+    records = []
+    for file_name in file_names:
+        file_path = os.path.join(curve_folder, file_name)
+        shape = parse_ma(file_path)
+        records.append((file_name, _pack_shape(shape), os.path.getmtime(file_path)))
+
+    index_size = sum(2 + len(name.encode("utf-8")) + 8 + 4 + 8 for name, _, _ in records)
+    offset = 4 + 2 + 4 + index_size
+
+    header = [BUNDLE_MAGIC, struct.pack("<HI", BUNDLE_VERSION, len(records))]
+    for name, data, mtime in records:
+        header.append(_pack_str(name))
+        header.append(struct.pack("<QId", offset, len(data), mtime))
+        offset += len(data)
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(b"".join(header))
+        for _, data, _ in records:
+            f.write(data)
+    os.replace(tmp_path, path)
+    return path
+
+
+def open_bundle(path=None):
+    global _bundle
+    with _lock:
+        if _bundle is not None:
+            return _bundle[2]
+
+        path = path or bundle_path
+        try:
+            f = open(path, "rb")
+        except OSError:
+            return None
+
+        try:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            if buf[:4] != BUNDLE_MAGIC:
+                raise ValueError("not a shape bundle")
+            version, count = struct.unpack_from("<HI", buf, 4)
+            if version != BUNDLE_VERSION:
+                raise ValueError(f"bundle version {version} is not supported")
+
+            index = {}
+            offset = 10
+            for _ in range(count):
+                name, offset = _read_str(buf, offset)
+                index[name] = struct.unpack_from("<QId", buf, offset)
+                offset += 20
+        except (ValueError, struct.error):
+            f.close()
+            return None
+
+        _bundle = (f, buf, index)
+        return index
+
+
+def close_bundle():
+    global _bundle
+    with _lock:
+        if _bundle is not None:
+            f, buf, _ = _bundle
+            buf.close()
+            f.close()
+            _bundle = None
+
+
+def _shape_from_bundle(file_name, mtime):
+    # called under _lock, the mmap stays open until the shape is unpacked
+    index = open_bundle()
+    if not index or file_name not in index:
+        return None
+    offset, _size, source_mtime = index[file_name]
+    if mtime is not None and source_mtime != mtime:
+        # the .ma was edited after the bundle was built
+        return None
+    return _unpack_shape(_bundle[1], offset, file_name)
+
+
+# ------------------------------------------------------------
+# SHAPE LIBRARY
+# ------------------------------------------------------------
+# Session cache: every shape is read once and kept until its source
+# .ma changes on disk or clear() is called. get_shape() and clear() may
+# run on different threads (icon workers), _lock keeps them apart.
+SHAPE_LIBRARY = {}
+_library_mtimes = {}
+
+
+def _source_mtime(file_name):
+    try:
+        return os.stat(os.path.join(curve_folder, file_name)).st_mtime
+    except OSError:
+        return None
+
+
+def get_shape(file_name):
+    mtime = _source_mtime(file_name)
+    with _lock:
+        shape = SHAPE_LIBRARY.get(file_name)
+        if shape is not None and _library_mtimes.get(file_name) == mtime:
+            return shape
+
+        shape = _shape_from_bundle(file_name, mtime)
+        if shape is None:
+            if mtime is None:
+                SHAPE_LIBRARY.pop(file_name, None)
+                return None
+            shape = parse_ma(os.path.join(curve_folder, file_name))
+
+        SHAPE_LIBRARY[file_name] = shape
+        _library_mtimes[file_name] = mtime
+        return shape
+
+
+def clear():
+    with _lock:
+        SHAPE_LIBRARY.clear()
+        _library_mtimes.clear()
+        _mirrored.clear()
+        _merged.clear()
+        close_bundle()
+
+
+# ------------------------------------------------------------
+# MIRROR
+# ------------------------------------------------------------
+_AXES = {"x": 0, "y": 1, "z": 2}
+_mirrored = {}  # (file_name, axis) -> (source shape, mirrored shape)
+
+
+def mirror_shape(shape, axis="x"):
+    i = _AXES[axis.lower()]
+
+    def flip(v):
+        v = list(v)
+        v[i] = -v[i]
+        return tuple(v)
+
+    def flip_rotation(r):
+        # reflection keeps the rotation about the mirror axis, negates the others
+        return tuple(a if j == i else -a for j, a in enumerate(r))
+
+    transforms = []
+    for xform in shape["transforms"]:
+        curves = [dict(curve, cvs=[flip(cv) for cv in curve["cvs"]]) for curve in xform["curves"]]
+        transforms.append(dict(xform, t=flip(xform["t"]), r=flip_rotation(xform["r"]),
+                               rp=flip(xform["rp"]), sp=flip(xform["sp"]), curves=curves))
+    return {"file": shape["file"], "transforms": transforms}
+
+
+def get_mirrored_shape(file_name, axis="x"):
+    shape = get_shape(file_name)
+    if shape is None:
+        return None
+    cached = _mirrored.get((file_name, axis))
+    if cached is not None and cached[0] is shape:
+        return cached[1]
+    mirrored = mirror_shape(shape, axis)
+    _mirrored[(file_name, axis)] = (shape, mirrored)
+    return mirrored
+
+
+# ------------------------------------------------------------
+# MATRICES (row vectors, Maya layout)
+# ------------------------------------------------------------
+IDENTITY = [1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0]
+
+
+def mult_matrix(a, b):
+    return [sum(a[r * 4 + k] * b[k * 4 + c] for k in range(4)) for r in range(4) for c in range(4)]
+
+
+def _translate_matrix(t):
+    return [1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0, t[0], t[1], t[2], 1]
+
+
+def _scale_matrix(s):
+    return [s[0], 0, 0, 0, 0, s[1], 0, 0, 0, 0, s[2], 0, 0, 0, 0, 1]
+
+
+def _rotate_matrix(r):
+    x, y, z = [math.radians(v) for v in r]
+    rx = [1, 0, 0, 0, 0, math.cos(x), math.sin(x), 0, 0, -math.sin(x), math.cos(x), 0, 0, 0, 0, 1]
+    ry = [math.cos(y), 0, -math.sin(y), 0, 0, 1, 0, 0, math.sin(y), 0, math.cos(y), 0, 0, 0, 0, 1]
+    rz = [math.cos(z), math.sin(z), 0, 0, -math.sin(z), math.cos(z), 0, 0, 0, 0, 1, 0, 0, 0, 0, 1]
+    return mult_matrix(mult_matrix(rx, ry), rz)
+
+
+def local_matrix(xform):
+    # -sp * S * sp * -rp * R * rp * T (xyz rotate order)
+    m = mult_matrix(_translate_matrix([-v for v in xform["sp"]]), _scale_matrix(xform["s"]))
+    m = mult_matrix(m, _translate_matrix(xform["sp"]))
+    m = mult_matrix(m, _translate_matrix([-v for v in xform["rp"]]))
+    m = mult_matrix(m, _rotate_matrix(xform["r"]))
+    m = mult_matrix(m, _translate_matrix(xform["rp"]))
+    return mult_matrix(m, _translate_matrix(xform["t"]))
+
+
+# ------------------------------------------------------------
+# MERGE
+# ------------------------------------------------------------
+# Multi-curve files (eyes, mouth, eyebrow, finger) are a group with one
+# transform per circle. merge_shape() bakes every curve into the space of
+# the top transform so the control is one transform with several shapes.
+_merged = {}  # (file_name, axis) -> (source shape, merged shape)
+
+
+def merge_shape(shape):
+    transforms = shape["transforms"]
+    if len(transforms) <= 1:
+        return shape
+
+    # a single root keeps its own transform, several roots are baked to world
+    roots = [xform for xform in transforms if not xform["parent"]]
+    keep_root = len(roots) == 1
+
+    matrices = {}
+    curves = []
+    for xform in transforms:
+        if keep_root and xform is roots[0]:
+            matrix = IDENTITY
+        else:
+            matrix = local_matrix(xform)
+            if xform["parent"] in matrices:
+                matrix = mult_matrix(matrix, matrices[xform["parent"]])
+        matrices[xform["name"]] = matrix
+        curves += [c if matrix is IDENTITY else _transform_geometry(c, matrix) for c in xform["curves"]]
+
+    root = dict(roots[0], curves=curves)
+    if not keep_root:
+        root.update(t=(0.0, 0.0, 0.0), r=(0.0, 0.0, 0.0), s=(1.0, 1.0, 1.0), rp=(0.0, 0.0, 0.0), sp=(0.0, 0.0, 0.0))
+    return {"file": shape["file"], "transforms": [root]}
+
+
+def get_merged_shape(file_name, axis=None):
+    shape = get_mirrored_shape(file_name, axis) if axis else get_shape(file_name)
+    if shape is None:
+        return None
+    cached = _merged.get((file_name, axis))
+    if cached is not None and cached[0] is shape:
+        return cached[1]
+    merged = merge_shape(shape)
+    _merged[(file_name, axis)] = (shape, merged)
+    return merged
+
+
+def load_library(file_names):
+    return {name: get_shape(name) for name in file_names}
+
+
+def has_curves(shape):
+    return bool(shape) and any(t["curves"] for t in shape["transforms"])
+
+
+if __name__ == "__main__":
+    # python cfrShapes.py [bundle path]  ->  pack every .ma in curves/
+    names = sorted(n for n in os.listdir(curve_folder) if n.endswith(".ma"))
+    print(build_bundle(names, sys.argv[1] if len(sys.argv) > 1 else None))
@@ -0,0 +1,166 @@
+# ------------------------------------------------------------
+# Line-art PNG thumbnails from shape records (no Maya, no Qt)
+# ------------------------------------------------------------
+# write_thumbnail(shape, "icons/star.png") draws every curve of a
+# cfrShapes record seen along its flattest axis, so a circle lying in XZ
+# is drawn from the top and a face control in XY from the front. A plane
+# ("xy", "xz", "zy") forces the view instead. screen_lines() is the
+# projected, fitted outline that cfrIcons strokes with QPainterPath.
+import struct
+import zlib
+
+import cfrShapes
+
+LINE_COLOR = (252, 202, 70, 255)    # the UI hover yellow
+STEPS_PER_SPAN = 8
+PLANES = ("auto", "xy", "xz", "zy")
+
+# Maya's default index colors (overrideColor 0-31), 0 draws as the default grey
+INDEX_COLORS = (
+    (120, 120, 120), (0, 0, 0), (64, 64, 64), (153, 153, 153),
+    (155, 0, 40), (0, 4, 96), (0, 0, 255), (0, 70, 25),
+    (38, 0, 67), (200, 0, 200), (138, 72, 51), (63, 35, 31),
+    (153, 38, 0), (255, 0, 0), (0, 255, 0), (0, 65, 153),
+    (255, 255, 255), (255, 255, 0), (100, 220, 255), (67, 255, 163),
+    (255, 176, 176), (228, 172, 121), (255, 255, 99), (0, 153, 84),
+    (161, 106, 48), (159, 161, 48), (104, 161, 48), (48, 161, 93),
+    (48, 161, 161), (48, 103, 161), (111, 48, 161), (161, 48, 106),
+)
+
+
+def index_color(index, alpha=255):
+    if not 0 <= index < len(INDEX_COLORS):
+        index = 0
+    return INDEX_COLORS[index] + (alpha,)
+
+
+# ------------------------------------------------------------
+# CURVE SAMPLING
+# ------------------------------------------------------------
+def _de_boor(degree, knots, cvs, u):
+    # knots is the full vector (len(cvs) + degree + 1 values)
+    k = degree
+    while k < len(cvs) - 1 and u >= knots[k + 1]:
+        k += 1
+    d = [list(cvs[j + k - degree]) for j in range(degree + 1)]
+    for r in range(1, degree + 1):
+        for j in range(degree, r - 1, -1):
+            i = j + k - degree
+            span = knots[i + degree + 1 - r] - knots[i]
+            alpha = (u - knots[i]) / span if span else 0.0
+            d[j] = [(1.0 - alpha) * a + alpha * b for a, b in zip(d[j - 1], d[j])]
+    return d[degree]
+
+
+def sample_curve(curve, steps_per_span=STEPS_PER_SPAN):
+    degree, cvs = curve["degree"], curve["cvs"]
+    if degree <= 1 or len(cvs) <= degree:
+        return [tuple(cv) for cv in cvs]
+
+    # Maya stores len(cvs) + degree - 1 knots, the end knots are implied
+    knots = list(curve["knots"])
+    knots = [knots[0]] + knots + [knots[-1]]
+    start, end = knots[degree], knots[len(cvs)]
+    count = max(2, curve["spans"] * steps_per_span)
+    return [tuple(_de_boor(degree, knots, cvs, start + (end - start) * i / count))
+            for i in range(count)] + [tuple(_de_boor(degree, knots, cvs, end - 1e-9))]
+
+
+# ------------------------------------------------------------
+# TRANSFORMS
+# ------------------------------------------------------------
+def shape_polylines(shape):
+    # every curve as a list of world space points
+    matrices = {}
+    lines = []
+    for xform in shape["transforms"]:
+        m = cfrShapes.local_matrix(xform)
+        if xform["parent"] in matrices:
+            m = cfrShapes.mult_matrix(m, matrices[xform["parent"]])
+        matrices[xform["name"]] = m
+        for curve in xform["curves"]:
+            points = sample_curve(curve)
+            if curve["form"]:
+                points.append(points[0])
+            lines.append([(x * m[0] + y * m[4] + z * m[8] + m[12],
+                           x * m[1] + y * m[5] + z * m[9] + m[13],
+                           x * m[2] + y * m[6] + z * m[10] + m[14]) for x, y, z in points])
+    return lines
+
+
+# ------------------------------------------------------------
+# PROJECTION
+# ------------------------------------------------------------
+# plane -> (u axis, v axis, flip v), the axis left out is the view axis
+_VIEWS = {"zy": (2, 1, False), "xz": (0, 2, False), "xy": (0, 1, True)}
+
+
+def _project(lines, plane=None):
+    if plane in (None, "auto"):
+        # look down the flattest axis: XY front, XZ top, ZY side
+        points = [p for line in lines for p in line]
+        extent = [max(p[i] for p in points) - min(p[i] for p in points) for i in range(3)]
+        plane = ("zy", "xz", "xy")[extent.index(min(extent))]
+    elif plane not in _VIEWS:
+        raise ValueError(f"[CurveForRigging] Unknown thumbnail plane '{plane}', expected one of {PLANES}")
+    u, v, flip_v = _VIEWS[plane]
+    return [[(p[u], p[v] if not flip_v else -p[v]) for p in line] for line in lines]
+
+
+def screen_lines(shape, size=64, margin=4, plane=None):
+    # every curve as pixel coordinates of a size x size image (y down)
+    lines = [line for line in shape_polylines(shape) if line]
+    if not lines:
+        return []
+
+    lines = _project(lines, plane)
+    points = [p for line in lines for p in line]
+    min_u, max_u = min(p[0] for p in points), max(p[0] for p in points)
+    min_v, max_v = min(p[1] for p in points), max(p[1] for p in points)
+    scale = (size - 1 - 2 * margin) / (max(max_u - min_u, max_v - min_v) or 1.0)
+    off_u = (size - 1 - (max_u - min_u) * scale) / 2.0
+    off_v = (size - 1 - (max_v - min_v) * scale) / 2.0
+
+    # image rows go down, the shape's v axis goes up
+    return [[((u - min_u) * scale + off_u, size - 1 - ((v - min_v) * scale + off_v)) for u, v in line]
+            for line in lines]
+
+
+# ------------------------------------------------------------
+# RASTER + PNG
+# ------------------------------------------------------------
+def _png(width, height, pixels):
+    def chunk(tag, data):
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    raw = b"".join(b"\x00" + bytes(pixels[y * width * 4:(y + 1) * width * 4]) for y in range(height))
+    return (b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(raw, 9))
+            + chunk(b"IEND", b""))
+
+
+def render(shape, size=64, color=LINE_COLOR, margin=4, plane=None):
+    pixels = bytearray(size * size * 4)
+
+    def plot(x, y):
+        for py in (y, y + 1):
+            for px in (x, x + 1):
+                if 0 <= px < size and 0 <= py < size:
+                    i = (py * size + px) * 4
+                    pixels[i:i + 4] = bytes(color)
+
+    for screen in screen_lines(shape, size, margin, plane):
+        for (x0, y0), (x1, y1) in zip(screen, screen[1:]):
+            steps = int(max(abs(x1 - x0), abs(y1 - y0))) + 1
+            for s in range(steps + 1):
+                t = s / steps
+                plot(int(round(x0 + (x1 - x0) * t)), int(round(y0 + (y1 - y0) * t)))
+
+    return _png(size, size, pixels)
+
+
+def write_thumbnail(shape, path, size=64, plane=None):
+    with open(path, "wb") as f:
+        f.write(render(shape, size, plane=plane))
+    return path
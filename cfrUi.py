@@ -1,20 +1,15 @@
 try:
-    from PySide6 import QtCore, QtGui, QtWidgets
-    from shiboken6 import wrapInstance
-except:
-    from PySide2 import QtCore, QtGui, QtWidgets
-    from shiboken2 import wrapInstance
+    from PySide6 import QtCore, QtWidgets
+except ImportError:
+    from PySide2 import QtCore, QtWidgets
 
-import maya.OpenMayaUI as omui
-import os, sys
+import maya.cmds as cmds
 
-module_path = os.path.dirname(__file__)
-if module_path not in sys.path:
-    sys.path.append(module_path)
-
-from cfrUtil import create_head_ctrl, create_body_ctrl, create_arm_ctrl, create_leg_ctrl
-
-ICON_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), 'icons'))
+import cfrIcons
+import cfrProfile
+import cfrRegistry
+from cfrUtil import (create_ctrl, install_scene_callbacks, auto_rig, create_mirrored, export_curves,
+                     bulk_rename, delete_controls, cleanup_scene, swap_shapes)
 
 # ------------------------------------------------------------------ #
 # MAIN WINDOW
@@ -38,17 +33,14 @@ class CreateCurveRig(QtWidgets.QDialog):
         create_curve_group.setLayout(create_curve_layout)
 
         self.icon_buttons = {}
-        icon_data = {
-            "Head": "head1.png",
-            "Body": "body.png",
-            "Arm": "arm.png",
-            "Leg": "reg.png"
-        }
+        self.category_windows = {}  # category id -> (registry generation, CategoryWindow)
 
+        # one button per registry category, in manifest order
         row, col = 0, 0
-        for label, icon_file in icon_data.items():
+        for category in cfrRegistry.categories():
+            label, icon_file = category["label"], category["icon"]
             btn = QtWidgets.QPushButton()
-            btn.setIcon(QtGui.QIcon(os.path.join(ICON_PATH, icon_file)))
+            btn.setIcon(cfrIcons.icon(icon_file))
             btn.setIconSize(QtCore.QSize(64, 64))
             btn.setFixedSize(80, 80)
             btn.setToolTip(label)
@@ -57,23 +49,28 @@ class CreateCurveRig(QtWidgets.QDialog):
             #ชื่อบนปุ่มล่าง
             create_curve_layout.addWidget(QtWidgets.QLabel(label), row, col, alignment=QtCore.Qt.AlignCenter)
             create_curve_layout.addWidget(btn, row + 1, col, alignment=QtCore.Qt.AlignCenter)
-            self.icon_buttons[label] = btn
+            self.icon_buttons[category["id"]] = btn
 
             # Connect buttons
-            if label == "Head":
-                btn.clicked.connect(self.open_head_window)
-            elif label == "Body":
-                btn.clicked.connect(self.open_body_window)
-            elif label == "Arm":
-                btn.clicked.connect(self.open_arm_window)
-            elif label == "Leg":
-                btn.clicked.connect(self.open_reg_window)
+            btn.clicked.connect(lambda checked=False, c=category["id"]: self.open_category_window(c))
 
             col += 1
             if col > 3:
                 col = 0
                 row += 2
 
+        # shape thumbnails are queued once the window is up, and drawn before a category is opened
+        QtCore.QTimer.singleShot(0, lambda: cfrIcons.preload_shapes(cfrRegistry.all_shapes()))
+
+        mirror_labels = ", ".join(c["label"] for c in cfrRegistry.categories() if c["mirror"])
+        self.mirror_check = QtWidgets.QCheckBox(f"Mirror L/R ({mirror_labels})")
+        self.mirror_check.setToolTip("Also build the control on the opposite joint (L_/R_, _l/_r)")
+        create_curve_layout.addWidget(self.mirror_check, create_curve_layout.rowCount(), 0, 1, 4)
+
+        self.merge_check = QtWidgets.QCheckBox("Single transform")
+        self.merge_check.setToolTip("Put every curve of multi-curve shapes (eyes, mouth ...) under one control")
+        create_curve_layout.addWidget(self.merge_check, create_curve_layout.rowCount(), 0, 1, 4)
+
         main_layout.addWidget(create_curve_group)
 
         # ------------------ RENAME ------------------ #
@@ -85,12 +82,22 @@ class CreateCurveRig(QtWidgets.QDialog):
         rename_layout.setContentsMargins(15, 25, 15, 15)
 
         self.name_line = QtWidgets.QLineEdit()
+        self.name_line.setPlaceholderText("{name}")
+        self.name_line.setToolTip("Tokens: {name} {index} {side} {joint} {shape}")
         self.prefix_line = QtWidgets.QLineEdit()
         self.suffix_line = QtWidgets.QLineEdit()
+        self.search_line = QtWidgets.QLineEdit()
+        self.replace_line = QtWidgets.QLineEdit()
+        self.padding_spin = QtWidgets.QSpinBox()
+        self.padding_spin.setRange(1, 6)
+        self.padding_spin.setValue(2)
 
         rename_layout.addRow("Name:", self.name_line)
         rename_layout.addRow("Prefix:", self.prefix_line)
         rename_layout.addRow("Suffix:", self.suffix_line)
+        rename_layout.addRow("Search:", self.search_line)
+        rename_layout.addRow("Replace:", self.replace_line)
+        rename_layout.addRow("Padding:", self.padding_spin)
 
         main_layout.addWidget(rename_group)
 
@@ -99,16 +106,28 @@ class CreateCurveRig(QtWidgets.QDialog):
         button_layout.setSpacing(15)
         button_layout.setContentsMargins(10, 5, 10, 5)
 
+        self.auto_rig_button = QtWidgets.QPushButton("Auto Rig")
+        self.auto_rig_button.setToolTip("Create controls for every joint under the selected root joint")
+        self.auto_rig_button.clicked.connect(self.auto_rig_selected)
+        self.export_button = QtWidgets.QPushButton("Export")
+        self.export_button.setToolTip("Save the selected curves (or every cfrShape tagged control) to the library")
+        self.export_button.clicked.connect(self.export_selected)
         self.rename_button = QtWidgets.QPushButton("Rename")
         self.rename_button.clicked.connect(self.rename_selected)
         self.delete_button = QtWidgets.QPushButton("Delete")
         self.delete_button.clicked.connect(self.delete_selected)
+        self.cleanup_button = QtWidgets.QPushButton("Clean Up")
+        self.cleanup_button.setToolTip("Remove import namespaces, script nodes and unused curve history")
+        self.cleanup_button.clicked.connect(lambda: cleanup_scene(flatten=True))
         self.cancel_button = QtWidgets.QPushButton("Cancel")
         self.cancel_button.clicked.connect(self.close)
 
         for btn, color in [
+            (self.auto_rig_button, "#a1c181"),
+            (self.export_button, "#fcca46"),
             (self.rename_button, "#619b8a"),
             (self.delete_button, "#ff4b2e"),
+            (self.cleanup_button, "#f4a259"),
             (self.cancel_button, "#fe7f2d")
         ]:
             btn.setStyleSheet(f"""
@@ -160,14 +179,14 @@ class CreateCurveRig(QtWidgets.QDialog):
             QDialog {
                 background-color: #233d4d;
             }
-            QLabel {
+            QLabel, QCheckBox {
                 color: white;
                 font-size: 11pt;
             }
         ''')
 #######snap joint
-    def create_with_snap(self, util_function, ctrl_name):
-        import maya.cmds as cmds
+    @cfrProfile.profiled("create_with_snap")
+    def create_with_snap(self, category, shape_id):
         sel = cmds.ls(selection=True)
 
         if not sel:
@@ -179,76 +198,96 @@ class CreateCurveRig(QtWidgets.QDialog):
             cmds.warning(f"[CurveForRigging] ⚠️ Selected object '{joint}' is not a joint.")
             return
 
-        util_function(ctrl_name, snap_to=joint)
+        if self.mirror_check.isChecked() and cfrRegistry.category(category)["mirror"]:
+            create_mirrored(category, shape_id, cmds.ls(sel, type="joint"), merge=self.merge_check.isChecked())
+            return
+
+        create_ctrl(category, shape_id, snap_to=joint, merge=self.merge_check.isChecked())
+#######auto rig
+    def auto_rig_selected(self):
+        sel = cmds.ls(selection=True, type="joint")
+
+        if not sel:
+            cmds.warning("[CurveForRigging] ⚠️ Please select the root joint to auto rig.")
+            return
+
+        auto_rig(sel[0], merge=self.merge_check.isChecked())
+#######export
+    def export_selected(self):
+        sel = cmds.ls(selection=True, long=True)
+
+        # "keep": replaced library shapes stay where they are, new ones go to custom
+        keep = "(keep)"
+        category_ids = [keep] + [c["id"] for c in cfrRegistry.categories()]
+        if "custom" not in category_ids:
+            category_ids.append("custom")
+        category, ok = QtWidgets.QInputDialog.getItem(
+            self, "Export curves", "Category:", category_ids, 0, True)
+        if not ok or not category.strip():
+            return
+        category = None if category == keep else category.strip()
+
+        if sel:
+            export_curves(sel, category=category)
+        else:
+            export_curves(category=category, tagged=True)
 #######rename
     def rename_selected(self):
-        import maya.cmds as cmds
-        
-        sel = cmds.ls(selection=True)
+        sel = cmds.ls(selection=True, long=True)
         if not sel:
             cmds.warning("[CurveForRigging] ⚠️ No object selected to rename.")
             return
 
-        base_name = self.name_line.text().strip()
+        base_name = self.name_line.text().strip() or "{name}"
         prefix = self.prefix_line.text().strip()
         suffix = self.suffix_line.text().strip()
+        search = self.search_line.text()
 
-        if not base_name:
+        if base_name == "{name}" and not (prefix or suffix or search):
             cmds.warning("[CurveForRigging] ⚠️ Please enter a name.")
             return
 
-        for i, obj in enumerate(sel):
-            new_name = f"{prefix}{base_name}{suffix}"
-            renamed = cmds.rename(obj, new_name)
-            print(f"[CurveForRigging] ✅ Renamed: {obj} ➝ {renamed}")
+        # every name is planned up front and applied in one undo chunk
+        renamed = bulk_rename(sel, f"{prefix}{base_name}{suffix}", search=search or None,
+                              replace=self.replace_line.text(), padding=self.padding_spin.value())
+        if renamed:
+            cmds.select(renamed)
 #######delete
     def delete_selected(self):
-        import maya.cmds as cmds
-        sel = cmds.ls(selection=True)
+        sel = cmds.ls(selection=True, long=True)
 
         if not sel:
             cmds.warning("[CurveForRigging] ⚠️ No object selected to delete.")
             return
 
-        for obj in sel:
-            try:
-                cmds.delete(obj)
-                print(f"[CurveForRigging] 🗑️ Deleted: {obj}")
-            except Exception as e:
-                cmds.warning(f"[CurveForRigging] ❌ Could not delete {obj}: {e}")
+        delete_controls(sel)
 
     # ------------------------------------------------------------------ #
     # Sub-windows
-    def connect_buttons(self, window, util_function):
-        for child in window.findChildren(QtWidgets.QPushButton):
-            label = child.toolTip()
-            child.setCheckable(False)
-            child.clicked.connect(lambda checked=False, n=label: self.create_with_snap(util_function, n))
-#
-
-    def open_head_window(self):
-        self.head_window = HeadWindow(self)
-        self.head_window.show()
-#
-    def open_body_window(self):
-        self.body_window = BodyWindow(self)
-        self.body_window.show()
-#
-    def open_arm_window(self):
-        self.arm_window = ArmWindow(self)
-        self.arm_window.show()
-#
-    def open_reg_window(self):
-        self.reg_window = RegWindow(self)
-        self.reg_window.show()
+    def open_category_window(self, category):
+        # one dialog per category, rebuilt only when the manifest changed
+        cfrRegistry.refresh()
+        cached = self.category_windows.get(category)
+        if cached and cached[0] == cfrRegistry.generation:
+            window = cached[1]
+        else:
+            if cached:
+                cached[1].deleteLater()
+            window = CategoryWindow(category, self)
+            self.category_windows[category] = (cfrRegistry.generation, window)
+        window.show()
+        window.raise_()
+        window.activateWindow()
 
 # ------------------------------------------------------------------ #
-# HEAD WINDOW
+# CATEGORY WINDOW
 # ------------------------------------------------------------------ #
-class HeadWindow(QtWidgets.QDialog):
-    def __init__(self, parent=None):
+class CategoryWindow(QtWidgets.QDialog):
+    def __init__(self, category, parent=None):
         super().__init__(parent)
-        self.setWindowTitle("Head Curve Options")
+        info = cfrRegistry.category(category)
+        self.category = category
+        self.setWindowTitle(f"{info['label']} Curve Options")
         self.setMinimumSize(500, 400)
 
         # ------------------ MAIN LAYOUT ------------------ #
@@ -256,146 +295,36 @@ class HeadWindow(QtWidgets.QDialog):
         main_layout.setSpacing(20)
         main_layout.setContentsMargins(15, 15, 15, 15)
 
-        # ------------------ HEAD ICON ------------------ #
-        head_group = QtWidgets.QGroupBox("Head")
-        head_layout = QtWidgets.QGridLayout()
-        head_layout.setHorizontalSpacing(25)
-        head_layout.setVerticalSpacing(15)
-        head_group.setLayout(head_layout)
-
-        icon_data = {
-            "Eyes": "eyes.png",
-            "Mouth": "mouth.png",
-            "Eyebrow": "eyebrow.png",
-            "Jaw": "jaw.png",
-            "Head": "head.png"
-        }
+        # ------------------ ICON ------------------ #
+        shape_group = QtWidgets.QGroupBox(info["label"])
+        shape_layout = QtWidgets.QGridLayout()
+        shape_layout.setHorizontalSpacing(25)
+        shape_layout.setVerticalSpacing(15)
+        shape_group.setLayout(shape_layout)
 
         row, col = 0, 0
-        for label, icon_file in icon_data.items():
+        for shape in cfrRegistry.shapes_in(category):
             btn = QtWidgets.QPushButton()
-            btn.setIcon(QtGui.QIcon(os.path.join(ICON_PATH, icon_file)))
+            btn.setIcon(cfrIcons.shape_icon(shape, btn.setIcon))
             btn.setIconSize(QtCore.QSize(64, 64))
             btn.setFixedSize(80, 80)
-            btn.setToolTip(label)
-            btn.setCheckable(True)
+            btn.setToolTip(shape["label"])
+            btn.clicked.connect(lambda checked=False, s=shape["id"]: self.shape_clicked(s))
 
-            head_layout.addWidget(QtWidgets.QLabel(label), row, col, alignment=QtCore.Qt.AlignCenter)
-            head_layout.addWidget(btn, row + 1, col, alignment=QtCore.Qt.AlignCenter)
+            shape_layout.addWidget(QtWidgets.QLabel(shape["label"]), row, col, alignment=QtCore.Qt.AlignCenter)
+            shape_layout.addWidget(btn, row + 1, col, alignment=QtCore.Qt.AlignCenter)
 
             col += 1
             if col > 2:
                 col = 0
                 row += 2
 
-        main_layout.addWidget(head_group)
-        self.parent().connect_buttons(self, create_head_ctrl)
-
-        # ------------------ CONTROL BUTTONS ------------------ #
-        button_layout = QtWidgets.QHBoxLayout()
-        button_layout.setSpacing(15)
-        button_layout.setContentsMargins(10, 5, 10, 5)
-
-        self.delete_button = QtWidgets.QPushButton("Delete")
-        self.cancel_button = QtWidgets.QPushButton("Cancel")
-        self.cancel_button.clicked.connect(self.close)
-
-        for btn, color in [
-            (self.delete_button, "#ff4b2e"),
-            (self.cancel_button, "#fe7f2d")
-        ]:
-            btn.setStyleSheet(f"""
-                background-color: {color};
-                color: #1D1D33;
-                font-weight: bold;
-                font-size: 11pt;
-                padding: 8px 16px;
-                border-radius: 6px;
-            """)
-            button_layout.addWidget(btn)
+        main_layout.addWidget(shape_group)
 
-        main_layout.addLayout(button_layout)
-
-        # ------------------ STYLE ------------------ #
-        self.setStyleSheet('''
-            QGroupBox {
-                font-weight: bold;
-                font-size: 14pt;
-                font-family: Papyrus;
-                color: white;
-                border: 1px solid #555;
-                border-radius: 5px;
-                margin-top: 10px;
-            }
-            QGroupBox::title {
-                subcontrol-origin: margin;
-                subcontrol-position: top left;
-                padding: 0 8px;
-            }
-            QPushButton {
-                background-color: #233d4d;
-                color: white;
-                padding: 5px;
-            }
-            QPushButton:hover {
-                background-color: #fcca46;
-            }
-            QDialog {
-                background-color: #233d4d;
-            }
-            QLabel {
-                color: white;
-                font-size: 11pt;
-            }
-        ''')
-
-
-
-
-
-class BodyWindow(QtWidgets.QDialog):
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.setWindowTitle("Body Curve Options")
-        self.setMinimumSize(500, 400)
-
-        # ------------------ MAIN LAYOUT ------------------ #
-        main_layout = QtWidgets.QVBoxLayout(self)
-        main_layout.setSpacing(20)
-        main_layout.setContentsMargins(15, 15, 15, 15)
-
-        # ------------------ ICON ------------------ #
-        body_group = QtWidgets.QGroupBox("Body")
-        body_layout = QtWidgets.QGridLayout()
-        body_layout.setHorizontalSpacing(25)
-        body_layout.setVerticalSpacing(15)
-        body_group.setLayout(body_layout)
-
-        icon_data = {
-            "Root": "root.png",
-            "Pelvis": "pelvis.png",
-            "Back1": "back1.png",
-            "Back2": "back2.png",
-            "Back3": "back3.png"
-        }
-
-        row, col = 0, 0
-        for label, icon_file in icon_data.items():
-            btn = QtWidgets.QPushButton()
-            btn.setIcon(QtGui.QIcon(os.path.join(ICON_PATH, icon_file)))
-            btn.setIconSize(QtCore.QSize(64, 64))
-            btn.setFixedSize(80, 80)
-            btn.setToolTip(label)
-            btn.setCheckable(True)
-
-            body_layout.addWidget(QtWidgets.QLabel(label), row, col, alignment=QtCore.Qt.AlignCenter)
-            body_layout.addWidget(btn, row + 1, col, alignment=QtCore.Qt.AlignCenter)
-            col += 1
-            if col > 2:
-                col = 0
-                row += 2
-
-        main_layout.addWidget(body_group)
+        self.swap_check = QtWidgets.QCheckBox("Swap selected")
+        self.swap_check.setToolTip("Replace the curves of the selected controls, keeping their transforms, "
+                                   "color and connections")
+        main_layout.addWidget(self.swap_check)
 
         # ------------------ CONTROL BUTTONS ------------------ #
         button_layout = QtWidgets.QHBoxLayout()
@@ -403,6 +332,8 @@ class BodyWindow(QtWidgets.QDialog):
         button_layout.setContentsMargins(10, 5, 10, 5)
 
         self.delete_button = QtWidgets.QPushButton("Delete")
+        self.delete_button.setToolTip(f"Delete the selected {info['label']} controls, or all of them")
+        self.delete_button.clicked.connect(self.delete_category)
         self.cancel_button = QtWidgets.QPushButton("Cancel")
         self.cancel_button.clicked.connect(self.close)
 
@@ -411,7 +342,7 @@ class BodyWindow(QtWidgets.QDialog):
             (self.cancel_button, "#fe7f2d")
         ]:
             btn.setStyleSheet(f"""
-                background-color: {color}; 
+                background-color: {color};
                 color: #1D1D33;
                 font-weight: bold;
                 font-size: 11pt;
@@ -421,7 +352,6 @@ class BodyWindow(QtWidgets.QDialog):
             button_layout.addWidget(btn)
 
         main_layout.addLayout(button_layout)
-        self.parent().connect_buttons(self, create_body_ctrl)
 
         # ------------------ STYLE ------------------ #
         self.setStyleSheet('''
@@ -450,236 +380,80 @@ class BodyWindow(QtWidgets.QDialog):
             QDialog {
                 background-color: #233d4d;
             }
-            QLabel {
+            QLabel, QCheckBox {
                 color: white;
                 font-size: 11pt;
             }
         ''')
 
-# ------------------------------------------------------------------ #
-# ARM WINDOW
-# ------------------------------------------------------------------ #
-class ArmWindow(QtWidgets.QDialog):
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.setWindowTitle("Arm Curve Options")
-        self.setMinimumSize(500, 400)
-
-        # ------------------ MAIN LAYOUT ------------------ #
-        main_layout = QtWidgets.QVBoxLayout(self)
-        main_layout.setSpacing(20)
-        main_layout.setContentsMargins(15, 15, 15, 15)
-
-        # ------------------ ICON ------------------ #
-        arm_group = QtWidgets.QGroupBox("Arm")
-        arm_layout = QtWidgets.QGridLayout()
-        arm_layout.setHorizontalSpacing(25)
-        arm_layout.setVerticalSpacing(15)
-        arm_group.setLayout(arm_layout)
-
-        icon_data = {
-            "Clavicle": "clavicle.png",
-            "Elbow": "elbow.png",
-            "Wrist": "wrist.png",
-            "Finger": "finger.png"
-        }
-
-        row, col = 0, 0
-        for label, icon_file in icon_data.items():
-            btn = QtWidgets.QPushButton()
-            btn.setIcon(QtGui.QIcon(os.path.join(ICON_PATH, icon_file)))
-            btn.setIconSize(QtCore.QSize(64, 64))
-            btn.setFixedSize(80, 80)
-            btn.setToolTip(label)
-            btn.setCheckable(True)
-
-            arm_layout.addWidget(QtWidgets.QLabel(label), row, col, alignment=QtCore.Qt.AlignCenter)
-            arm_layout.addWidget(btn, row + 1, col, alignment=QtCore.Qt.AlignCenter)
-
-            col += 1
-            if col > 2:
-                col = 0
-                row += 2
-
-        main_layout.addWidget(arm_group)
-
-        # ------------------ CONTROL BUTTONS ------------------ #
-        button_layout = QtWidgets.QHBoxLayout()
-        button_layout.setSpacing(15)
-        button_layout.setContentsMargins(10, 5, 10, 5)
-
-        self.delete_button = QtWidgets.QPushButton("Delete")
-        self.cancel_button = QtWidgets.QPushButton("Cancel")
-        self.cancel_button.clicked.connect(self.close)
+    def shape_clicked(self, shape_id):
+        if not self.swap_check.isChecked():
+            self.parent().create_with_snap(self.category, shape_id)
+            return
 
-        for btn, color in [
-            (self.delete_button, "#ff4b2e"),
-            (self.cancel_button, "#fe7f2d")
-        ]:
-            btn.setStyleSheet(f"""
-                background-color: {color}; 
-                color: #1D1D33;
-                font-weight: bold;
-                font-size: 11pt;
-                padding: 8px 16px;
-                border-radius: 6px;
-            """)
-            button_layout.addWidget(btn)
+        sel = cmds.ls(selection=True, long=True)
+        if not sel:
+            cmds.warning("[CurveForRigging] ⚠️ Select the controls to swap.")
+            return
+        swap_shapes(self.category, shape_id, sel)
 
-        main_layout.addLayout(button_layout)
-        self.parent().connect_buttons(self, create_arm_ctrl)
+    def delete_category(self):
+        sel = cmds.ls(selection=True, long=True)
 
-        # ------------------ STYLE ------------------ #
-        self.setStyleSheet('''
-            QGroupBox {
-                font-weight: bold;
-                font-size: 14pt;
-                font-family: Papyrus;
-                color: white;
-                border: 1px solid #555;
-                border-radius: 5px;
-                margin-top: 10px;
-            }
-            QGroupBox::title {
-                subcontrol-origin: margin;
-                subcontrol-position: top left;
-                padding: 0 8px;
-            }
-            QPushButton {
-                background-color: #233d4d;
-                color: white;
-                padding: 5px;
-            }
-            QPushButton:hover {
-                background-color: #fcca46;
-            }
-            QDialog {
-                background-color: #233d4d;
-            }
-            QLabel {
-                color: white;
-                font-size: 11pt;
-            }
-        ''')
+        if not sel:
+            label = cfrRegistry.category(self.category)["label"]
+            answer = QtWidgets.QMessageBox.question(self, "Delete controls",
+                                                    f"Nothing selected, delete every {label} control?")
+            if answer != QtWidgets.QMessageBox.Yes:
+                return
 
+        delete_controls(sel or None, category=self.category)
 
 # ------------------------------------------------------------------ #
-# REG WINDOW
+# RUN FUNCTION FOR MAYA
 # ------------------------------------------------------------------ #
-class RegWindow(QtWidgets.QDialog):
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.setWindowTitle("Leg Curve Options")
-        self.setMinimumSize(500, 400)
+# The dialog is kept between launches and only shown again, it is rebuilt
+# when the registry changed (new categories or shapes) or after close().
+ui = None
+_ui_generation = None
 
-        # ------------------ MAIN LAYOUT ------------------ #
-        main_layout = QtWidgets.QVBoxLayout(self)
-        main_layout.setSpacing(20)
-        main_layout.setContentsMargins(15, 15, 15, 15)
 
-        # ------------------ ICON ------------------ #
-        reg_group = QtWidgets.QGroupBox("Leg")
-        reg_layout = QtWidgets.QGridLayout()
-        reg_layout.setHorizontalSpacing(25)
-        reg_layout.setVerticalSpacing(15)
-        reg_group.setLayout(reg_layout)
-
-        icon_data = {
-            "Hip": "hip.png",
-            "Leg Upper": "leg_upper.png",
-            "Knee": "knee.png",
-            "Leg Lower": "leg_lower.png",
-            "Foot": "foot.png"
-        }
-
-        row, col = 0, 0
-        for label, icon_file in icon_data.items():
-            btn = QtWidgets.QPushButton()
-            btn.setIcon(QtGui.QIcon(os.path.join(ICON_PATH, icon_file)))
-            btn.setIconSize(QtCore.QSize(64, 64))
-            btn.setFixedSize(80, 80)
-            btn.setToolTip(label)
-            btn.setCheckable(True)
-
-            reg_layout.addWidget(QtWidgets.QLabel(label), row, col, alignment=QtCore.Qt.AlignCenter)
-            reg_layout.addWidget(btn, row + 1, col, alignment=QtCore.Qt.AlignCenter)
-
-            col += 1
-            if col > 2: 
-                col = 0
-                row += 2
-
-        main_layout.addWidget(reg_group)
-
-        # ------------------ CONTROL BUTTONS ------------------ #
-        button_layout = QtWidgets.QHBoxLayout()
-        button_layout.setSpacing(15)
-        button_layout.setContentsMargins(10, 5, 10, 5)
+def _maya_main_window():
+    import maya.OpenMayaUI as omui
+    try:
+        from shiboken6 import wrapInstance
+    except ImportError:
+        from shiboken2 import wrapInstance
+    return wrapInstance(int(omui.MQtUtil.mainWindow()), QtWidgets.QWidget)
 
-        self.delete_button = QtWidgets.QPushButton("Delete")
-        self.cancel_button = QtWidgets.QPushButton("Cancel")
-        self.cancel_button.clicked.connect(self.close)
 
-        for btn, color in [
-            (self.delete_button, "#ff4b2e"),
-            (self.cancel_button, "#fe7f2d")
-        ]:
-            btn.setStyleSheet(f"""
-                background-color: {color}; 
-                color: #1D1D33;
-                font-weight: bold;
-                font-size: 11pt;
-                padding: 8px 16px;
-                border-radius: 6px;
-            """)
-            button_layout.addWidget(btn)
+def close():
+    global ui
+    if ui is not None:
+        try:
+            ui.close()
+            ui.deleteLater()
+        except RuntimeError:
+            pass    # already deleted along with its parent
+        ui = None
 
-        main_layout.addLayout(button_layout)
-        self.parent().connect_buttons(self, create_leg_ctrl)
 
-        # ------------------ STYLE ------------------ #
-        self.setStyleSheet('''
-            QGroupBox {
-                font-weight: bold;
-                font-size: 14pt;
-                font-family: Papyrus;
-                color: white;
-                border: 1px solid #555;
-                border-radius: 5px;
-                margin-top: 10px;
-            }
-            QGroupBox::title {
-                subcontrol-origin: margin;
-                subcontrol-position: top left;
-                padding: 0 8px;
-            }
-            QPushButton {
-                background-color: #233d4d;
-                color: white;
-                padding: 5px;
-            }
-            QPushButton:hover {
-                background-color: #fcca46;
-            }
-            QDialog {
-                background-color: #233d4d;
-            }
-            QLabel {
-                color: white;
-                font-size: 11pt;
-            }
-        ''')
-
-# ------------------------------------------------------------------ #
-# RUN FUNCTION FOR MAYA
-# ------------------------------------------------------------------ #
 def run():
-    global ui
-    try:
-        ui.close()
-    except:
-        pass
-
-    ptr = wrapInstance(int(omui.MQtUtil.mainWindow()), QtWidgets.QWidget)
-    ui = CreateCurveRig(parent=ptr)
+    global ui, _ui_generation
+    cfrRegistry.refresh()
+    if ui is not None and _ui_generation == cfrRegistry.generation:
+        try:
+            ui.show()
+            ui.raise_()
+            ui.activateWindow()
+            return ui
+        except RuntimeError:
+            ui = None
+
+    close()
+    install_scene_callbacks()
+
+    ui = CreateCurveRig(parent=_maya_main_window())
+    _ui_generation = cfrRegistry.generation
     ui.show()
+    return ui
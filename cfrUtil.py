@@ -1,162 +1,1922 @@
+import maya.api.OpenMaya as om
 import maya.cmds as cmds
-import os
+import fnmatch
+import json
+import math
+import os, re, sys
 
 module_path = os.path.dirname(__file__)
+if module_path not in sys.path:
+    sys.path.append(module_path)
+
+import cfrCompact
+import cfrProfile
+import cfrRegistry
+import cfrShapes
+import cfrThumbnail
+
+cfrProfile.node_counter = lambda: len(cmds.ls())
+
 curve_folder = os.path.join(module_path, "curves")
 
 
 # ------------------------------------------------------------
 # UTIL: Import curve file
 # ------------------------------------------------------------
-def import_curve(file_name):
-    import maya.cmds as cmds
-    import os
+# clean_imports=True: the file goes into a throw-away namespace, its
+# construction history, script nodes and layers are deleted and the
+# namespace is merged into the root, so only the curves are left.
+clean_imports = False
+IMPORT_NAMESPACE = "cfrImport"
+
+
+def _unique_namespace(base):
+    namespace, n = base, 0
+    while cmds.namespace(exists=namespace):
+        n += 1
+        namespace = f"{base}{n}"
+    return namespace
+
 
+def _clean_import(new_nodes, new_objs, namespace):
+    paths = _dag_paths(new_objs)
+    cmds.delete(new_objs, constructionHistory=True)
+    dag = set(cmds.ls(new_nodes, dag=True, long=True) or [])
+    leftovers = [n for n in cmds.ls(new_nodes, long=True) or [] if n not in dag]
+    if leftovers:
+        cmds.delete(leftovers)
+    cmds.namespace(removeNamespace=namespace, mergeNamespaceWithRoot=True)
+    # the DAG paths followed the nodes out of the namespace
+    return [paths[n].fullPathName() for n in new_objs]
+
+
+@cfrProfile.profiled("import_curve")
+def import_curve(file_name, clean=None):
     file_path = os.path.join(curve_folder, file_name)
 
     if not os.path.exists(file_path):
         cmds.warning(f"[CurveForRigging] Missing curve file: {file_path}")
         return None
 
-    # เก็บรายชื่อ object
-    before = set(cmds.ls(tr=True))
-
-
-    namespace = os.path.splitext(file_name)[0]
+    clean = clean_imports if clean is None else clean
+    namespace = os.path.splitext(os.path.basename(file_name))[0]
+    if clean:
+        namespace = _unique_namespace(IMPORT_NAMESPACE)
 
     try:
-        cmds.file(
-            file_path,
-            i=True,
-            type="mayaAscii",
-            ignoreVersion=True,
-            ra=True,
-            mergeNamespacesOnClash=True,
-            namespace=namespace
-        )
+        with cfrProfile.phase("import"):
+            new_nodes = cmds.file(
+                file_path,
+                i=True,
+                type="mayaAscii",
+                ignoreVersion=True,
+                ra=True,
+                mergeNamespacesOnClash=not clean,
+                namespace=namespace,
+                returnNewNodes=True
+            ) or []
     except Exception as e:
         cmds.warning(f"[CurveForRigging] ❌ Could not import {file_name}: {e}")
         return None
 
-
-    after = set(cmds.ls(tr=True))
-    new_objs = list(after - before)
+    # only look at what this import created, never at the whole scene
+    with cfrProfile.phase("scene diff"):
+        new_objs = sorted(cmds.ls(new_nodes, type="transform", long=True) or [],
+                          key=lambda n: n.count("|"))
 
     if not new_objs:
         cmds.warning(f"[CurveForRigging] ⚠️ No objects imported{file_name}")
         return None
 
-    print(f"[CurveForRigging] ✅ Imported: {new_objs}")
+    if clean:
+        with cfrProfile.phase("clean"):
+            new_objs = _clean_import(new_nodes, new_objs, namespace)
+
+    cfrProfile.log(f"✅ Imported: {new_objs}")
+    return new_objs
+
+
+# ------------------------------------------------------------
+# UTIL: Build curve from cached shape data
+# ------------------------------------------------------------
+# "curve" : cmds.curve from the parsed CVs/knots (undoable)
+# "api"   : OpenMaya MFnNurbsCurve.create (fastest, not undoable)
+# "file"  : full cmds.file import of the .ma (original path)
+BACKENDS = ("curve", "api", "file")
+creation_backend = "curve"
+
+# True: multi-curve shapes (eyes, mouth ...) become one transform holding
+# every curve shape instead of a group with a transform per curve
+merge_shapes = False
+
+
+def set_backend(name):
+    global creation_backend
+    if name not in BACKENDS:
+        cmds.warning(f"[CurveForRigging] Unknown backend '{name}', use one of {BACKENDS}")
+        return creation_backend
+    creation_backend = name
+    return creation_backend
+
+
+def _apply_transform_attrs(node, xform):
+    for attr, default in (("rp", (0.0, 0.0, 0.0)), ("sp", (0.0, 0.0, 0.0)),
+                          ("t", (0.0, 0.0, 0.0)), ("r", (0.0, 0.0, 0.0)),
+                          ("s", (1.0, 1.0, 1.0))):
+        if tuple(xform[attr]) != default:
+            cmds.setAttr(f"{node}.{attr}", *xform[attr], type="double3")
+
+
+def _build_with_cmds(shape):
+    created = {}
+    for xform in shape["transforms"]:
+        parent = created.get(xform["parent"])
+        curves = xform["curves"]
+
+        if curves:
+            node = None
+            for curve in curves:
+                new = cmds.curve(
+                    d=curve["degree"],
+                    p=curve["cvs"],
+                    k=curve["knots"],
+                    per=curve["form"] == 2,
+                    n=xform["name"] if node is None else "cfrTmpCurve"
+                )
+                shape_node = cmds.listRelatives(new, s=True, f=True)[0]
+                if node is None:
+                    node = new
+                else:
+                    shape_node = cmds.parent(shape_node, node, s=True, r=True)[0]
+                    cmds.delete(new)
+                cmds.rename(shape_node, curve["name"])
+            if parent:
+                node = cmds.parent(node, parent, r=True)[0]
+        elif parent:
+            node = cmds.createNode("transform", n=xform["name"], p=parent)
+        else:
+            node = cmds.createNode("transform", n=xform["name"])
+
+        _apply_transform_attrs(node, xform)
+        created[xform["name"]] = cmds.ls(node, long=True)[0]
+
+    return [cmds.ls(node)[0] for node in created.values()]
+
+
+def _build_with_api(shape):
+    dag_mod = om.MDagModifier()
+    created = {}
+    for xform in shape["transforms"]:
+        parent = created.get(xform["parent"], om.MObject.kNullObj)
+        node = dag_mod.createNode("transform", parent)
+        dag_mod.renameNode(node, xform["name"])
+        created[xform["name"]] = node
+    dag_mod.doIt()
+
+    for xform in shape["transforms"]:
+        node = created[xform["name"]]
+        fn = om.MFnTransform(node)
+        fn.setRotatePivot(om.MPoint(*xform["rp"]), om.MSpace.kTransform, False)
+        fn.setScalePivot(om.MPoint(*xform["sp"]), om.MSpace.kTransform, False)
+        fn.setTranslation(om.MVector(*xform["t"]), om.MSpace.kTransform)
+        fn.setRotation(om.MEulerRotation(*[math.radians(a) for a in xform["r"]]), om.MSpace.kTransform)
+        fn.setScale(xform["s"])
+
+        for curve in xform["curves"]:
+            shape_obj = om.MFnNurbsCurve().create(
+                om.MPointArray([om.MPoint(*cv) for cv in curve["cvs"]]),
+                om.MDoubleArray(curve["knots"]),
+                curve["degree"],
+                curve["form"] + 1,  # MFnNurbsCurve: kOpen=1, kClosed=2, kPeriodic=3
+                False,
+                False,
+                node
+            )
+            om.MFnDependencyNode(shape_obj).setName(curve["name"])
+
+    return [om.MFnDagNode(node).partialPathName() for node in created.values()]
+
+
+def _mirror_nodes(nodes, axis):
+    # only for shapes without curve data, everything else is mirrored
+    # from the CVs before it is built
+    for node in nodes:
+        cmds.setAttr(f"{node}.s{axis}", -cmds.getAttr(f"{node}.s{axis}"))
+    cmds.makeIdentity(nodes, apply=True, t=0, r=0, s=1, n=0)
+
+
+def _merge_nodes(nodes):
+    # freeze everything below the root into its space, move the shapes up
+    # and drop the emptied transforms
+    root = nodes[0]
+    top = cmds.listRelatives(root, children=True, type="transform", f=True) or []
+    if not top:
+        return nodes
+    cmds.makeIdentity(top, apply=True, t=1, r=1, s=1, n=0)
+    transforms = top + (cmds.listRelatives(top, ad=True, type="transform", f=True) or [])
+    shapes = cmds.listRelatives(transforms, s=True, f=True) or []
+    if shapes:
+        cmds.parent(shapes, root, s=True, r=True)
+    cmds.delete(top)
+    return cmds.ls(root, long=True)
+
+
+def _instantiate(file_name, mirror_axis=None, merge=False):
+    new_objs = instantiate_curve(file_name)
+    if new_objs and mirror_axis:
+        _mirror_nodes(new_objs[:1], mirror_axis)
+    if new_objs and merge:
+        with cfrProfile.phase("merge"):
+            new_objs = _merge_nodes(new_objs)
+    return new_objs
+
+
+@cfrProfile.profiled("build_curve")
+def build_curve(file_name, backend=None, mirror_axis=None, merge=None):
+    backend = backend or creation_backend
+    merge = merge_shapes if merge is None else merge
+    if backend == "file":
+        return _instantiate(file_name, mirror_axis, merge)
+
+    with cfrProfile.phase("file read"):
+        shape = cfrShapes.get_shape(file_name)
+    if not cfrShapes.has_curves(shape):
+        # no nurbsCurve data in the file (e.g. locator only), import it once
+        return _instantiate(file_name, mirror_axis, merge)
+
+    if merge:
+        with cfrProfile.phase("file read"):
+            shape = cfrShapes.get_merged_shape(file_name, mirror_axis)
+    elif mirror_axis:
+        with cfrProfile.phase("file read"):
+            shape = cfrShapes.get_mirrored_shape(file_name, mirror_axis)
+
+    try:
+        with cfrProfile.phase("build"):
+            if backend == "api":
+                new_objs = _build_with_api(shape)
+            else:
+                new_objs = _build_with_cmds(shape)
+    except Exception as e:
+        cmds.warning(f"[CurveForRigging] ⚠️ {backend} backend failed for {file_name}, importing file: {e}")
+        return _instantiate(file_name, mirror_axis, merge)
+
+    cfrProfile.log(f"✅ Built: {new_objs}")
+    return new_objs
+
+
+# ------------------------------------------------------------
+# UTIL: Session template cache
+# ------------------------------------------------------------
+# Shapes that have to come from a file import are imported once into a
+# hidden, non-saved template group and duplicated from there afterwards.
+TEMPLATE_GROUP = "CurveForRigging_templates"
+_templates = {}     # file_name -> (mtime, [template root nodes])
+_scene_jobs = []
+
+
+def _do_not_write(nodes):
+    sel = om.MSelectionList()
+    for node in nodes:
+        sel.add(node)
+    for i in range(sel.length()):
+        om.MFnDependencyNode(sel.getDependNode(i)).setDoNotWrite(True)
+
+
+def _template_group():
+    if cmds.objExists(TEMPLATE_GROUP):
+        return TEMPLATE_GROUP
+    group = cmds.createNode("transform", n=TEMPLATE_GROUP, skipSelect=True)
+    cmds.setAttr(group + ".visibility", 0)
+    if cmds.attributeQuery("hiddenInOutliner", node=group, exists=True):
+        cmds.setAttr(group + ".hiddenInOutliner", 1)
+    _do_not_write([group])
+    return group
+
+
+def _template_for(file_name):
+    mtime = os.path.getmtime(os.path.join(curve_folder, file_name))
+    cached = _templates.get(file_name)
+    if cached and cached[0] == mtime and all(cmds.objExists(n) for n in cached[1]):
+        return cached[1]
+
+    if cached:
+        stale = [n for n in cached[1] if cmds.objExists(n)]
+        if stale:
+            cmds.delete(stale)
+
+    imported = import_curve(file_name)
+    if not imported:
+        _templates.pop(file_name, None)
+        return None
+
+    roots = [n for n in imported if not cmds.listRelatives(n, parent=True)]
+    cmds.delete(roots, constructionHistory=True)
+    roots = cmds.parent(roots, _template_group())
+    roots = cmds.ls(roots, long=True)
+    _do_not_write(roots + (cmds.listRelatives(roots, ad=True, f=True) or []))
+
+    _templates[file_name] = (mtime, roots)
+    return roots
+
+
+@cfrProfile.profiled("instantiate_curve")
+def instantiate_curve(file_name):
+    file_path = os.path.join(curve_folder, file_name)
+    if not os.path.exists(file_path):
+        cmds.warning(f"[CurveForRigging] Missing curve file: {file_path}")
+        return None
+
+    roots = _template_for(file_name)
+    if not roots:
+        return None
+
+    with cfrProfile.phase("duplicate"):
+        dup = cmds.duplicate(roots, rr=True)
+        dup = cmds.parent(dup, world=True)
+    with cfrProfile.phase("scene diff"):
+        dup = cmds.ls(dup, long=True)
+        children = cmds.listRelatives(dup, ad=True, type="transform", f=True) or []
+        new_objs = sorted(dup + children, key=lambda n: n.count("|"))
+
+    cfrProfile.log(f"✅ Instanced: {new_objs}")
     return new_objs
 
 
+def clear_cache(delete_templates=True):
+    if delete_templates and cmds.objExists(TEMPLATE_GROUP):
+        cmds.delete(TEMPLATE_GROUP)
+    _templates.clear()
+    cfrShapes.clear()
+
+
+def remove_scene_callbacks():
+    for job in _scene_jobs:
+        if cmds.scriptJob(exists=job):
+            cmds.scriptJob(kill=job, force=True)
+    del _scene_jobs[:]
+
+
+def install_scene_callbacks():
+    # new/open scene drops the template nodes with the old scene
+    remove_scene_callbacks()
+    for event in ("NewSceneOpened", "SceneOpened"):
+        _scene_jobs.append(cmds.scriptJob(event=[event, lambda: clear_cache(False)]))
+    return list(_scene_jobs)
+
+
+
+# ------------------------------------------------------------
+# UTIL: Snap controls to joints
+# ------------------------------------------------------------
+# "constraint" : temporary pointConstraint (original behaviour)
+# "translate"  : move the control pivot onto the joint from its world matrix
+# "orient"     : "translate" + align rotation with the joint
+SNAP_MODES = ("constraint", "translate", "orient")
+snap_mode = "translate"
+
+# how the snapped offset is removed from the control's channels
+# "freeze"        : makeIdentity, the offset is baked into the CVs (original behaviour)
+# "offset_matrix" : the local matrix moves into offsetParentMatrix, CVs are untouched
+# "none"          : keep the offset on translate/rotate/scale
+ZERO_MODES = ("freeze", "offset_matrix", "none")
+zero_mode = "freeze"
+
 
-def finalize_curve(imported, ctrl_name, color, snap_to=None):
-    import maya.cmds as cmds
+def _dag_paths(names):
+    unique = list(dict.fromkeys(names))
+    sel = om.MSelectionList()
+    for name in unique:
+        sel.add(name)
+    return {name: sel.getDagPath(i) for i, name in enumerate(unique)}
 
+
+def snap_controls(pairs, mode=None, zero=None):
+    # pairs: [(control, joint), ...] - one API pass reads every matrix,
+    # then plain setAttr writes, no constraint nodes are created
+    mode = mode or snap_mode
+    zero = zero or zero_mode
+    pairs = [(ctrl, joint) for ctrl, joint in pairs if ctrl and joint]
+    if not pairs:
+        return []
+
+    with cfrProfile.phase("snap"):
+        _snap(pairs, mode)
+
+    ctrls = [ctrl for ctrl, _ in pairs]
+    if zero == "offset_matrix":
+        with cfrProfile.phase("zero"):
+            zero_to_offset_matrix(ctrls)
+    elif zero == "freeze":
+        with cfrProfile.phase("freeze"):
+            cmds.makeIdentity(ctrls, apply=True, t=1, r=0, s=1, n=0)
+    return ctrls
+
+
+def zero_to_offset_matrix(nodes, hierarchy=False):
+    # moves each transform's local matrix into offsetParentMatrix and resets
+    # translate/rotate/scale, the world position and the CVs stay the same.
+    # hierarchy=True also zeroes every transform below the given nodes.
+    nodes = cmds.ls(nodes, type="transform", long=True) or []
+    if hierarchy:
+        nodes += cmds.listRelatives(nodes, ad=True, type="transform", f=True) or []
+    # joints and constraints are transforms too, their channels drive the rig
+    nodes = [n for n in dict.fromkeys(nodes) if cmds.objectType(n) == "transform"]
+    if not nodes:
+        return []
+    if not cmds.attributeQuery("offsetParentMatrix", node=nodes[0], exists=True):
+        cmds.warning("[CurveForRigging] ⚠️ offsetParentMatrix needs Maya 2020+, freezing instead.")
+        cmds.makeIdentity(nodes, apply=True, t=1, r=0, s=1, n=0)
+        return nodes
+
+    # read every matrix first: zeroing a parent never moves its children
+    paths = _dag_paths(nodes)
+    values = [(node, list(paths[node].inclusiveMatrix() * paths[node].exclusiveMatrixInverse()))
+              for node in nodes]
+
+    for node, matrix in values:
+        cmds.setAttr(node + ".offsetParentMatrix", matrix, type="matrix")
+        cmds.setAttr(node + ".translate", 0.0, 0.0, 0.0, type="double3")
+        cmds.setAttr(node + ".rotate", 0.0, 0.0, 0.0, type="double3")
+        cmds.setAttr(node + ".scale", 1.0, 1.0, 1.0, type="double3")
+    return nodes
+
+
+def _snap(pairs, mode):
+    if mode == "constraint":
+        for ctrl, joint in pairs:
+            cmds.delete(cmds.pointConstraint(joint, ctrl))
+    else:
+        paths = _dag_paths([n for pair in pairs for n in pair])
+        values = []
+        for ctrl, joint in pairs:
+            ctrl_path = paths[ctrl]
+            joint_matrix = paths[joint].inclusiveMatrix()
+            parent_inverse = ctrl_path.exclusiveMatrixInverse()
+            fn = om.MFnTransform(ctrl_path)
+
+            target = om.MPoint(om.MTransformationMatrix(joint_matrix).translation(om.MSpace.kWorld))
+            pivot = fn.rotatePivot(om.MSpace.kWorld)
+            translate = fn.translation(om.MSpace.kTransform) + (target - pivot) * parent_inverse
+
+            rotate = None
+            if mode == "orient":
+                local = om.MTransformationMatrix(joint_matrix * parent_inverse)
+                local.reorderRotation(fn.rotationOrder())
+                euler = local.rotation()
+                rotate = [math.degrees(a) for a in (euler.x, euler.y, euler.z)]
+            values.append((ctrl, translate, rotate))
+
+        for ctrl, translate, rotate in values:
+            cmds.setAttr(ctrl + ".translate", translate.x, translate.y, translate.z, type="double3")
+            if rotate is not None:
+                cmds.setAttr(ctrl + ".rotate", *rotate, type="double3")
+
+
+@cfrProfile.profiled("finalize_curve")
+def finalize_curve(imported, ctrl_name, color, snap_to=None, snap_mode=None):
     if not imported:
         cmds.warning("[CurveForRigging] ❌ No imported curve to snap to joint.")
         return None
 
     for node in imported:
         if cmds.objectType(node) == "transform":
-            new_name = cmds.rename(node, ctrl_name)
-            cmds.setAttr(new_name + ".overrideEnabled", 1)
-            cmds.setAttr(new_name + ".overrideColor", color)
+            with cfrProfile.phase("rename"):
+                new_name = cmds.rename(node, ctrl_name)
+            with cfrProfile.phase("color"):
+                cmds.setAttr(new_name + ".overrideEnabled", 1)
+                cmds.setAttr(new_name + ".overrideColor", color)
                 #snap loint
             if snap_to and cmds.objExists(snap_to):
                 try:
                     snap_target = cmds.ls(snap_to, long=True)[0]  # ✅ ล็อกชื่อเต็มของ joint
-                    print(f"[CurveForRigging] 🔄 Snapping {new_name} to {snap_target}")
-                    cmds.delete(cmds.pointConstraint(snap_target, new_name))
-                    cmds.makeIdentity(new_name, apply=True, t=1, r=0, s=1, n=0)
+                    cfrProfile.log(f"🔄 Snapping {new_name} to {snap_target}")
+                    snap_controls([(new_name, snap_target)], snap_mode)
                 except Exception as e:
                     cmds.warning(f"[CurveForRigging] ⚠️ Could not snap to {snap_to}: {e}")
 
             else:
-                print("[CurveForRigging] ℹ️ No joint selected, control created at origin.")
+                cfrProfile.log("ℹ️ No joint selected, control created at origin.")
 
-            print(f"[CurveForRigging] ✅ Created {ctrl_name}")
+            cfrProfile.log(f"✅ Created {ctrl_name}")
             return new_name
 
 
+# ------------------------------------------------------------
+# CONTROL TAGS
+# ------------------------------------------------------------
+# Every created control records the shape id it was built from
+# (cfrControl) and gets a message connection from its joint (cfrJoint).
+# The CurveForRigging_controls network node lists all controls, and once
+# more per shape id, so each lookup is one listConnections instead of a
+# name scan of the scene. Connections follow renames and deletes. A
+# control built mirrored also records the axis (cfrMirror), so a shape
+# swap stays mirrored.
+CONTROL_TAG = "cfrControl"
+JOINT_TAG = "cfrJoint"
+MIRROR_TAG = "cfrMirror"
+CONTROL_INDEX = "CurveForRigging_controls"
+tag_controls = True
+
+
+def _index_attr(shape_id):
+    return "shape_" + re.sub(r"[^0-9a-zA-Z_]", "_", shape_id)
+
+
+def _control_index(create=True):
+    if cmds.objExists(CONTROL_INDEX):
+        return CONTROL_INDEX
+    if not create:
+        return None
+    index = cmds.createNode("network", n=CONTROL_INDEX, skipSelect=True)
+    cmds.addAttr(index, ln="controls", at="message", multi=True, indexMatters=False)
+    return index
+
 
+def tag_control(ctrl, shape_id, joint=None):
+    index = _control_index()
+    shape_attr = _index_attr(shape_id)
+    if not cmds.attributeQuery(shape_attr, node=index, exists=True):
+        cmds.addAttr(index, ln=shape_attr, at="message", multi=True, indexMatters=False)
+
+    if not cmds.attributeQuery(CONTROL_TAG, node=ctrl, exists=True):
+        cmds.addAttr(ctrl, ln=CONTROL_TAG, dt="string")
+    cmds.setAttr(f"{ctrl}.{CONTROL_TAG}", shape_id, type="string")
+
+    # re-tagging moves the control to its new shape list
+    plugs = [p.split(".", 1)[1] for p in cmds.listConnections(ctrl + ".message", s=False, p=True) or []
+             if p.split(".", 1)[0] == index]
+    for plug in plugs:
+        if plug.split("[", 1)[0] not in ("controls", shape_attr):
+            cmds.disconnectAttr(ctrl + ".message", f"{index}.{plug}")
+    if not any(p.startswith("controls[") for p in plugs):
+        cmds.connectAttr(ctrl + ".message", index + ".controls", na=True)
+    if not any(p.startswith(shape_attr + "[") for p in plugs):
+        cmds.connectAttr(ctrl + ".message", f"{index}.{shape_attr}", na=True)
+
+    if joint:
+        if not cmds.attributeQuery(JOINT_TAG, node=ctrl, exists=True):
+            cmds.addAttr(ctrl, ln=JOINT_TAG, at="message")
+        cmds.connectAttr(joint + ".message", f"{ctrl}.{JOINT_TAG}", f=True)
+    return ctrl
+
+
+def tag_mirror(ctrl, axis):
+    # axis=None marks a control that was mirrored before as unmirrored
+    if not cmds.attributeQuery(MIRROR_TAG, node=ctrl, exists=True):
+        if not axis:
+            return ctrl
+        cmds.addAttr(ctrl, ln=MIRROR_TAG, dt="string")
+    cmds.setAttr(f"{ctrl}.{MIRROR_TAG}", axis or "", type="string")
+    return ctrl
+
+
+def all_controls():
+    index = _control_index(create=False)
+    if not index:
+        return []
+    return cmds.listConnections(index + ".controls", s=True, d=False) or []
+
+
+def controls_of_shape(shape_id):
+    index = _control_index(create=False)
+    if not index or not cmds.attributeQuery(_index_attr(shape_id), node=index, exists=True):
+        return []
+    return cmds.listConnections(f"{index}.{_index_attr(shape_id)}", s=True, d=False) or []
+
+
+def controls_for_joint(joint):
+    plugs = cmds.listConnections(joint + ".message", s=False, d=True, p=True) or []
+    return [p.split(".", 1)[0] for p in plugs if p.split(".", 1)[1] == JOINT_TAG]
+
+
+def control_joint(ctrl):
+    if not cmds.attributeQuery(JOINT_TAG, node=ctrl, exists=True):
+        return None
+    joints = cmds.listConnections(f"{ctrl}.{JOINT_TAG}", s=True, d=False) or []
+    return joints[0] if joints else None
 
 
 # ------------------------------------------------------------
-# HEAD
+# ANY CATEGORY
 # ------------------------------------------------------------
-HEAD_CURVE_MAP = {
-    "Eyes":     ("eyes.ma",      "Eyes_CTRL",     18),
-    "Mouth":    ("mouth.ma",     "Mouth_CTRL",    13),
-    "Eyebrow":  ("eyebrow.ma",   "Brow_CTRL",      6),
-    "Jaw":      ("jaw.ma",       "Jaw_CTRL",      17),
-    "Head":     ("head.ma",      "Head_CTRL",     17),
-}
-
-def create_head_ctrl(name, snap_to=None):
-    if name not in HEAD_CURVE_MAP:
-        cmds.warning(f"[CurveForRigging] No head curve for: {name}")
+# Categories and shapes come from curves/manifest.json (see cfrRegistry),
+# name is the shape id or its label ("Leg Upper").
+@cfrProfile.profiled("create_ctrl")
+def create_ctrl(category, name, snap_to=None, ctrl_name=None, snap_mode=None, merge=None, joint=None):
+    # joint: the joint recorded in the control tag, defaults to snap_to
+    shape = cfrRegistry.find(category, name)
+    if shape is None:
+        cmds.warning(f"[CurveForRigging] No {category} curve for: {name}")
         return
 
-    file_name, ctrl_name, color = HEAD_CURVE_MAP[name]
-    return finalize_curve(import_curve(file_name), ctrl_name, color, snap_to)
+    new_objs = build_curve(shape["file"], merge=merge)
+    ctrl = finalize_curve(new_objs, ctrl_name or shape["ctrl_name"], shape["color"], snap_to, snap_mode)
+    if ctrl and tag_controls:
+        with cfrProfile.phase("tag"):
+            tag_control(ctrl, shape["id"], joint or snap_to)
+    return ctrl
 
 
 # ------------------------------------------------------------
-# BODY
+# CATEGORY SHORTCUTS
 # ------------------------------------------------------------
-BODY_CURVE_MAP = {
-    "Root":   ("root.ma",   "Root_CTRL",   17),
-    "Pelvis": ("pelvis.ma", "Pelvis_CTRL", 17),
-    "Back1":  ("back1.ma",  "Back1_CTRL",  17),
-    "Back2":  ("back2.ma",  "Back2_CTRL",  17),
-    "Back3":  ("back3.ma",  "Back3_CTRL",  17),
-}
+# The per-category entry points and *_CURVE_MAP dicts of the first
+# release, kept for shelf scripts. The maps are read from the registry
+# on every access, so they follow manifest edits.
+_CURVE_MAP_NAMES = {"HEAD_CURVE_MAP": "head", "BODY_CURVE_MAP": "body",
+                    "ARM_CURVE_MAP": "arm", "LEG_CURVE_MAP": "leg"}
 
-def create_body_ctrl(name, snap_to=None):
-    if name not in BODY_CURVE_MAP:
-        cmds.warning(f"[CurveForRigging] No body curve for: {name}")
-        return
 
-    file_name, ctrl_name, color = BODY_CURVE_MAP[name]
-    return finalize_curve(import_curve(file_name), ctrl_name, color, snap_to)
+def __getattr__(name):
+    if name in _CURVE_MAP_NAMES:
+        return cfrRegistry.curve_map(_CURVE_MAP_NAMES[name])
+    if name == "CURVE_MAPS":
+        return {c["id"]: cfrRegistry.curve_map(c["id"]) for c in cfrRegistry.categories()}
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def create_head_ctrl(name, snap_to=None, ctrl_name=None):
+    return create_ctrl("head", name, snap_to, ctrl_name)
+
+
+def create_body_ctrl(name, snap_to=None, ctrl_name=None):
+    return create_ctrl("body", name, snap_to, ctrl_name)
+
+
+def create_arm_ctrl(name, snap_to=None, ctrl_name=None):
+    return create_ctrl("arm", name, snap_to, ctrl_name)
+
+
+def create_leg_ctrl(name, snap_to=None, ctrl_name=None):
+    return create_ctrl("leg", name, snap_to, ctrl_name)
 
 
 # ------------------------------------------------------------
-# ARM
+# AUTO RIG
 # ------------------------------------------------------------
-ARM_CURVE_MAP = {
-    "Clavicle": ("clavicle.ma", "Clavicle_CTRL", 18),
-    "Elbow":    ("elbow.ma",    "Elbow_CTRL",    18),
-    "Wrist":    ("wrist.ma",    "Wrist_CTRL",    18),
-    "Finger":   ("finger.ma",   "Finger_CTRL",   18),
-}
+# (joint name pattern, category, curve) - first match wins, so keep the
+# more specific patterns above the generic ones. Patterns see the lower
+# case short name without its joint suffix and with numbers written
+# plainly: "C_Spine_01_jnt" is matched as "c_spine1".
+JOINT_PATTERNS = [
+    ("*eyebrow*",       "head", "Eyebrow"),
+    ("*brow*",          "head", "Eyebrow"),
+    ("*eye*",           "head", "Eyes"),
+    ("*mouth*",         "head", "Mouth"),
+    ("*jaw*",           "head", "Jaw"),
+    ("*head*",          "head", "Head"),
+    ("*root*",          "body", "Root"),
+    ("*pelvis*",        "body", "Pelvis"),
+    ("*spine1",         "body", "Back1"),
+    ("*spine1[!0-9]*",  "body", "Back1"),
+    ("*spine2",         "body", "Back2"),
+    ("*spine2[!0-9]*",  "body", "Back2"),
+    ("*spine3",         "body", "Back3"),
+    ("*spine3[!0-9]*",  "body", "Back3"),
+    ("*back1",          "body", "Back1"),
+    ("*back1[!0-9]*",   "body", "Back1"),
+    ("*back2",          "body", "Back2"),
+    ("*back2[!0-9]*",   "body", "Back2"),
+    ("*back3",          "body", "Back3"),
+    ("*back3[!0-9]*",   "body", "Back3"),
+    ("*clavicle*",      "arm",  "Clavicle"),
+    ("*shoulder*",      "arm",  "Clavicle"),
+    ("*elbow*",         "arm",  "Elbow"),
+    ("*forearm*",       "arm",  "Elbow"),
+    # fingers before hand: "LeftHandIndex1" is a finger
+    ("*finger*",        "arm",  "Finger"),
+    ("*thumb*",         "arm",  "Finger"),
+    ("*index*",         "arm",  "Finger"),
+    ("*middle*",        "arm",  "Finger"),
+    ("*ring*",          "arm",  "Finger"),
+    ("*pinky*",         "arm",  "Finger"),
+    ("*wrist*",         "arm",  "Wrist"),
+    ("*hand*",          "arm",  "Wrist"),
+    ("*hip*",           "leg",  "Hip"),
+    ("*thigh*",         "leg",  "Leg Upper"),
+    ("*upleg*",         "leg",  "Leg Upper"),
+    ("*leg*upper*",     "leg",  "Leg Upper"),
+    ("*knee*",          "leg",  "Knee"),
+    ("*shin*",          "leg",  "Leg Lower"),
+    ("*calf*",          "leg",  "Leg Lower"),
+    ("*leg*lower*",     "leg",  "Leg Lower"),
+    ("*ankle*",         "leg",  "Foot"),
+    ("*foot*",          "leg",  "Foot"),
+    ("*toe*",           "leg",  "Foot"),
+]
 
-def create_arm_ctrl(name, snap_to=None):
-    if name not in ARM_CURVE_MAP:
-        cmds.warning(f"[CurveForRigging] No arm curve for: {name}")
-        return
+_JOINT_SUFFIX = re.compile(r"_?(jnt|jt|joint|bind|bnd)$", re.IGNORECASE)
+_JOINT_NUMBER = re.compile(r"_?0*(\d+)")     # "_01" / "01" / "1" -> "1"
+
+
+def short_name(node):
+    return node.split("|")[-1].split(":")[-1]
+
+
+def ctrl_name_for(joint):
+    return _JOINT_SUFFIX.sub("", short_name(joint)) + "_CTRL"
 
-    file_name, ctrl_name, color = ARM_CURVE_MAP[name]
-    return finalize_curve(import_curve(file_name), ctrl_name, color, snap_to)
+
+def match_joint(joint, patterns=None):
+    name = _JOINT_SUFFIX.sub("", short_name(joint)).lower()
+    name = _JOINT_NUMBER.sub(r"\1", name)
+    for pattern, category, curve in (patterns or JOINT_PATTERNS):
+        if fnmatch.fnmatchcase(name, pattern.lower()):
+            return category, curve
+    return None
+
+
+@cfrProfile.profiled("auto_rig")
+def auto_rig(root_joint, patterns=None, snap_mode=None, merge=None):
+    if not cmds.objExists(root_joint) or cmds.objectType(root_joint) != "joint":
+        cmds.warning(f"[CurveForRigging] ⚠️ '{root_joint}' is not a joint.")
+        return {}
+
+    # listRelatives -ad is deepest first, reverse it so parents come first
+    joints = cmds.ls(root_joint, long=True)
+    joints += list(reversed(cmds.listRelatives(root_joint, ad=True, type="joint", f=True) or []))
+
+    plan = []
+    for joint in joints:
+        match = match_joint(joint, patterns)
+        if match:
+            plan.append((joint, match))
+
+    created = {}
+    cmds.undoInfo(openChunk=True, chunkName="CurveForRigging_autoRig")
+    cmds.refresh(suspend=True)
+    try:
+        with cfrProfile.silenced():
+            for joint, (category, curve) in plan:
+                ctrl = create_ctrl(category, curve, ctrl_name=ctrl_name_for(joint), merge=merge, joint=joint)
+                if ctrl:
+                    created[joint] = ctrl
+
+        # snap everything in one pass instead of once per control
+        snap_controls([(ctrl, joint) for joint, ctrl in created.items()], snap_mode)
+    finally:
+        cmds.refresh(suspend=False)
+        cmds.undoInfo(closeChunk=True)
+
+    cfrProfile.log(f"✅ Auto rig: {len(created)} controls for {len(joints)} joints")
+    return created
 
 
 # ------------------------------------------------------------
-# LEG
+# MIRROR
 # ------------------------------------------------------------
-LEG_CURVE_MAP = {
-    "Hip":        ("hip.ma",        "Hip_CTRL",        14),
-    "Leg Upper":  ("leg_upper.ma",  "LegUpper_CTRL",   14),
-    "Knee":       ("knee.ma",       "Knee_CTRL",       14),
-    "Leg Lower":  ("leg_lower.ma",  "LegLower_CTRL",   14),
-    "Foot":       ("foot.ma",       "Foot_CTRL",       14),
+SIDE_COLORS = {"L": 6, "R": 13}
+
+_SIDE_PATTERNS = (
+    re.compile(r"^(?P<side>[LlRr])_"),
+    re.compile(r"_(?P<side>[LlRr])_"),
+    re.compile(r"_(?P<side>[LlRr])$"),
+    # whole words only: "LeftArm", "arm_left", "spineRight2", not "upright"
+    re.compile(r"(?:^|(?<=[_a-z0-9]))(?P<side>Left|Right)(?=$|[_A-Z0-9])"),
+    re.compile(r"(?:^|(?<=_))(?P<side>left|right)(?=$|[_A-Z0-9])"),
+)
+_SIDE_SWAP = {
+    "L": "R", "R": "L", "l": "r", "r": "l",
+    "Left": "Right", "Right": "Left", "left": "right", "right": "left",
 }
 
-def create_leg_ctrl(name, snap_to=None):
-    if name not in LEG_CURVE_MAP:
-        cmds.warning(f"[CurveForRigging] No leg curve for: {name}")
+
+def _side_match(name):
+    for pattern in _SIDE_PATTERNS:
+        match = pattern.search(name)
+        if match:
+            return match
+    return None
+
+
+def side_of(node):
+    match = _side_match(short_name(node))
+    return match.group("side")[0].upper() if match else None
+
+
+def strip_side(name):
+    # "L_clavicle" -> "clavicle", "arm_R_upper" -> "arm_upper", "LeftArm" -> "Arm"
+    match = _side_match(name)
+    if not match:
+        return name
+    head, tail = name[:match.start()].rstrip("_"), name[match.end():].lstrip("_")
+    separator = "_" if "_" in match.group(0) and head and tail else ""
+    return head + separator + tail
+
+
+def mirror_name(node):
+    leaf = node.split("|")[-1]
+    name = short_name(node)
+    match = _side_match(name)
+    if not match:
+        return None
+    start, end = match.span("side")
+    namespace = leaf[:len(leaf) - len(name)]
+    return namespace + name[:start] + _SIDE_SWAP[match.group("side")] + name[end:]
+
+
+def _opposite_joint(joint):
+    # the same path with every side swapped ("|root|L_arm|L_hand" ->
+    # "|root|R_arm|R_hand"), else the only joint of the mirrored name in
+    # the joint's namespace
+    name = mirror_name(joint)
+    if not name:
+        return None
+    path = "|".join(mirror_name(part) or part for part in joint.split("|"))
+    found = cmds.ls(path, type="joint", long=True) or []
+    if not found:
+        found = cmds.ls(name, type="joint", long=True) or []
+    if len(found) > 1:
+        cmds.warning(f"[CurveForRigging] ⚠️ Several joints named {name}, none is used for {short_name(joint)}")
+        return None
+    return found[0] if found else None
+
+
+@cfrProfile.profiled("create_mirrored")
+def create_mirrored(category, name, joints, axis="x", snap_mode=None, merge=None):
+    shape = cfrRegistry.find(category, name)
+    if shape is None:
+        cmds.warning(f"[CurveForRigging] No {category} curve for: {name}")
+        return []
+
+    file_name, color = shape["file"], shape["color"]
+
+    pairs = []
+    seen = set()
+    for joint in cmds.ls(joints, type="joint", long=True):
+        if joint in seen:
+            continue
+        opposite = _opposite_joint(joint)
+        if not opposite:
+            cmds.warning(f"[CurveForRigging] ⚠️ No opposite joint found for {joint}")
+            continue
+        seen.update((joint, opposite))
+        pairs.append((joint, opposite))
+
+    created = []
+    cmds.undoInfo(openChunk=True, chunkName="CurveForRigging_mirror")
+    cmds.refresh(suspend=True)
+    try:
+        with cfrProfile.silenced():
+            for joint, opposite in pairs:
+                for target, mirror_axis in ((joint, None), (opposite, axis)):
+                    ctrl = finalize_curve(build_curve(file_name, mirror_axis=mirror_axis, merge=merge),
+                                          ctrl_name_for(target),
+                                          SIDE_COLORS.get(side_of(target), color))
+                    if ctrl:
+                        if tag_controls:
+                            tag_control(ctrl, shape["id"], target)
+                        tag_mirror(ctrl, mirror_axis)
+                        created.append((ctrl, target))
+        snap_controls(created, snap_mode)
+    finally:
+        cmds.refresh(suspend=False)
+        cmds.undoInfo(closeChunk=True)
+
+    cfrProfile.log(f"✅ Mirrored {len(pairs)} {name} pairs")
+    return [ctrl for ctrl, _ in created]
+
+
+# ------------------------------------------------------------
+# BULK RENAME
+# ------------------------------------------------------------
+# plan_renames(nodes, "{side}_{joint}_{index}_CTRL", padding=2)
+#
+# Tokens: {name} current name (after search/replace), {index} counter
+# (start, step, zero padded), {side} L/R, {joint} tagged joint without
+# its side and suffix, {shape} tagged shape id. Separators around empty tokens are
+# dropped. Every target name is worked out first and checked against one
+# snapshot of the scene names, so a clash gets a predictable number
+# instead of whatever Maya picks, then all renames run in one pass.
+_RENAME_TOKEN = re.compile(r"\{(\w+)\}")
+_INVALID_NAME = re.compile(r"[^0-9a-zA-Z_]")
+
+
+def _rename_tokens(node, name, index, padding):
+    joint = control_joint(node) if cmds.attributeQuery(JOINT_TAG, node=node, exists=True) else None
+    shape_id = ""
+    if cmds.attributeQuery(CONTROL_TAG, node=node, exists=True):
+        shape_id = cmds.getAttr(f"{node}.{CONTROL_TAG}") or ""
+    return {
+        "name": name,
+        "index": str(index).zfill(padding),
+        "side": side_of(node) or (side_of(joint) if joint else None) or "",
+        "joint": strip_side(_JOINT_SUFFIX.sub("", short_name(joint)) if joint
+                            else re.sub(r"_?ctrl$", "", name, flags=re.I)),
+        "shape": shape_id,
+    }
+
+
+def plan_renames(nodes, pattern="{name}", search=None, replace="", start=1, step=1, padding=2, regex=False):
+    # [(long node name, new name), ...] without touching the scene
+    nodes = list(dict.fromkeys(cmds.ls(nodes, long=True) or []))
+    leaves = [node.split("|")[-1] for node in nodes]
+
+    # names that stay taken: every scene name except the ones being renamed
+    taken = {}
+    for name in cmds.ls() or []:
+        leaf = name.split("|")[-1]
+        taken[leaf] = taken.get(leaf, 0) + 1
+    for leaf in leaves:
+        taken[leaf] -= 1
+
+    plan = []
+    for i, (node, leaf) in enumerate(zip(nodes, leaves)):
+        namespace = leaf[:len(leaf) - len(short_name(node))]
+        name = short_name(node)
+        if search:
+            name = re.sub(search, replace, name) if regex else name.replace(search, replace)
+
+        tokens = _rename_tokens(node, name, start + i * step, padding)
+        new = _RENAME_TOKEN.sub(lambda m: tokens.get(m.group(1), m.group(0)), pattern)
+        new = re.sub(r"_{2,}", "_", _INVALID_NAME.sub("_", new)).strip("_") or name
+        if new[0].isdigit():
+            new = "_" + new
+
+        target, n = namespace + new, 0
+        while taken.get(target):
+            n += 1
+            target = f"{namespace}{new}{n}"
+        taken[target] = 1
+        plan.append((node, target))
+    return plan
+
+
+def _object_name(obj, full=True):
+    if obj.hasFn(om.MFn.kDagNode):
+        fn = om.MFnDagNode(obj)
+        return fn.fullPathName() if full else fn.partialPathName()
+    return om.MFnDependencyNode(obj).name()
+
+
+@cfrProfile.profiled("bulk_rename")
+def bulk_rename(nodes, pattern="{name}", search=None, replace="", start=1, step=1, padding=2,
+                regex=False, undoable=True):
+    # undoable=False renames through one MDagModifier (fastest, not undoable)
+    with cfrProfile.phase("plan"):
+        plan = [(node, new) for node, new in plan_renames(nodes, pattern, search, replace, start, step,
+                                                          padding, regex)
+                if node.split("|")[-1] != new]
+    if not plan:
+        return []
+
+    # DAG paths follow the nodes, so renaming a parent never breaks a child's path
+    sel = om.MSelectionList()
+    for node, _ in plan:
+        sel.add(node)
+    objects = [sel.getDependNode(i) for i in range(sel.length())]
+
+    # a target can still be the current name of a later node (A -> B, B -> A)
+    pending = {node.split("|")[-1] for node, _ in plan}
+    steps = [(obj, f"cfrRenameTmp{i}") for i, (obj, (_, new)) in enumerate(zip(objects, plan)) if new in pending]
+    steps += [(obj, new) for obj, (_, new) in zip(objects, plan)]
+
+    with cfrProfile.phase("rename"):
+        if not undoable:
+            dag_mod = om.MDagModifier()
+            for obj, new in steps:
+                dag_mod.renameNode(obj, new)
+            dag_mod.doIt()
+        else:
+            cmds.undoInfo(openChunk=True, chunkName="CurveForRigging_rename")
+            try:
+                for obj, new in steps:
+                    cmds.rename(_object_name(obj), new)
+            finally:
+                cmds.undoInfo(closeChunk=True)
+
+    result = [_object_name(obj, full=False) for obj in objects]
+    cfrProfile.log(f"✅ Renamed {len(result)} nodes")
+    return result
+
+
+# ------------------------------------------------------------
+# BULK DELETE
+# ------------------------------------------------------------
+# Controls come from the selection and/or the tag index (category or
+# shape ids). Parents a file import left in one of the tool's namespaces
+# ("wrist:group1") go with them once they would be empty, and so do the
+# emptied import namespaces, everything in one delete call and one undo
+# chunk. User groups, other namespaces and referenced nodes stay.
+_SKIP_NAMESPACES = ("UI", "shared")
+
+
+def _own_namespaces(namespaces=None):
+    # the namespaces the tool's imports created: cfrImport*, and shape file
+    # stems ("wrist") that hold tagged controls or template nodes. A user or
+    # asset namespace that only happens to be called "head" is not ours.
+    if namespaces is None:
+        namespaces = [ns for ns in cmds.namespaceInfo(":", listOnlyNamespaces=True, recurse=True) or []
+                      if ns not in _SKIP_NAMESPACES]
+    library = {os.path.splitext(os.path.basename(shape["file"]))[0] for shape in cfrRegistry.all_shapes()}
+    stems = [ns for ns in namespaces if ns.split(":")[-1] in library]
+    if not stems:
+        return [ns for ns in namespaces if ns.startswith(IMPORT_NAMESPACE)]
+
+    nodes = cmds.ls(all_controls(), long=True) or []
+    if cmds.objExists(TEMPLATE_GROUP):
+        nodes.append(TEMPLATE_GROUP)
+    if nodes:
+        nodes += cmds.listRelatives(nodes, ad=True, f=True) or []
+    used = {n.split("|")[-1].rsplit(":", 1)[0] for n in nodes if ":" in n.split("|")[-1]}
+    return [ns for ns in namespaces if ns.startswith(IMPORT_NAMESPACE) or (ns in stems and ns in used)]
+
+
+def _is_import_leftover(node, own):
+    leaf = node.split("|")[-1]
+    return ":" in leaf and leaf.rsplit(":", 1)[0] in own \
+        and not cmds.referenceQuery(node, isNodeReferenced=True)
+
+
+def _control_targets(nodes=None, category=None, shapes=None):
+    # the given nodes and/or the controls tagged with a category or shape ids
+    targets = cmds.ls(nodes, long=True) if nodes else []
+    if category or shapes:
+        shape_ids = set(shapes or ())
+        if category:
+            shape_ids.update(shape["id"] for shape in cfrRegistry.shapes_in(category))
+        tagged = [c for shape_id in sorted(shape_ids) for c in controls_of_shape(shape_id)]
+        tagged = cmds.ls(tagged, long=True) if tagged else []
+        # with a selection the filter narrows it down, otherwise it picks the controls
+        if nodes:
+            tagged = set(tagged)
+            targets = [n for n in targets if n in tagged]
+        else:
+            targets = tagged
+    return list(dict.fromkeys(targets))
+
+
+def delete_targets(nodes=None, category=None, shapes=None):
+    # every node delete_controls() would remove, parents before children
+    targets = _control_targets(nodes, category, shapes)
+    if not targets:
+        return []
+
+    # walk up through import parents that only held what is being deleted
+    own = set(_own_namespaces())
+    doomed = set(targets)
+    for node in sorted(targets, key=lambda n: -n.count("|")):
+        parent = node.rsplit("|", 1)[0]
+        while parent and parent not in doomed and _is_import_leftover(parent, own) \
+                and cmds.objectType(parent) == "transform" \
+                and all(c in doomed for c in cmds.listRelatives(parent, children=True, f=True) or []):
+            doomed.add(parent)
+            targets.append(parent)
+            parent = parent.rsplit("|", 1)[0]
+
+    # children of another target go with it
+    roots = []
+    for node in targets:
+        parts = node.split("|")
+        if not any("|".join(parts[:i]) in doomed for i in range(2, len(parts))):
+            roots.append(node)
+    return sorted(roots, key=lambda n: n.count("|"))
+
+
+@cfrProfile.profiled("delete_controls")
+def delete_controls(nodes=None, category=None, shapes=None):
+    with cfrProfile.phase("collect"):
+        targets = delete_targets(nodes, category, shapes)
+    if not targets:
+        cmds.warning("[CurveForRigging] ⚠️ Nothing to delete.")
+        return []
+
+    with cfrProfile.phase("collect"):
+        doomed = set(targets + (cmds.listRelatives(targets, ad=True, f=True) or []))
+        namespaces = {n.split("|")[-1].rsplit(":", 1)[0] for n in doomed if ":" in n.split("|")[-1]}
+        namespaces &= set(_own_namespaces())
+
+        # an import namespace goes too once none of its DAG nodes survive
+        # (the template cache still uses its own), with the script nodes in it
+        extra, empty = [], []
+        for namespace in sorted(namespaces, key=lambda ns: -ns.count(":")):
+            content = cmds.ls(namespace + ":*", long=True) or []
+            dag = set(cmds.ls(content, dag=True, long=True) or []) if content else set()
+            if dag <= doomed:
+                extra += [n for n in content if n not in dag]
+                empty.append(namespace)
+
+    cmds.undoInfo(openChunk=True, chunkName="CurveForRigging_delete")
+    try:
+        with cfrProfile.phase("delete"):
+            cmds.delete(targets + extra)
+        for namespace in empty:
+            try:
+                cmds.namespace(removeNamespace=namespace)
+            except RuntimeError:
+                pass
+    finally:
+        cmds.undoInfo(closeChunk=True)
+
+    cfrProfile.log(f"🗑️ Deleted {len(targets)} nodes")
+    return targets
+
+
+# ------------------------------------------------------------
+# SHAPE SWAP
+# ------------------------------------------------------------
+# swap_shapes() gives existing controls another library shape and keeps
+# the transform: name, parent, channels, offsetParentMatrix, keys,
+# constraints and every connection of the transform stay as they are.
+# The new curves are placed at the control's pivot (where a frozen
+# control keeps its joint) with the control's scale divided out, so the
+# channels stay normalized. match_size fits the new shape to the old
+# one's size instead of the library size. Shape level color overrides
+# and incoming connections of the old curves move to the new curves.
+# A control built with merge off loses its curve sub-transforms, the new
+# shape always goes straight under the control.
+SWAP_TYPES = ("nurbsCurve", "locator")
+_SHAPE_OVERRIDES = ("overrideEnabled", "overrideColor", "overrideRGBColors", "overrideColorRGB", "lineWidth")
+_GEOMETRY_INPUTS = ("create", "controlPoints", "cp")
+
+
+def _swap_shape_nodes(nodes):
+    return [s for s in cmds.listRelatives(nodes, s=True, f=True) or []
+            if cmds.objectType(s) in SWAP_TYPES and not om.MFnDagNode(_dag_paths([s])[s]).isIntermediateObject]
+
+
+def _shape_parts(ctrl):
+    # child transforms a control built with merge off brought along: not
+    # controls themselves and holding nothing but curves, anything else
+    # parented below the control (other controls, user groups) is not part
+    parts = []
+    for child in cmds.listRelatives(ctrl, children=True, type="transform", f=True) or []:
+        below = [child] + (cmds.listRelatives(child, ad=True, f=True) or [])
+        types = {cmds.objectType(n) for n in below}
+        if types <= {"transform", *SWAP_TYPES} and types & set(SWAP_TYPES) \
+                and not any(cmds.attributeQuery(CONTROL_TAG, node=n, exists=True) for n in below):
+            parts.append(child)
+    return parts
+
+
+def _extent(points):
+    if not points:
+        return 0.0
+    return max(max(p[i] for p in points) - min(p[i] for p in points) for i in range(3))
+
+
+def _swap_state(ctrl, old_shapes):
+    # what the new curves need from the old ones, read before they go
+    # curves of merge off sub-transforms are measured in ctrl's space
+    points, overrides, inputs = [], {}, []
+    ctrl_path = _dag_paths([ctrl])[ctrl]
+    for shape in old_shapes:
+        if cmds.objectType(shape) == "nurbsCurve":
+            path = _dag_paths([shape])[shape]
+            cvs = om.MFnNurbsCurve(path).cvPositions(om.MSpace.kObject)
+            if _parent_path(shape) != ctrl_path.fullPathName():
+                matrix = path.exclusiveMatrix() * ctrl_path.inclusiveMatrixInverse()
+                cvs = [p * matrix for p in cvs]
+            points += [(p.x, p.y, p.z) for p in cvs]
+            if not overrides and cmds.getAttr(shape + ".overrideEnabled"):
+                overrides = {a: cmds.getAttr(f"{shape}.{a}") for a in _SHAPE_OVERRIDES
+                             if cmds.attributeQuery(a, node=shape, exists=True)}
+        connections = cmds.listConnections(shape, s=True, d=False, c=True, p=True) or []
+        for own, source in zip(connections[::2], connections[1::2]):
+            attr = own.split(".", 1)[1]
+            if attr.split("[", 1)[0] not in _GEOMETRY_INPUTS and (attr, source) not in inputs:
+                inputs.append((attr, source))
+
+    anchor = cmds.getAttr(ctrl + ".rotatePivot")[0]
+    scale = [v or 1.0 for v in cmds.getAttr(ctrl + ".scale")[0]]
+    return {"extent": _extent(points), "overrides": overrides, "inputs": inputs,
+            "anchor": anchor, "scale": scale}
+
+
+def _swap_curves(shape, axis, state, match_size):
+    # the library curves in the control's object space
+    root = cfrShapes.get_merged_shape(shape["file"], axis)["transforms"][0]
+    matrix = cfrShapes.local_matrix(dict(root, t=(0.0, 0.0, 0.0)))
+    matrix = cfrShapes.mult_matrix(matrix, cfrShapes._scale_matrix([1.0 / s for s in state["scale"]]))
+    curves = [cfrShapes._transform_geometry(c, matrix) for c in root["curves"]]
+
+    size = _extent([cv for c in curves for cv in c["cvs"]])
+    factor = state["extent"] / size if match_size and state["extent"] and size else 1.0
+    matrix = cfrShapes.mult_matrix(cfrShapes._scale_matrix((factor,) * 3),
+                                   cfrShapes._translate_matrix(state["anchor"]))
+    return [cfrShapes._transform_geometry(c, matrix) for c in curves]
+
+
+def _add_curve_shapes(ctrl, curves, backend):
+    # curve shapes straight under ctrl, "api" is faster but not undoable
+    if backend == "api":
+        parent = _dag_paths([ctrl])[ctrl].node()
+        shapes = []
+        for curve in curves:
+            obj = om.MFnNurbsCurve().create(
+                om.MPointArray([om.MPoint(*cv) for cv in curve["cvs"]]),
+                om.MDoubleArray(curve["knots"]),
+                curve["degree"],
+                curve["form"] + 1,
+                False,
+                False,
+                parent
+            )
+            shapes.append(om.MFnDagNode(obj).fullPathName())
+        return shapes
+
+    temps = [cmds.curve(d=c["degree"], p=c["cvs"], k=c["knots"], per=c["form"] == 2, n="cfrTmpCurve") for c in curves]
+    shapes = cmds.parent(cmds.listRelatives(temps, s=True, f=True), ctrl, s=True, r=True)
+    cmds.delete(temps)
+    return cmds.ls(shapes, long=True)
+
+
+def _add_imported_shapes(ctrl, shape, axis, state):
+    # shapes without curve data (locators, construction history) are imported once
+    with cfrProfile.silenced():
+        temp = build_curve(shape["file"], mirror_axis=axis, merge=True)
+    shapes = cmds.listRelatives(temp[:1], s=True, f=True) or []
+    shapes = cmds.parent(shapes, ctrl, s=True, r=True) if shapes else []
+    cmds.delete(temp[:1])
+    shapes = cmds.ls(shapes, long=True)
+    for node in shapes:
+        if cmds.attributeQuery("localPosition", node=node, exists=True):
+            cmds.setAttr(node + ".localPosition", *state["anchor"], type="double3")
+    return shapes
+
+
+def _recorded_axis(ctrl):
+    if cmds.attributeQuery(MIRROR_TAG, node=ctrl, exists=True):
+        return cmds.getAttr(f"{ctrl}.{MIRROR_TAG}") or None
+    if not cmds.attributeQuery(SPEC_TAG, node=ctrl, exists=True):
+        return None
+    try:
+        return json.loads(cmds.getAttr(f"{ctrl}.{SPEC_TAG}")).get("axis")
+    except (TypeError, ValueError):
+        return None
+
+
+def _retag_swapped(ctrl, shape, axis):
+    if cmds.attributeQuery(CONTROL_TAG, node=ctrl, exists=True) or tag_controls:
+        tag_control(ctrl, shape["id"])
+    tag_mirror(ctrl, axis)
+    if cmds.attributeQuery(SPEC_TAG, node=ctrl, exists=True):
+        try:
+            key = json.loads(cmds.getAttr(f"{ctrl}.{SPEC_TAG}"))
+        except (TypeError, ValueError):
+            return
+        # the key describes the scene, the next build_spec compares it again
+        data = cfrShapes.get_shape(shape["file"])
+        key.update(shape=shape["id"], hash=cfrShapes.shape_hash(data) if data else None, axis=axis)
+        cmds.setAttr(f"{ctrl}.{SPEC_TAG}", json.dumps(key, sort_keys=True), type="string")
+
+
+def _swap(swaps, match_size=True, backend=None):
+    # swaps: [(control, registry shape, mirror axis)]
+    backend = backend or creation_backend
+    jobs = []
+    for ctrl, shape, axis in swaps:
+        if cmds.objectType(ctrl) != "transform":
+            continue
+        # the sub-transforms of a control built with merge off go with its shapes
+        parts = _shape_parts(ctrl)
+        old_shapes = _swap_shape_nodes(ctrl)
+        sub_shapes = _swap_shape_nodes(parts + (cmds.listRelatives(parts, ad=True, type="transform", f=True) or [])) \
+            if parts else []
+        jobs.append((ctrl, shape, axis, old_shapes + parts, _swap_state(ctrl, old_shapes + sub_shapes)))
+    if not jobs:
+        return []
+
+    paths = _dag_paths([job[0] for job in jobs])
+    doomed = [s for job in jobs for s in job[3]]
+    if doomed:
+        with cfrProfile.phase("delete"):
+            cmds.delete(doomed)
+
+    swapped = []
+    for ctrl, shape, axis, _, state in jobs:
+        ctrl = paths[ctrl].fullPathName()
+        with cfrProfile.phase("build"):
+            if cfrShapes.has_curves(cfrShapes.get_shape(shape["file"])):
+                new_shapes = _add_curve_shapes(ctrl, _swap_curves(shape, axis, state, match_size), backend)
+            else:
+                new_shapes = _add_imported_shapes(ctrl, shape, axis, state)
+
+        leaf = ctrl.split("|")[-1]
+        for i, node in enumerate(new_shapes):
+            node = cmds.rename(node, f"{leaf}Shape{i or ''}")
+            for attr, value in state["overrides"].items():
+                if isinstance(value, list):
+                    cmds.setAttr(f"{node}.{attr}", *value[0])
+                else:
+                    cmds.setAttr(f"{node}.{attr}", value)
+            for attr, source in state["inputs"]:
+                if cmds.attributeQuery(attr.split("[", 1)[0], node=node, exists=True):
+                    cmds.connectAttr(source, f"{node}.{attr}", f=True)
+
+        with cfrProfile.phase("tag"):
+            _retag_swapped(ctrl, shape, axis)
+        swapped.append(ctrl)
+    return swapped
+
+
+@cfrProfile.profiled("swap_shapes")
+def swap_shapes(category, name, nodes=None, shapes=None, match_size=True, axis=None):
+    # nodes: controls (a selected curve shape counts as its control),
+    # shapes: only controls tagged with these shape ids, or all of them
+    # without nodes. axis=None keeps the mirror axis the control recorded.
+    shape = cfrRegistry.find(category, name)
+    if shape is None:
+        cmds.warning(f"[CurveForRigging] No {category} curve for: {name}")
+        return []
+
+    if nodes:
+        nodes = cmds.ls(nodes, long=True) or []
+        nodes = [(cmds.listRelatives(n, parent=True, f=True) or [n])[0] if cmds.objectType(n) in SWAP_TYPES else n
+                 for n in nodes]
+    targets = [t for t in _control_targets(nodes, shapes=shapes) if cmds.objectType(t) == "transform"]
+    if not targets:
+        cmds.warning("[CurveForRigging] ⚠️ No controls to swap.")
+        return []
+
+    cmds.undoInfo(openChunk=True, chunkName="CurveForRigging_swap")
+    cmds.refresh(suspend=True)
+    try:
+        swapped = _swap([(ctrl, shape, axis or _recorded_axis(ctrl)) for ctrl in targets], match_size)
+    finally:
+        cmds.refresh(suspend=False)
+        cmds.undoInfo(closeChunk=True)
+
+    cfrProfile.log(f"🔁 Swapped {len(swapped)} controls to {shape['label']}")
+    return swapped
+
+
+# ------------------------------------------------------------
+# SCENE CLEANUP
+# ------------------------------------------------------------
+# Removes what older imports left behind: construction history nodes
+# nothing reads from any more, the script nodes each .ma import brings
+# into the tool's namespaces, and every namespace that is empty then.
+# flatten=True also moves the controls out of the tool's namespaces
+# ("wrist:nurbsCircleShape2" -> "nurbsCircleShape2"). Only namespaces
+# the tool created count as its own, see _own_namespaces().
+HELPER_TYPES = ("makeNurbCircle", "transformGeometry")
+
+
+@cfrProfile.profiled("cleanup_scene")
+def cleanup_scene(flatten=False):
+    namespaces = [ns for ns in cmds.namespaceInfo(":", listOnlyNamespaces=True, recurse=True) or []
+                  if ns not in _SKIP_NAMESPACES]
+    own = _own_namespaces(namespaces)
+
+    if flatten:
+        # template nodes live in the same namespaces, they are re-imported on demand
+        clear_cache()
+
+    with cfrProfile.phase("collect"):
+        doomed = [n for n in cmds.ls(type=HELPER_TYPES) or [] if not cmds.listConnections(n, s=False, d=True)]
+        for namespace in own:
+            doomed += cmds.ls(namespace + ":*", type="script") or []
+
+    removed = []
+    cmds.undoInfo(openChunk=True, chunkName="CurveForRigging_cleanup")
+    try:
+        if doomed:
+            with cfrProfile.phase("delete"):
+                cmds.delete(doomed)
+        for namespace in sorted(namespaces, key=lambda ns: -ns.count(":")):
+            # non-empty namespaces (templates, references, user data) refuse
+            try:
+                if flatten and namespace in own:
+                    cmds.namespace(removeNamespace=namespace, mergeNamespaceWithRoot=True)
+                else:
+                    cmds.namespace(removeNamespace=namespace)
+                removed.append(namespace)
+            except RuntimeError:
+                pass
+    finally:
+        cmds.undoInfo(closeChunk=True)
+
+    cfrProfile.log(f"🧹 Removed {len(doomed)} helper nodes and {len(removed)} namespaces")
+    return doomed, removed
+
+
+# ------------------------------------------------------------
+# SPEC BUILD
+# ------------------------------------------------------------
+# build_spec(spec) makes the scene match a rig-control spec (the cfrBatch
+# JSON). Every control it builds keeps its build key in cfrSpec: name,
+# shape id and content hash, joint, mirror axis, merge, snap and zero
+# mode. On the next build a control whose key still matches is left
+# alone, a changed color or parent is set in place, another shape is
+# swapped in place (see SHAPE SWAP), any other key change rebuilds only
+# that control (its children move to the new one) and a
+# spec control that is no longer listed is deleted (prune=False keeps
+# it). Controls made by hand are never touched.
+#
+# Entry keys: joint, shape (id, or label with category), name, color,
+# snap_mode, zero_mode, merge, parent (a node name, null for the world,
+# parenting is left alone without the key), mirror + axis (also builds
+# the opposite side). "auto_rig": root adds an entry per matched joint.
+SPEC_TAG = "cfrSpec"
+_KEY_FIELDS = ("name", "shape", "hash", "joint", "axis", "merge", "snap", "zero")
+_SWAP_FIELDS = ("shape", "hash", "axis")
+
+
+def _spec_key(record):
+    return json.dumps({field: record[field] for field in _KEY_FIELDS}, sort_keys=True)
+
+
+def _spec_shape(entry):
+    if entry.get("category"):
+        return cfrRegistry.find(entry["category"], entry["shape"])
+    return cfrRegistry.get(entry["shape"])
+
+
+def spec_records(spec):
+    # (every control the spec asks for, names whose joint is missing)
+    snap = spec.get("snap_mode") or snap_mode
+    zero = spec.get("zero_mode") or zero_mode
+    merge = bool(spec.get("merge", merge_shapes))
+    hashes = {}
+    records, missing = [], []
+
+    def add(entry, shape, name, joint, color, axis=None, parent=None):
+        if shape["file"] not in hashes:
+            data = cfrShapes.get_shape(shape["file"])
+            hashes[shape["file"]] = cfrShapes.shape_hash(data) if data else None
+            if data is None:
+                cmds.warning(f"[CurveForRigging] ⚠️ Could not read {shape['file']}, the controls using it are left as they are.")
+        if hashes[shape["file"]] is None:
+            missing.append(name)
+            return
+        record = {"name": name, "shape": shape["id"], "file": shape["file"], "hash": hashes[shape["file"]],
+                  "joint": joint, "axis": axis, "merge": bool(entry.get("merge", merge)),
+                  "snap": entry.get("snap_mode") or snap, "zero": entry.get("zero_mode") or zero,
+                  "color": int(entry.get("color", color))}
+        if "parent" in entry:
+            record["parent"] = parent
+        records.append(record)
+
+    if spec.get("auto_rig"):
+        root = cmds.ls(spec["auto_rig"], type="joint", long=True)
+        joints = root + list(reversed(cmds.listRelatives(root, ad=True, type="joint", f=True) or [])) if root else []
+        if not root:
+            cmds.warning(f"[CurveForRigging] ⚠️ '{spec['auto_rig']}' is not a joint.")
+        for joint in joints:
+            match = match_joint(joint)
+            shape = cfrRegistry.find(*match) if match else None
+            if shape:
+                add({}, shape, ctrl_name_for(joint), joint, shape["color"])
+
+    for entry in spec.get("controls", []):
+        shape = _spec_shape(entry)
+        if shape is None:
+            cmds.warning(f"[CurveForRigging] No {entry.get('category', '')} curve for: {entry['shape']}")
+            continue
+
+        joint = entry.get("joint")
+        name = entry.get("name") or (ctrl_name_for(joint) if joint else shape["ctrl_name"])
+        found = cmds.ls(joint, long=True) if joint else [None]
+        if not found:
+            cmds.warning(f"[CurveForRigging] ⚠️ Joint '{joint}' not found, {name} is left as it is.")
+            missing.append(name)
+            continue
+        if not entry.get("mirror"):
+            add(entry, shape, name, found[0], shape["color"], parent=entry.get("parent"))
+            continue
+
+        opposite = _opposite_joint(found[0])
+        if not opposite:
+            cmds.warning(f"[CurveForRigging] ⚠️ No opposite joint found for {joint}")
+            continue
+        parent = entry.get("parent")
+        for target, axis in ((found[0], None), (opposite, entry.get("axis", "x"))):
+            target_name = name if axis is None else (
+                mirror_name(name) if entry.get("name") and mirror_name(name) else ctrl_name_for(target))
+            target_parent = parent if axis is None or not parent else (mirror_name(parent) or parent)
+            add(entry, shape, target_name, target, SIDE_COLORS.get(side_of(target), shape["color"]),
+                axis, target_parent)
+
+    # the last entry for a name wins
+    unique = {}
+    for record in records:
+        if record["name"] in unique:
+            cmds.warning(f"[CurveForRigging] ⚠️ {record['name']} is listed twice in the spec, the last one is used.")
+        unique[record["name"]] = record
+    return list(unique.values()), missing
+
+
+def spec_controls():
+    # {spec name: (control, build key)} for the controls built by build_spec
+    result = {}
+    for ctrl in cmds.ls(all_controls(), long=True) or []:
+        if not cmds.attributeQuery(SPEC_TAG, node=ctrl, exists=True):
+            continue
+        key = cmds.getAttr(f"{ctrl}.{SPEC_TAG}")
+        try:
+            result[json.loads(key)["name"]] = (ctrl, key)
+        except (TypeError, ValueError, KeyError):
+            continue
+    return result
+
+
+def _parent_path(node):
+    parents = cmds.listRelatives(node, parent=True, f=True)
+    return parents[0] if parents else None
+
+
+def plan_spec(spec, prune=True):
+    # what build_spec would do, nothing is changed
+    records, missing = spec_records(spec)
+    existing = spec_controls()
+    names = {record["name"] for record in records}
+    plan = {"create": [], "rebuild": [], "swap": [], "update": [], "keep": [], "delete": []}
+
+    for record in records:
+        current = existing.pop(record["name"], None)
+        if current is None:
+            plan["create"].append(record)
+            continue
+        ctrl, key = current
+        if key != _spec_key(record):
+            old = json.loads(key)
+            changed = {field for field in _KEY_FIELDS if old.get(field) != record[field]}
+            # a group of transforms (merge off) can't be swapped into or out of
+            single = (record["merge"] or len(cfrShapes.get_shape(record["file"])["transforms"]) == 1) \
+                and not _shape_parts(ctrl)
+            if changed <= set(_SWAP_FIELDS) and single:
+                plan["swap"].append((ctrl, record))
+            else:
+                plan["rebuild"].append((ctrl, record))
+            continue
+
+        changes = []
+        if cmds.getAttr(ctrl + ".overrideColor") != record["color"]:
+            changes.append("color")
+        if "parent" in record:
+            wanted = cmds.ls(record["parent"], long=True) if record["parent"] else [None]
+            # a parent that is neither in the scene nor in the spec can't be set
+            if wanted[:1] != [_parent_path(ctrl)] and (wanted or record["parent"] in names):
+                changes.append("parent")
+        if changes:
+            plan["update"].append((ctrl, record, changes))
+        else:
+            plan["keep"].append(ctrl)
+
+    for name in missing:
+        existing.pop(name, None)
+    if prune:
+        plan["delete"] = [ctrl for ctrl, _ in existing.values()]
+    return plan
+
+
+def _build_spec_control(record):
+    ctrl = finalize_curve(build_curve(record["file"], mirror_axis=record["axis"], merge=record["merge"]),
+                          record["name"], record["color"])
+    if not ctrl:
+        return None
+    tag_control(ctrl, record["shape"], record["joint"])
+    tag_mirror(ctrl, record["axis"])
+    if not cmds.attributeQuery(SPEC_TAG, node=ctrl, exists=True):
+        cmds.addAttr(ctrl, ln=SPEC_TAG, dt="string")
+    cmds.setAttr(f"{ctrl}.{SPEC_TAG}", _spec_key(record), type="string")
+    if short_name(ctrl) != record["name"]:
+        cmds.warning(f"[CurveForRigging] ⚠️ {record['name']} is taken, the control was named {ctrl}")
+    return ctrl
+
+
+def _set_parent(node, parent):
+    if parent is None:
+        if _parent_path(node):
+            cmds.parent(node, world=True)
         return
+    found = cmds.ls(parent, long=True)
+    if not found:
+        cmds.warning(f"[CurveForRigging] ⚠️ Parent '{parent}' of {short_name(node)} not found.")
+    elif found[0] != _parent_path(node):
+        cmds.parent(node, found[0])
+
+
+@cfrProfile.profiled("build_spec")
+def build_spec(spec, prune=None):
+    # spec: a dict or the path of a JSON spec file
+    if isinstance(spec, str):
+        with open(spec, "r", encoding="utf-8") as f:
+            spec = json.load(f)
+    prune = spec.get("prune", True) if prune is None else prune
+
+    with cfrProfile.phase("plan"):
+        plan = plan_spec(spec, prune)
+    plan["built"] = []
+    if not (plan["create"] or plan["rebuild"] or plan["swap"] or plan["update"] or plan["delete"]):
+        cfrProfile.log(f"✅ Spec up to date ({len(plan['keep'])} controls)")
+        return plan
+
+    cmds.undoInfo(openChunk=True, chunkName="CurveForRigging_buildSpec")
+    cmds.refresh(suspend=True)
+    try:
+        # DAG paths follow the renames and reparenting below
+        existing = [ctrl for ctrl, _ in plan["rebuild"]] + [ctrl for ctrl, _, _ in plan["update"]] + plan["delete"]
+        paths = _dag_paths(existing) if existing else {}
+        if plan["swap"]:
+            with cfrProfile.silenced():
+                _swap([(ctrl, cfrRegistry.get(record["shape"]), record["axis"]) for ctrl, record in plan["swap"]],
+                      match_size=False)
+            # the key also carries merge, snap and zero, written as the spec has them
+            for ctrl, record in plan["swap"]:
+                cmds.setAttr(f"{ctrl}.{SPEC_TAG}", _spec_key(record), type="string")
+        for ctrl, _ in plan["rebuild"]:
+            cmds.rename(ctrl, short_name(ctrl) + "_cfrOld")
+
+        built, swaps = [], []
+        with cfrProfile.silenced():
+            for record in plan["create"]:
+                ctrl = _build_spec_control(record)
+                if ctrl:
+                    built.append((ctrl, record))
+            for old, record in plan["rebuild"]:
+                ctrl = _build_spec_control(record)
+                if ctrl:
+                    built.append((ctrl, record))
+                    swaps.append((paths[old], ctrl, record))
+        paths.update(_dag_paths([ctrl for ctrl, _ in built]) if built else {})
+        plan["built"] = [paths[ctrl].fullPathName() for ctrl, _ in built]
+
+        # one snap pass per snap/zero mode
+        groups = {}
+        for ctrl, record in built:
+            if record["joint"]:
+                groups.setdefault((record["snap"], record["zero"]), []).append(
+                    (paths[ctrl].fullPathName(), record["joint"]))
+        for (mode, zero), pairs in groups.items():
+            snap_controls(pairs, mode, zero)
+
+        # a rebuilt control takes the old one's place and children, its old
+        # curve transforms are deleted with it
+        for old, new, _ in swaps:
+            replaced = {o.fullPathName() for o, _, _ in swaps} | set(_shape_parts(old.fullPathName()))
+            children = [c for c in cmds.listRelatives(old.fullPathName(), children=True, type="transform", f=True)
+                        or [] if c not in replaced]
+            if children:
+                cmds.parent(children, paths[new].fullPathName())
+        for old, new, record in swaps:
+            if "parent" not in record:
+                parent = _parent_path(old.fullPathName())
+                parent = next((paths[n].fullPathName() for o, n, _ in swaps if o.fullPathName() == parent), parent)
+                if parent:
+                    cmds.parent(paths[new].fullPathName(), parent)
+
+        # parents last, they may have been created above
+        for ctrl, record in built:
+            if "parent" in record:
+                _set_parent(paths[ctrl].fullPathName(), record["parent"])
+        for ctrl, record, changes in plan["update"]:
+            ctrl = paths[ctrl].fullPathName()
+            if "color" in changes:
+                cmds.setAttr(ctrl + ".overrideEnabled", 1)
+                cmds.setAttr(ctrl + ".overrideColor", record["color"])
+            if "parent" in changes:
+                _set_parent(ctrl, record["parent"])
+
+        # what stays of a deleted control moves up to its parent
+        removed = [paths[ctrl] for ctrl in plan["delete"]]
+        for node in removed:
+            gone = {n.fullPathName() for n in removed}
+            children = [c for c in cmds.listRelatives(node.fullPathName(), children=True, type="transform", f=True)
+                        or [] if c not in gone]
+            if children:
+                parent = _parent_path(node.fullPathName())
+                if parent:
+                    cmds.parent(children, parent)
+                else:
+                    cmds.parent(children, world=True)
+
+        doomed = [old.fullPathName() for old, _, _ in swaps] + [n.fullPathName() for n in removed]
+        if doomed:
+            with cfrProfile.silenced():
+                delete_controls(doomed)
+    finally:
+        cmds.refresh(suspend=False)
+        cmds.undoInfo(closeChunk=True)
+
+    cfrProfile.log(f"✅ Spec: {len(plan['create'])} created, {len(plan['rebuild'])} rebuilt, "
+                   f"{len(plan['swap'])} swapped, {len(plan['update'])} updated, {len(plan['delete'])} deleted, {len(plan['keep'])} unchanged")
+    return plan
+
+
+# ------------------------------------------------------------
+# SHAPE BUNDLE
+# ------------------------------------------------------------
+def build_shape_bundle(path=None):
+    file_names = list(dict.fromkeys(shape["file"] for shape in cfrRegistry.all_shapes()))
+
+    bundle = cfrShapes.build_bundle(file_names, path)
+    cfrProfile.log(f"✅ Packed {len(file_names)} shapes into {bundle}")
+    return bundle
+
+
+# ------------------------------------------------------------
+# EXPORT
+# ------------------------------------------------------------
+# Control hierarchies in the scene -> compact .ma + thumbnail + manifest
+# entry. Every transform and curve is read in one API pass, nothing is
+# saved through Maya. "Tagged" controls carry a cfrShape string attribute
+# holding the shape id to export them as. A replaced entry keeps its
+# category, label, control name, tags and icon, only the curves change.
+EXPORT_TAG = "cfrShape"
+icon_folder = os.path.join(module_path, "icons")
+
+
+def _shape_id(node):
+    name = re.sub(r"_?ctrl$", "", short_name(node), flags=re.IGNORECASE)
+    return re.sub(r"[^0-9a-zA-Z]+", "_", name).strip("_").lower() or "shape"
+
+
+def tagged_curves():
+    return cmds.ls("*." + EXPORT_TAG, objectsOnly=True, long=True, recursive=True) or []
+
+
+def _export_roots(nodes):
+    # top-most transforms only, children are exported with their root
+    nodes = cmds.ls(nodes, type="transform", long=True) or []
+    selected = set(nodes)
+    roots = []
+    for node in nodes:
+        parts = node.split("|")
+        if not any("|".join(parts[:i]) in selected for i in range(2, len(parts))):
+            roots.append(node)
+    return list(dict.fromkeys(roots))
+
+
+def read_shapes(roots):
+    # {root: cfrShapes record} for every root, one selection list for all
+    children = cmds.listRelatives(roots, ad=True, type="transform", f=True) or []
+    nodes = list(dict.fromkeys(roots + sorted(children, key=lambda n: n.count("|"))))
+    sel = om.MSelectionList()
+    for node in nodes:
+        sel.add(node)
+
+    records = {root: [] for root in roots}
+    used_names = {root: set() for root in roots}
+    local_names = {}
+
+    def unique(root, name):
+        # names only have to be unique inside one exported file
+        base, n = name, 1
+        while name in used_names[root]:
+            n += 1
+            name = f"{base}{n}"
+        used_names[root].add(name)
+        return name
+
+    for i, node in enumerate(nodes):
+        path = sel.getDagPath(i)
+        root = next(r for r in roots if node == r or node.startswith(r + "|"))
+        fn = om.MFnTransform(path)
+        # the library only stores xyz angles: rotateAxis, the rotation in
+        # its rotate order and jointOrient become one xyz rotation
+        rotation = fn.rotateOrientation(om.MSpace.kTransform) * fn.rotation(om.MSpace.kTransform, asQuaternion=True)
+        if cmds.objectType(node) == "joint":
+            orient = cmds.getAttr(node + ".jointOrient")[0]
+            rotation = rotation * om.MEulerRotation(*[math.radians(a) for a in orient]).asQuaternion()
+        euler = rotation.asEulerRotation()
+        local_names[node] = unique(root, short_name(node))
+        xform = {
+            "name": local_names[node],
+            "parent": None if node == root else local_names.get(node.rsplit("|", 1)[0]),
+            "t": (0.0, 0.0, 0.0) if node == root else tuple(fn.translation(om.MSpace.kTransform)),
+            "r": tuple(math.degrees(a) for a in (euler.x, euler.y, euler.z)),
+            "s": tuple(float(v) for v in fn.scale()),
+            "rp": tuple(fn.rotatePivot(om.MSpace.kTransform))[:3],
+            "sp": tuple(fn.scalePivot(om.MSpace.kTransform))[:3],
+            "curves": [],
+        }
+        for s in range(path.numberOfShapesDirectlyBelow()):
+            shape_path = om.MDagPath(path)
+            shape_path.extendToShape(s)
+            if not shape_path.hasFn(om.MFn.kNurbsCurve) or om.MFnDagNode(shape_path).isIntermediateObject:
+                continue
+            curve_fn = om.MFnNurbsCurve(shape_path)
+            xform["curves"].append({
+                "name": unique(root, short_name(shape_path.partialPathName())),
+                "degree": curve_fn.degree,
+                "spans": curve_fn.numSpans,
+                "form": curve_fn.form - 1,  # kOpen=1 -> 0
+                "knots": [float(k) for k in curve_fn.knots()],
+                "cvs": [(p.x, p.y, p.z) for p in curve_fn.cvPositions(om.MSpace.kObject)],
+            })
+        records[root].append(xform)
+
+    shapes = {}
+    for root, transforms in records.items():
+        # same pruning as the .ma reader: keep transforms that lead to a curve
+        keep = set()
+        by_name = {t["name"]: t for t in transforms}
+        for xform in transforms:
+            if xform["curves"]:
+                name = xform["name"]
+                while name is not None and name not in keep:
+                    keep.add(name)
+                    name = by_name[name]["parent"]
+        shapes[root] = {"file": None, "transforms": [t for t in transforms if t["name"] in keep]}
+    return shapes
+
+
+def _manifest_name(path, folder):
+    # a registry path as the manifest in folder (None: built-in) lists it,
+    # None when it belongs to another manifest
+    if not folder:
+        return None if os.path.isabs(path) else path
+    if not os.path.isabs(path):
+        return None
+    rel = os.path.relpath(path, folder)
+    return None if rel.startswith("..") else rel.replace(os.sep, "/")
+
+
+def _icon_paths():
+    # every icon file a manifest entry points to
+    entries = cfrRegistry.all_shapes() + cfrRegistry.categories()
+    return {os.path.normcase(os.path.abspath(os.path.join(icon_folder, e["icon"]))) for e in entries if e["icon"]}
+
+
+@cfrProfile.profiled("export_curves")
+def export_curves(nodes=None, category=None, tags=None, folder=None, tagged=False, overwrite=False):
+    # category / tags: None keeps those of a replaced entry, new shapes go to "custom"
+    if tagged:
+        nodes = tagged_curves()
+    elif nodes is None:
+        nodes = cmds.ls(selection=True, long=True)
+    roots = _export_roots(nodes)
+    if not roots:
+        cmds.warning("[CurveForRigging] ⚠️ Nothing to export, select curves or tag them with cfrShape.")
+        return []
+
+    # built-in library unless a folder (with its own manifest) is given
+    if folder:
+        curve_dir, thumb_dir = folder, os.path.join(folder, "icons")
+        manifest = os.path.join(folder, "manifest.json")
+    else:
+        curve_dir, thumb_dir, manifest = curve_folder, icon_folder, cfrRegistry.manifest_path
+    for path in (curve_dir, thumb_dir):
+        if not os.path.isdir(path):
+            os.makedirs(path)
+
+    with cfrProfile.phase("read"):
+        shapes = read_shapes(roots)
+
+    entries, writes, thumbs = [], [], []
+    taken = {shape["id"] for shape in cfrRegistry.all_shapes()}
+    icon_paths = _icon_paths()
+    exported = set()
+    for root in roots:
+        shape = shapes[root]
+        if not shape["transforms"]:
+            cmds.warning(f"[CurveForRigging] ⚠️ {root} has no nurbsCurve shapes, skipped.")
+            continue
+
+        # a tag names the library shape to update, a plain name never replaces one
+        shape_id, replace = _shape_id(root), overwrite
+        if cmds.attributeQuery(EXPORT_TAG, node=root, exists=True) and cmds.getAttr(f"{root}.{EXPORT_TAG}"):
+            shape_id, replace = cmds.getAttr(f"{root}.{EXPORT_TAG}"), True
+        base, n = shape_id, 1
+        while shape_id in exported or (shape_id in taken and not replace):
+            n += 1
+            shape_id = f"{base}_{n}"
+        exported.add(shape_id)
+        # a replaced entry keeps how the library shows it, only the curves change
+        existing = cfrRegistry.get(shape_id) if shape_id in taken else None
+
+        file_name = shape_id + ".ma"
+        shape["file"] = file_name
+        writes.append((shape, os.path.join(curve_dir, file_name)))
+
+        icon_name = _manifest_name(existing["icon"], folder) if existing and existing["icon"] else None
+        if icon_name is None:
+            icon_name = shape_id + ".png" if not folder else "icons/" + shape_id + ".png"
+            icon_path = os.path.join(thumb_dir, shape_id + ".png")
+            # hand-made icons of other entries are never drawn over
+            if os.path.normcase(os.path.abspath(icon_path)) not in icon_paths:
+                thumbs.append((shape, icon_path))
+
+        color = 17
+        if cmds.getAttr(root + ".overrideEnabled"):
+            color = cmds.getAttr(root + ".overrideColor")
+        label = existing["label"] if existing else shape_id.replace("_", " ").title()
+        entries.append({
+            "id": shape_id,
+            "category": category or (existing["category"] if existing else "custom"),
+            "label": label,
+            "file": file_name,
+            "ctrl_name": existing["ctrl_name"] if existing else label.replace(" ", "") + "_CTRL",
+            "color": color,
+            "icon": icon_name,
+            "tags": list(tags) if tags is not None else list(existing["tags"] if existing else ()),
+        })
+
+    # nothing is written until every shape has been read back
+    with cfrProfile.phase("write"):
+        cfrCompact.write_shapes(writes)
+    with cfrProfile.phase("thumbnail"):
+        for shape, icon_path in thumbs:
+            cfrThumbnail.write_thumbnail(shape, icon_path)
+
+    if entries:
+        categories = [{"id": c, "label": c.title()} for c in dict.fromkeys(e["category"] for e in entries)
+                      if not cfrRegistry.category(c)]
+        with cfrProfile.phase("manifest"):
+            cfrRegistry.save_shapes(entries, categories, manifest)
 
-    file_name, ctrl_name, color = LEG_CURVE_MAP[name]
-    return finalize_curve(import_curve(file_name), ctrl_name, color, snap_to)
+    cfrProfile.log(f"✅ Exported {len(entries)} shapes to {curve_dir}")
+    return [entry["id"] for entry in entries]